@@ -0,0 +1,42 @@
+"""balance_sheet.py — the One-Way Money page."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from balance_sheet import DEFAULT_LEDGER, DEFAULT_PAGE, BalanceSheet, update_page
+from entity_normalizer import DEFAULT_CLASSIFICATION, EntityNormalizer
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def shells():
+    sheet = BalanceSheet(EntityNormalizer.from_file(ROOT / DEFAULT_CLASSIFICATION))
+    with open(ROOT / DEFAULT_LEDGER, 'r', encoding='utf-8') as f:
+        sheet.sync(json.load(f))
+    return sheet.shells()
+
+
+def test_write_page_reproduces_published_page(shells, tmp_path):
+    page = tmp_path / 'page.html'
+    shutil.copy(ROOT / DEFAULT_PAGE, page)
+    assert not update_page(page, shells)
+
+
+def test_headline_figures_follow_the_table(shells, tmp_path):
+    page = tmp_path / 'page.html'
+    shutil.copy(ROOT / DEFAULT_PAGE, page)
+    moved = [dict(r) for r in shells]
+    moved[0]['ext_in'] += 10e6
+    assert update_page(page, moved)
+    html = page.read_text(encoding='utf-8')
+    assert '<span data-balance="ext_in">$282 million</span> entered.' in html
+    assert '<span data-balance="ext_out">$63 million</span> is visible leaving' in html
+    assert 'the other <span data-balance="gap">$219 million</span>?' in html
+    assert '<div class="number"><span data-balance="gap">$219M</span></div>' in html
+    assert '<td>$282.0M</td>' in html
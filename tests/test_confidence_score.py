@@ -0,0 +1,57 @@
+"""confidence_score.py — vocabulary, entity quality and the --check bars."""
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from confidence_score import (CHECK_BARS, NOISE_TERMS, STATEMENT_MARKERS, TIERS, TXN_TERMS,
+                              EntityQuality, _key, agreement, assign_tiers, below_bar,
+                              load_ledger, score_axes, weighted)
+from entity_normalizer import DEFAULT_CLASSIFICATION, EntityNormalizer
+
+ROOT = Path(__file__).resolve().parent.parent
+LEDGER = ROOT / 'data' / 'master_wire_ledger_phase25.json'
+
+
+@pytest.fixture(scope='module')
+def quality():
+    return EntityQuality(EntityNormalizer.from_file(ROOT / DEFAULT_CLASSIFICATION))
+
+
+def test_each_term_counts_toward_one_axis():
+    sets = [{_key(w) for w in words} for words in (TXN_TERMS, NOISE_TERMS, STATEMENT_MARKERS)]
+    assert sum(len(s) for s in sets) == len(set().union(*sets))
+    assert 'balance' in sets[1]
+
+
+@pytest.mark.parametrize('name, q', [
+    ('JEFFREY -', 2), ('MR EPSTEIN', 2), ('E STEIN', 2), ('DEUTSCHE', 2),
+    ('ACCT NAME', -2), ('JUN 14', -2), ('UNKNOWN', -2), ('', 0),
+])
+def test_entity_quality(quality, name, q):
+    assert quality.quality(name) == q
+
+
+def test_balance_lines_are_noise(quality):
+    columns = {'context': ['incoming wire transfer via fedwire', 'ending balance wire transfer'],
+               'amount': [1234.56, 1234.56]}
+    axes, _ = score_axes(columns, quality)
+    assert axes[0, 0] == 2 and axes[1, 0] == 0
+
+
+def test_ledger_check_meets_the_bars(quality):
+    _, columns, _ = load_ledger(LEDGER)
+    axes, txn = score_axes(columns, quality)
+    tiers = assign_tiers(weighted(axes), txn)
+    stats = agreement(tiers, columns['tier'])
+    assert set(CHECK_BARS) <= set(stats)
+    assert below_bar(stats) == []
+    truth = np.array([TIERS.index(t) for t in columns['tier']])
+    assert not (tiers < truth).any()       # never above the audited tier
+
+
+def test_below_bar():
+    assert below_bar({'PROVEN': (10, 0.5, 0.9), 'WEAK': (3, 0.0, 0.0)}) == []
+    assert below_bar({'MODERATE': (10, 0.5, 0.9), 'STRONG': (5, 0.2, 0.2)}) == ['MODERATE', 'STRONG']
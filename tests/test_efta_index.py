@@ -0,0 +1,23 @@
+"""efta_index.py — citation extraction."""
+
+import json
+
+from efta_index import scan_ledger, scan_text
+
+
+def test_markdown_link_counts_once():
+    line = '[EFTA00027019](https://www.justice.gov/epstein/files/DataSet%209/EFTA00027019.pdf)'
+    assert scan_text(line) == [(27019, 1, 1)]
+
+
+def test_href_query_counts_once():
+    line = ('<a href="https://efts.uscourts.gov/efts-nyed/masterSearch/results?query=EFTA00584904"'
+            ' target="_blank">EFTA00584904</a>')
+    assert [serial for serial, _, _ in scan_text(line)] == [584904]
+
+
+def test_bare_citations_and_ledger_snippets():
+    text = 'see EFTA00027019\nand EFTA00584904, EFTA00027019'
+    assert scan_text(text) == [(27019, 1, 4), (584904, 2, 4), (27019, 2, 18)]
+    ledger = json.dumps([{'context_snippet': 'wire EFTA00027019'}, {'context_snippet': None}])
+    assert scan_ledger(ledger) == [(27019, 0, 5)]
@@ -0,0 +1,49 @@
+"""inject_efta_source_table.py — --derive."""
+
+from pathlib import Path
+
+from inject_efta_source_table import (ALL_DS, DIRECTORY_RE, _row_order, inject_into_text,
+                                      scan_references)
+
+NARRATIVES = Path(__file__).resolve().parent.parent / 'narratives'
+
+TABLE = '''## Source Documents
+
+### EFTA Source Documents
+
+| Document | Reference | Content |
+|---|---|---|
+| EFTA00027019 | Deutsche Bank SAR | Exhibits A–E |
+
+### Next
+'''
+
+
+def test_narrative_17_is_up_to_date():
+    # Its hand-written "### DOJ Datasets" directory links all 12 datasets;
+    # that must not add a Full EFTA Corpus row.
+    path = NARRATIVES / '17_the_architecture.md'
+    text = path.read_text(encoding='utf-8')
+    assert inject_into_text(text, path.name, derive=True) == (text, False)
+
+
+def test_every_narrative_is_a_fixed_point():
+    for path in sorted(NARRATIVES.glob('[0-1]*.md')):
+        text, _ = inject_into_text(path.read_text(encoding='utf-8'), path.name, derive=True)
+        assert inject_into_text(text, path.name, derive=True) == (text, False), path.name
+
+
+def test_ranges():
+    assert scan_references('DS1–12')[1] == set(range(1, 13))
+    assert scan_references('DS3-5 and DS8')[1] == {3, 4, 5, 8}
+    rows = [('a', 'External', ''), ('b', 'DS1–12', ''), ('c', 'DS9', ''), ('d', 'DS8', '')]
+    assert [r[0] for r in sorted(rows, key=_row_order)] == ['d', 'c', 'b', 'a']
+
+
+def test_corpus_wide_update_adds_directory_once():
+    text = ' '.join(f'DS{n}' for n in range(1, 13)) + '\n\n' + TABLE
+    updated, modified = inject_into_text(text, '99_test.md', derive=True)
+    assert modified
+    assert '| Full EFTA Corpus | DS1–12 | References span all 12 DOJ datasets |' in updated
+    assert DIRECTORY_RE.findall(updated) == [f'**All 12 DOJ Datasets:** {ALL_DS}\n']
+    assert inject_into_text(updated, '99_test.md', derive=True) == (updated, False)
@@ -0,0 +1,28 @@
+"""link_cache.py — manifest writes."""
+
+import pytest
+
+import link_cache
+from link_cache import LinkCache
+
+
+def test_save_round_trip(tmp_path):
+    manifest = tmp_path / 'cache.json'
+    cache = LinkCache(manifest, 'linkify_efta', 'v1')
+    cache.mark_clean(tmp_path / 'a.md', 'abc')
+    cache.save()
+    assert LinkCache(manifest, 'linkify_efta', 'v1').files == cache.files
+    assert [p.name for p in tmp_path.iterdir()] == ['cache.json']
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path, monkeypatch):
+    manifest = tmp_path / 'cache.json'
+    cache = LinkCache(manifest, 'linkify_efta', 'v1')
+    cache.mark_clean(tmp_path / 'a.md', 'abc')
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+    monkeypatch.setattr(link_cache.json, 'dump', fail)
+    with pytest.raises(OSError):
+        cache.save()
+    assert list(tmp_path.iterdir()) == []
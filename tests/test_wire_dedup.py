@@ -0,0 +1,55 @@
+"""wire_dedup.py — normalizers and the dedup engine."""
+
+import pytest
+
+from wire_dedup import KEY_STRATEGIES, Wire, census, to_cents, to_day
+
+
+@pytest.mark.parametrize('value, cents', [
+    (1234.5, 123450),
+    ('1234.50', 123450),
+    ('$1,234.50', 123450),
+    (b'1,234.50', 123450),
+    (7, 700),
+    (None, None),
+    ('', None),
+    ('n/a', None),
+    (float('nan'), None),
+    ('nan', None),
+    (float('inf'), None),
+    ('-inf', None),
+    ('1e400', None),
+    (b'\xff', None),
+    ([1], None),
+])
+def test_to_cents(value, cents):
+    assert to_cents(value) == cents
+
+
+@pytest.mark.parametrize('value, day', [
+    ('2014-05-21', 16211),
+    ('5/21/2014', 16211),
+    (b'2014-05-21', 16211),
+    ('sometime in May ', 'sometime in May'),
+    (None, None),
+    ('', None),
+    (20140521, None),
+    (16211.0, None),
+    (float('nan'), None),
+    (b'\xff\xfe', None),
+])
+def test_to_day(value, day):
+    assert to_day(value) == day
+
+
+def _wire(i, cents, date=None):
+    return Wire(i, cents, 'A', 'B', date, False)
+
+
+@pytest.mark.parametrize('strategy', list(KEY_STRATEGIES))
+def test_unpriced_rows_are_never_duplicates(strategy):
+    wires = [_wire(0, None), _wire(1, None), _wire(2, 500), _wire(3, 500), _wire(4, None)]
+    result = census(wires, strategy)
+    assert result['kept'] == 4
+    assert result['dropped'] == 1
+    assert result['groups'] == [{'key': result['groups'][0]['key'], 'kept': 2, 'dropped': [3]}]
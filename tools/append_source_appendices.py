@@ -5,58 +5,157 @@ Appends deep-linked Source Documents & Exhibits sections to each narrative .md f
 
 Usage:
     python3 append_source_appendices.py --narratives-dir ./narratives --appendices ./source_appendices_deeplinked.md
+    python3 append_source_appendices.py --narratives-dir ./narratives --appendices ./source_appendices_deeplinked.md --jobs 8
+    python3 append_source_appendices.py --narratives-dir ./narratives --appendices ./source_appendices_deeplinked.md --force
 
 The script:
-1. Parses the combined appendices file into per-narrative sections
+1. Indexes the combined appendices file in one pass over a memory map:
+   byte offsets of each "# N<k> —" section and its "## Source Documents
+   & Exhibits" header. Only the sections that have a narrative are decoded.
 2. Matches each section to its narrative .md file (by N1-N16 prefix)
-3. Checks if appendix already exists (idempotent — won't double-append)
-4. Appends the source appendix section to the bottom of each narrative
+3. Reads each narrative once and checks if an appendix already exists
+   (idempotent — won't double-append)
+4. Appends the source appendix section to the bottom of each narrative;
+   with --force, an existing appendix is replaced in place
 5. Reports results
 """
 
 import argparse
+import mmap
 import re
 import os
-import sys
+import shutil
+import tempfile
+from bisect import bisect_left
+from functools import partial
 from pathlib import Path
 
+from file_batch import add_jobs_argument, map_files
+
+APPENDIX_HEADER = '## Source Documents & Exhibits'
+WORKBOOK_MARKER = '📊 Verify in Forensic Workbook'
+SEPARATOR = '\n\n---\n\n'
+
+# The two landmarks in the combined file:
+#   SEPARATOR_RE   "\n---\n\n" in front of a "# N<k>" header — closes a section
+#   SOURCE_RE      a "## Source Documents & Exhibits" line — where its appendix starts
+# Newlines may be \n, \r\n or \r, as open(..., 'r') would accept; the
+# atomic group keeps one \r\n from counting as two. Both patterns open with
+# a literal, so each is a memchr-speed scan over the map (an alternation of
+# the two is ~40x slower); "at the start of a line" is checked afterwards on
+# the few candidates (see _newline_before).
+SEPARATOR_RE = re.compile(rb'---(?>\r\n|\r|\n){2}(?=# N\d)')
+SOURCE_RE = re.compile(rb'## Source Documents & Exhibits')
+LINE_INDENT = b' \t\x0b\x0c'
+SECTION_HEADER_RE = re.compile(r'\s*(# N(\d+)\s*—)'.encode('utf-8'))
+NEWLINE_RE = re.compile(rb'\r\n?|\n')
+
+# Narrative side: an appendix runs from its header to the next # / ## heading
+APPENDIX_START_RE = re.compile(r'^[ \t]*' + re.escape(APPENDIX_HEADER), re.MULTILINE)
+NEXT_HEADING_RE = re.compile(r'^#{1,2} ', re.MULTILINE)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# COMBINED APPENDICES — one-pass byte index over a memory map
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class AppendixIndex:
+    """Byte span of every narrative's appendix in the combined appendices
+    file, memory-mapped and indexed without decoding it. Sections are split
+    exactly as parse_appendices always did: on "\\n---\\n\\n" before
+    "# N<k>"; a section counts if it opens with "# N<k> —"; its appendix
+    starts at the first "## Source Documents & Exhibits" line (else the
+    line after the title). A later section with the same N<k> wins.
+
+    Usage:
+        with AppendixIndex(path) as index:
+            text = index.text('N1')
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.spans = self._scan(self._map)      # 'N<k>' → (start, end) byte offsets
+
+    @staticmethod
+    def _newline_before(buf, pos: int) -> int | None:
+        """Offset of the \\n, \\r\\n or \\r ending right before pos, else None."""
+        if pos and buf[pos - 1] == 0x0A:
+            return pos - 2 if pos > 1 and buf[pos - 2] == 0x0D else pos - 1
+        if pos and buf[pos - 1] == 0x0D:
+            return pos - 1
+        return None
+
+    @classmethod
+    def _scan(cls, buf) -> dict:
+        sections = []                           # (start, end) byte offsets
+        start = 0
+        for m in SEPARATOR_RE.finditer(buf):
+            newline = cls._newline_before(buf, m.start())
+            if newline is None:
+                continue                        # "---" not on a line of its own
+            sections.append((start, newline))
+            start = m.end()
+        sections.append((start, len(buf)))
+
+        sources = []                            # "## Source Documents" at a line start
+        for m in SOURCE_RE.finditer(buf):
+            line = m.start()
+            while line and buf[line - 1] in LINE_INDENT:
+                line -= 1
+            if line == 0 or cls._newline_before(buf, line) is not None:
+                sources.append(m.start())
+
+        spans = {}
+        for start, end in sections:
+            header = SECTION_HEADER_RE.match(buf, start, end)
+            if not header:
+                continue
+            i = bisect_left(sources, start)
+            source = sources[i] if i < len(sources) and sources[i] < end else None
+            if source is None:
+                # No "## Source Documents" header: everything after the title line
+                eol = NEWLINE_RE.search(buf, header.start(1), end)
+                source = eol.end() if eol else end
+            spans[f"N{int(header.group(2))}"] = (source, end)
+        return spans
+
+    def keys(self) -> list[str]:
+        """Narrative keys in N order."""
+        return sorted(self.spans, key=lambda x: int(x[1:]))
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __contains__(self, key) -> bool:
+        return key in self.spans
+
+    def text(self, key: str) -> str:
+        """Decode one appendix (stripped), with newlines normalized to \\n."""
+        start, end = self.spans[key]
+        text = self._map[start:end].decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text.strip()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 def parse_appendices(appendices_path: str) -> dict:
     """Parse combined appendices file into {narrative_key: appendix_text} dict."""
-    with open(appendices_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Split on narrative headers: "# N1 — ...", "# N2 — ...", etc.
-    sections = re.split(r'\n---\n\n(?=# N\d+)', content)
-    
-    appendices = {}
-    for section in sections:
-        section = section.strip()
-        if not section:
-            continue
-        # Extract narrative number
-        match = re.match(r'# N(\d+)\s*—', section)
-        if match:
-            n_num = int(match.group(1))
-            key = f"N{n_num}"
-            # Remove the narrative title header (first line) — we only want the appendix content
-            lines = section.split('\n')
-            # Find where "## Source Documents & Exhibits" starts
-            appendix_start = None
-            for i, line in enumerate(lines):
-                if line.strip().startswith('## Source Documents & Exhibits'):
-                    appendix_start = i
-                    break
-            
-            if appendix_start is not None:
-                appendix_text = '\n'.join(lines[appendix_start:])
-            else:
-                # Fallback: use everything after the first line
-                appendix_text = '\n'.join(lines[1:])
-            
-            appendices[key] = appendix_text.strip()
-    
-    return appendices
+    with AppendixIndex(appendices_path) as index:
+        return {key: index.text(key) for key in index.keys()}
 
 
 def find_narrative_files(narratives_dir: str) -> dict:
@@ -78,25 +177,80 @@ def find_narrative_files(narratives_dir: str) -> dict:
     return narrative_files
 
 
-def already_has_appendix(file_path: Path) -> bool:
-    """Check if file already contains a source appendix (idempotent check)."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    return '## Source Documents & Exhibits' in content or '📊 Verify in Forensic Workbook' in content
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# NARRATIVES — one read, at most one write per file
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+def has_appendix(content: str) -> bool:
+    """Check if text already contains a source appendix (idempotent check)."""
+    return APPENDIX_HEADER in content or WORKBOOK_MARKER in content
+
+
+def appendix_span(content: str) -> tuple[int, int] | None:
+    """(start, end) of an existing appendix: from its "## Source Documents
+    & Exhibits" header to the next # / ## heading or the end of the text.
+    None when there is no header to anchor on."""
+    m = APPENDIX_START_RE.search(content)
+    if not m:
+        return None
+    nxt = NEXT_HEADING_RE.search(content, m.end())
+    return m.start(), nxt.start() if nxt else len(content)
 
-def append_appendix(file_path: Path, appendix_text: str) -> bool:
-    """Append source appendix to narrative file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Ensure clean separation
-    separator = '\n\n---\n\n'
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content.rstrip() + separator + appendix_text + '\n')
-    
-    return True
+
+def with_appendix(content: str, appendix_text: str, span: tuple[int, int] | None = None) -> str:
+    """content with appendix_text appended after a '---' separator, or with
+    the appendix at span (see appendix_span) replaced in place."""
+    if span is None:
+        return content.rstrip() + SEPARATOR + appendix_text + '\n'
+
+    start, end = span
+    head = content[:start].rstrip()
+    if head.endswith('\n---'):
+        head = head[:-4].rstrip()               # the separator put there on append
+    tail = content[end:]
+    if not tail:
+        return head + SEPARATOR + appendix_text + '\n'
+    old = content[start:end].rstrip()
+    joiner = SEPARATOR if old.endswith('\n---') else '\n\n'
+    return head + SEPARATOR + appendix_text + joiner + tail
+
+
+def write_atomic(file_path: Path, text: str):
+    """Write text to file_path via a temp file + rename, so a crash never
+    leaves a truncated narrative behind."""
+    fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        shutil.copymode(file_path, tmp)
+        os.replace(tmp, file_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def process_narrative(item: tuple[Path, str], force: bool = False, dry_run: bool = False) -> str:
+    """Check and (unless dry-run) add one narrative's appendix, reading the
+    file once. item is (file_path, appendix_text). Returns 'appended',
+    'replaced', 'unchanged' (--force, appendix already current) or
+    'skipped_exists'."""
+    file_path, appendix_text = item
+    content = file_path.read_text(encoding='utf-8')
+    if not has_appendix(content):
+        status, updated = 'appended', with_appendix(content, appendix_text)
+    elif not force:
+        return 'skipped_exists'
+    else:
+        span = appendix_span(content)
+        if span is None:
+            # Workbook marker without the header: nothing to anchor a replace on
+            status, updated = 'appended', with_appendix(content, appendix_text)
+        else:
+            updated = with_appendix(content, appendix_text, span)
+            status = 'replaced' if updated != content else 'unchanged'
+    if updated != content and not dry_run:
+        write_atomic(file_path, updated)
+    return status
 
 
 def main():
@@ -104,13 +258,14 @@ def main():
     parser.add_argument('--narratives-dir', required=True, help='Directory containing narrative .md files')
     parser.add_argument('--appendices', required=True, help='Path to source_appendices_deeplinked.md')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without modifying files')
-    parser.add_argument('--force', action='store_true', help='Overwrite existing appendices')
+    parser.add_argument('--force', action='store_true', help='Replace existing appendices in place')
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
-    # Parse appendices
-    print(f"📄 Parsing appendices from: {args.appendices}")
-    appendices = parse_appendices(args.appendices)
-    print(f"   Found {len(appendices)} appendix sections: {', '.join(sorted(appendices.keys(), key=lambda x: int(x[1:])))}")
+    # Index appendices
+    print(f"📄 Indexing appendices in: {args.appendices}")
+    appendices = AppendixIndex(args.appendices)
+    print(f"   Found {len(appendices)} appendix sections: {', '.join(appendices.keys())}")
 
     # Find narrative files
     print(f"\n📁 Scanning narratives in: {args.narratives_dir}")
@@ -122,9 +277,19 @@ def main():
     print(f"{'DRY RUN — no files modified' if args.dry_run else 'APPENDING SOURCE APPENDICES'}")
     print(f"{'=' * 60}\n")
 
-    results = {'appended': [], 'skipped_exists': [], 'skipped_no_file': [], 'skipped_no_appendix': []}
+    results = {'appended': [], 'replaced': [], 'unchanged': [], 'skipped_exists': [],
+               'skipped_no_file': [], 'skipped_no_appendix': []}
+
+    all_keys = sorted(set(list(appendices.keys()) + list(narrative_files.keys())), key=lambda x: int(x[1:]))
+    work_keys = [k for k in all_keys if k in appendices and k in narrative_files]
+    statuses = dict(zip(work_keys, map_files(
+        partial(process_narrative, force=args.force, dry_run=args.dry_run),
+        [(narrative_files[k], appendices.text(k)) for k in work_keys],
+        args.jobs,
+    )))
+    appendices.close()      # offsets stay available for the report below
 
-    for n_key in sorted(set(list(appendices.keys()) + list(narrative_files.keys())), key=lambda x: int(x[1:])):
+    for n_key in all_keys:
         if n_key not in appendices:
             results['skipped_no_appendix'].append(n_key)
             print(f"  ⚠️  {n_key}: No appendix section found")
@@ -137,17 +302,22 @@ def main():
         
         file_path = narrative_files[n_key]
         
-        if already_has_appendix(file_path) and not args.force:
-            results['skipped_exists'].append(n_key)
-            print(f"  ⏭️  {n_key}: Already has appendix ({file_path.name}) — use --force to overwrite")
+        status = statuses[n_key]
+        results[status].append(n_key)
+        if status == 'skipped_exists':
+            print(f"  ⏭️  {n_key}: Already has appendix ({file_path.name}) — use --force to replace")
+            continue
+        if status == 'unchanged':
+            print(f"  ✅ {n_key}: Appendix already current in {file_path.name}")
+            continue
+        if status == 'replaced':
+            verb = "Would replace" if args.dry_run else "Replaced"
+            print(f"  🔁 {n_key}: {verb} appendix in place in {file_path.name}")
             continue
         
         if args.dry_run:
-            results['appended'].append(n_key)
             print(f"  ✅ {n_key}: Would append to {file_path.name}")
         else:
-            append_appendix(file_path, appendices[n_key])
-            results['appended'].append(n_key)
             print(f"  ✅ {n_key}: Appended to {file_path.name}")
 
     # Summary
@@ -155,6 +325,9 @@ def main():
     print(f"SUMMARY")
     print(f"{'=' * 60}")
     print(f"  ✅ Appended:           {len(results['appended'])}")
+    if args.force:
+        print(f"  🔁 Replaced in place:  {len(results['replaced'])}")
+        print(f"  ✅ Already current:    {len(results['unchanged'])}")
     print(f"  ⏭️  Already had appendix: {len(results['skipped_exists'])}")
     print(f"  ⚠️  No .md file found:   {len(results['skipped_no_file'])}")
     print(f"  ⚠️  No appendix found:   {len(results['skipped_no_appendix'])}")
@@ -163,8 +336,9 @@ def main():
         print(f"\n  Missing files for: {', '.join(results['skipped_no_file'])}")
         print(f"  Expected filename pattern: n1_*.md, n2_*.md, etc.")
 
-    if not args.dry_run and results['appended']:
-        print(f"\n  🎯 Done! {len(results['appended'])} narratives now have deep-linked source appendices.")
+    updated = len(results['appended']) + len(results['replaced'])
+    if not args.dry_run and updated:
+        print(f"\n  🎯 Done! {updated} narratives now have deep-linked source appendices.")
 
 
 if __name__ == '__main__':
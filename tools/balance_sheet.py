@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+balance_sheet.py — Shell-entity balance sheet behind One-Way Money (Narrative 17)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Computes per-entity inflow/outflow from the wire ledger, joined to
+entity_classification.json, and regenerates the balance-sheet table in
+visualizations/17_one_way_money.html.
+
+Every ledger name is resolved through entity_normalizer and becomes a
+node. A name that starts with one of the SHELLS prefixes joins that
+shell's node ("Southern Trust Company Inc. (Checking)" and SOUTHERN_TRUST
+are both Southern Trust), including a shell account classified under its
+custodian ("Gratitude America Ltd. (Morgan Stanley/Citibank)");
+everything else is its own node. Each node carries four sums and counts:
+
+  ext_in     from a counterparty outside the nine shells
+  shell_in   from one of the nine shells
+  shell_out  to one of the nine shells
+  ext_out    to a counterparty outside the nine shells
+
+net = ext_in + shell_in − shell_out − ext_out. As on the page, an Epstein
+entity outside SHELLS (FINANCIAL_TRUST) is an external counterparty.
+Transfers between two accounts of the same node are internal and wires
+with an UNKNOWN counterparty are unattributed; neither is counted.
+
+--write-page regenerates the table between the BALANCE markers and the
+headline figures tagged <span data-balance="ext_in|ext_out|gap">, so the
+page's prose always agrees with its table.
+
+INCREMENTAL: a batch of rows is reduced into the node matrices with one
+scatter-add (sign +1 to append, −1 to retract), so the sheet never has to
+be recomputed from scratch. The sheet and a fingerprint of every row it
+has absorbed are kept in --state; on the next run only the rows added to
+or removed from the ledger since then are applied. A new phase of the
+ledger refreshes in milliseconds. The state is rebuilt automatically when
+this tool, the normalizer or the classification changes.
+
+Requires NumPy.
+
+Usage:
+    python3 balance_sheet.py
+    python3 balance_sheet.py --by class
+    python3 balance_sheet.py --write-page
+    python3 balance_sheet.py --ledger data/master_wire_ledger_phase26.json --json balance.json
+    python3 balance_sheet.py --check       # compare the incremental sheet with a rebuild
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("balance_sheet.py requires NumPy (pip install numpy)")
+
+from entity_normalizer import DEFAULT_CLASSIFICATION, UNKNOWN, EntityNormalizer, fold
+from link_cache import content_hash, file_hash, source_version
+
+DEFAULT_LEDGER = 'data/master_wire_ledger_phase25.json'
+DEFAULT_STATE = '.balance_state.json'
+DEFAULT_PAGE = 'visualizations/17_one_way_money.html'
+
+EPSTEIN = 'EPSTEIN_ENTITY'
+EXT_IN, SHELL_IN, SHELL_OUT, EXT_OUT = range(4)
+COLUMNS = ('ext_in', 'shell_in', 'shell_out', 'ext_out')
+
+# Page label, folded-name prefixes of its accounts (Epstein entities only)
+SHELLS = (
+    ('Southern Trust', ('southern trust',)),
+    ('NOW/SuperNow', ('jeffrey epstein now',)),
+    ('Southern Financial', ('southern financial',)),
+    ('Caterpillar Trust', ('the 2017 caterpillar trust',)),
+    ('Haze Trust', ('haze trust', 'the haze trust')),
+    ('Jeepers Inc.', ('jeepers',)),
+    ('Plan D LLC', ('plan d llc',)),
+    ('Gratitude America', ('gratitude america',)),
+    ('NES LLC', ('nes llc',)),
+)
+SHELL_LABELS = {label for label, _ in SHELLS}
+
+PAGE_BLOCK_RE = re.compile(r'(<!-- BALANCE:START -->\n)(.*?)(\s*<!-- BALANCE:END -->)', re.DOTALL)
+# Headline figure in the page's prose: "$272 million" or "$209M"
+PAGE_FIGURE_RE = re.compile(r'(<span data-balance="(ext_in|ext_out|gap)">)\$[\d,.]+( million|M)(</span>)')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ROWS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def row_key(row: dict) -> str:
+    """Fingerprint of a ledger row; any edit to it is a retract + append."""
+    return content_hash(json.dumps(row, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+
+
+def shell_of(canonical: str) -> str | None:
+    key = fold(canonical)
+    for label, prefixes in SHELLS:
+        if key.startswith(prefixes):
+            return label
+    return None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BALANCE SHEET
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class BalanceSheet:
+    """Per-node flow sums (cents) and counts, maintained under appends and
+    retractions. rows maps each absorbed row's key to
+    [entity_from, entity_to, cents, multiplicity]."""
+
+    def __init__(self, normalizer: EntityNormalizer):
+        self.normalizer = normalizer
+        self.nodes = []         # node label
+        self.types = []         # node classification type
+        self._node_id = {}      # label → node id
+        self._raw_id = {}       # raw ledger name → node id
+        self.amounts = np.zeros((0, 4), dtype=np.int64)
+        self.counts = np.zeros((0, 4), dtype=np.int64)
+        self._shell = np.zeros(0, dtype=bool)      # one of the nine SHELLS
+        self._known = np.zeros(0, dtype=bool)      # not an UNKNOWN counterparty
+        self._typed = 0         # nodes whose flags are set
+        self.rows = {}
+
+    # ── nodes ──
+
+    def node(self, raw: str) -> int:
+        nid = self._raw_id.get(raw)
+        if nid is not None:
+            return nid
+        res = self.normalizer.resolve(raw)
+        shell = shell_of(res.name)
+        label = shell or res.name
+        nid = self._node_id.get(label)
+        if nid is None:
+            nid = self._node_id[label] = len(self.nodes)
+            self.nodes.append(label)
+            self.types.append(EPSTEIN if shell else res.type)
+        self._raw_id[raw] = nid
+        return nid
+
+    def _grow(self):
+        """Make room for every node created so far and flag the new ones.
+        Nodes added into spare capacity need their flags too."""
+        n = len(self.nodes)
+        if n > len(self.amounts):
+            cap = max(n, 2 * len(self.amounts), 64)
+            for attr in ('amounts', 'counts'):
+                old = getattr(self, attr)
+                new = np.zeros((cap, 4), dtype=np.int64)
+                new[:len(old)] = old
+                setattr(self, attr, new)
+            for attr in ('_shell', '_known'):
+                old = getattr(self, attr)
+                new = np.zeros(cap, dtype=bool)
+                new[:len(old)] = old
+                setattr(self, attr, new)
+        typed = self._typed
+        self._shell[typed:n] = [label in SHELL_LABELS for label in self.nodes[typed:n]]
+        self._known[typed:n] = [t != UNKNOWN and fold(label) != 'unknown'
+                                for label, t in zip(self.nodes[typed:n], self.types[typed:n])]
+        self._typed = n
+
+    # ── updates ──
+
+    def apply(self, frm: list[str], to: list[str], cents, weight=1):
+        """Scatter-add a batch of wires. weight is +1 / −1, or a per-row
+        array of signed multiplicities."""
+        src = np.fromiter((self.node(r) for r in frm), dtype=np.int64, count=len(frm))
+        dst = np.fromiter((self.node(r) for r in to), dtype=np.int64, count=len(to))
+        self._grow()
+        cents = np.asarray(cents, dtype=np.int64)
+        weight = np.broadcast_to(np.asarray(weight, dtype=np.int64), cents.shape)
+        counted = (src != dst) & self._known[src] & self._known[dst]
+        src, dst, cents, weight = src[counted], dst[counted], cents[counted], weight[counted]
+
+        recv = np.where(self._shell[src], SHELL_IN, EXT_IN)
+        send = np.where(self._shell[dst], SHELL_OUT, EXT_OUT)
+        cells = np.concatenate([dst * 4 + recv, src * 4 + send])
+        weight = np.concatenate([weight, weight])
+        np.add.at(self.amounts.reshape(-1), cells, np.concatenate([cents, cents]) * weight)
+        np.add.at(self.counts.reshape(-1), cells, weight)
+
+    def sync(self, ledger: list[dict]) -> tuple[int, int]:
+        """Bring the sheet in line with ledger, applying only the difference
+        from the rows already absorbed. Returns (appended, retracted)."""
+        incoming = {}
+        seen = Counter()
+        for row in ledger:
+            key = row_key(row)
+            seen[key] += 1
+            if key not in self.rows and key not in incoming:
+                incoming[key] = (row['entity_from'], row['entity_to'], round(row['amount'] * 100))
+
+        batch, delta = [], []
+        for key in seen.keys() | self.rows.keys():
+            known = self.rows.get(key)
+            change = seen[key] - (known[3] if known else 0)
+            if not change:
+                continue
+            frm, to, cents = (known[:3] if known else incoming[key])
+            batch.append((frm, to, cents))
+            delta.append(change)
+            if seen[key]:
+                self.rows[key] = [frm, to, cents, seen[key]]
+            else:
+                del self.rows[key]
+        if batch:
+            frm, to, cents = zip(*batch)
+            self.apply(list(frm), list(to), cents, np.array(delta))
+        return sum(d for d in delta if d > 0), -sum(d for d in delta if d < 0)
+
+    # ── views ──
+
+    def table(self) -> list[dict]:
+        """Every node with any flow, as dicts in dollars, sorted by net
+        (ties by name, so the order doesn't depend on node creation order)."""
+        n = len(self.nodes)
+        amounts, counts = self.amounts[:n], self.counts[:n]
+        net = amounts[:, EXT_IN] + amounts[:, SHELL_IN] - amounts[:, SHELL_OUT] - amounts[:, EXT_OUT]
+        live = np.flatnonzero(counts.any(axis=1))
+        rows = []
+        for i in sorted(live, key=lambda i: (-net[i], self.nodes[i])):
+            row = {'node': self.nodes[i], 'type': self.types[i]}
+            row.update({c: int(amounts[i, j]) / 100 for j, c in enumerate(COLUMNS)})
+            row['wires'] = int(counts[i].sum())
+            row['net'] = int(net[i]) / 100
+            rows.append(row)
+        return rows
+
+    def by_class(self) -> list[dict]:
+        """Sums per classification type (grouped reduction over nodes)."""
+        n = len(self.nodes)
+        names, inverse = np.unique(np.array(self.types, dtype=object).astype(str), return_inverse=True)
+        sums = np.zeros((len(names), 4), dtype=np.int64)
+        np.add.at(sums, inverse, self.amounts[:n])
+        rows = []
+        for name, s in zip(names, sums):
+            row = {'node': str(name), 'type': str(name)}
+            row.update({c: int(s[j]) / 100 for j, c in enumerate(COLUMNS)})
+            row['net'] = int(s[EXT_IN] + s[SHELL_IN] - s[SHELL_OUT] - s[EXT_OUT]) / 100
+            rows.append(row)
+        return rows
+
+    def shells(self) -> list[dict]:
+        """The nine shells with any flow, in the page's SHELLS order."""
+        rows = {r['node']: r for r in self.table() if r['node'] in SHELL_LABELS}
+        return [rows[label] for label, _ in SHELLS if label in rows]
+
+    # ── persistence ──
+
+    def save(self, path, version: str):
+        n = len(self.nodes)
+        state = {
+            'version': version,
+            'nodes': self.nodes,
+            'types': self.types,
+            'raw': self._raw_id,
+            'amounts': self.amounts[:n].tolist(),
+            'counts': self.counts[:n].tolist(),
+            'rows': self.rows,
+        }
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, version: str, normalizer: EntityNormalizer) -> 'BalanceSheet':
+        """Saved sheet, or an empty one if the state is missing, corrupt or
+        was built by a different version."""
+        sheet = cls(normalizer)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return sheet
+        if state.get('version') != version:
+            return sheet
+        sheet.nodes, sheet.types = state['nodes'], state['types']
+        sheet._node_id = {label: i for i, label in enumerate(sheet.nodes)}
+        sheet._raw_id = state['raw']
+        sheet._grow()
+        n = len(sheet.nodes)
+        if n:
+            sheet.amounts[:n] = state['amounts']
+            sheet.counts[:n] = state['counts']
+        sheet.rows = state['rows']
+        return sheet
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# PAGE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _millions(dollars: float) -> str:
+    return f"${abs(dollars) / 1e6:,.1f}M"
+
+
+def _cell(dollars: float) -> str:
+    if round(dollars / 1e5) == 0:
+        return f'<td class="neutral">{"~$0" if dollars else "$0"}</td>'
+    return f'<td>{_millions(dollars)}</td>'
+
+
+def _net_cell(dollars: float) -> str:
+    if dollars < 0:
+        return f'<td class="negative">−{_millions(dollars)}</td>'
+    return f'<td class="positive">+{_millions(dollars)}</td>'
+
+
+def totals(shells: list[dict]) -> dict:
+    """System-wide external in / out and the gap between them, in dollars."""
+    ext_in = sum(r['ext_in'] for r in shells)
+    ext_out = sum(r['ext_out'] for r in shells)
+    return {'ext_in': ext_in, 'ext_out': ext_out, 'gap': ext_in - ext_out}
+
+
+def render_rows(shells: list[dict], indent: str = '        ') -> str:
+    """<tr> rows for the balance-sheet tbody, plus the SYSTEM TOTAL row."""
+    lines = []
+    for r in shells:
+        lines += [f'{indent}<tr>',
+                  f'{indent}  <td>{r["node"]}</td>',
+                  *(f'{indent}  {_cell(r[c])}' for c in COLUMNS),
+                  f'{indent}  {_net_cell(r["net"])}',
+                  f'{indent}</tr>']
+    total = totals(shells)
+    lines += [f'{indent}<tr class="total-row">',
+              f'{indent}  <td>SYSTEM TOTAL</td>',
+              f'{indent}  <td>{_millions(total["ext_in"])}</td>',
+              f'{indent}  <td></td>',
+              f'{indent}  <td></td>',
+              f'{indent}  <td>{_millions(total["ext_out"])}</td>',
+              f'{indent}  {_net_cell(total["gap"])}',
+              f'{indent}</tr>']
+    return '\n'.join(lines)
+
+
+def update_page(page_path, shells: list[dict]) -> bool:
+    """Replace the block between the BALANCE markers and the tagged headline
+    figures (whole millions, in the unit the prose already uses). Returns
+    True if the page changed."""
+    with open(page_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    m = PAGE_BLOCK_RE.search(html)
+    if not m:
+        raise ValueError(f"{page_path} has no <!-- BALANCE:START/END --> block")
+    updated = html[:m.start(2)] + render_rows(shells) + html[m.start(3):]
+    total = totals(shells)
+    updated = PAGE_FIGURE_RE.sub(
+        lambda f: f"{f.group(1)}${total[f.group(2)] / 1e6:,.0f}{f.group(3)}{f.group(4)}", updated)
+    if updated == html:
+        return False
+    with open(page_path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    return True
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Incremental per-entity balance sheet over the wire ledger'
+    )
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER,
+                        help=f'Ledger JSON (default ./{DEFAULT_LEDGER})')
+    parser.add_argument('--classification', default=DEFAULT_CLASSIFICATION,
+                        help=f'Classification JSON (default ./{DEFAULT_CLASSIFICATION})')
+    parser.add_argument('--state', default=DEFAULT_STATE, metavar='PATH',
+                        help=f'Saved sheet (default ./{DEFAULT_STATE})')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore the saved sheet')
+    parser.add_argument('--by', choices=('shell', 'entity', 'class'), default='shell',
+                        help='Rows to print (default shell: the page\'s nine shells)')
+    parser.add_argument('--page', default=DEFAULT_PAGE,
+                        help=f'One-Way Money page (default ./{DEFAULT_PAGE})')
+    parser.add_argument('--write-page', action='store_true',
+                        help='Regenerate the page\'s balance-sheet block')
+    parser.add_argument('--json', metavar='PATH', help='Write the printed rows as JSON')
+    parser.add_argument('--check', action='store_true',
+                        help='Also rebuild from scratch and fail if the incremental sheet differs')
+    args = parser.parse_args()
+
+    version = source_version(__file__, sys.modules[EntityNormalizer.__module__].__file__)
+    version += ':' + file_hash(args.classification)
+    normalizer = EntityNormalizer.from_file(args.classification)
+    sheet = (BalanceSheet(normalizer) if args.rebuild
+             else BalanceSheet.load(args.state, version, normalizer))
+    resumed = bool(sheet.rows)
+
+    with open(args.ledger, 'r', encoding='utf-8') as f:
+        ledger = json.load(f)
+    start = time.perf_counter()
+    appended, retracted = sheet.sync(ledger)
+    elapsed = time.perf_counter() - start
+    sheet.save(args.state, version)
+
+    rows = {'shell': sheet.shells, 'entity': sheet.table, 'class': sheet.by_class}[args.by]()
+
+    print(f"━━━ BALANCE SHEET ━━━")
+    print(f"  Ledger:  {args.ledger} ({len(ledger):,} wires)")
+    print(f"  Update:  +{appended:,} / −{retracted:,} rows in {elapsed * 1000:.1f}ms "
+          f"({'incremental' if resumed else 'full build'})")
+    print(f"{'━' * 60}\n")
+    print(f"  {'':<34}{'Ext In':>10}{'Shell In':>10}{'Shell Out':>10}{'Ext Out':>10}{'Net':>11}")
+    for r in rows:
+        print(f"  {r['node'][:33]:<34}" + ''.join(f"{r[c] / 1e6:>9.1f}M" for c in COLUMNS)
+              + f"{r['net'] / 1e6:>+10.1f}M")
+    if args.by == 'shell':
+        total = totals(rows)
+        print(f"\n  External in ${total['ext_in'] / 1e6:,.1f}M · external out ${total['ext_out'] / 1e6:,.1f}M · "
+              f"gap ${total['gap'] / 1e6:,.1f}M")
+
+    if args.write_page:
+        try:
+            changed = update_page(args.page, sheet.shells())
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"\n  {'✅ Updated' if changed else 'Unchanged:'} {args.page}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'ledger': args.ledger, 'by': args.by, 'rows': rows}, f, indent=1)
+        print(f"\n  Rows: {args.json}")
+    if args.check:
+        rebuilt = BalanceSheet(normalizer)
+        rebuilt.sync(ledger)
+        diff = [r['node'] for r, f in zip(sheet.table(), rebuilt.table()) if r != f]
+        if len(sheet.table()) != len(rebuilt.table()) or diff:
+            print(f"\n  ❌ Incremental sheet differs from a rebuild: {', '.join(diff[:5]) or 'node count'}")
+            sys.exit(1)
+        print(f"\n  ✅ Check: incremental sheet equals a full rebuild "
+              f"({len(rebuilt.table())} nodes)")
+    print(f"\n━━━ BALANCE SHEET COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+benchmark.py — Throughput benchmarks for the markdown link tools
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Times the four hot paths on seeded synthetic corpora and keeps a JSON
+history, so a change to is_already_linked, LINKIFY_RE or any other
+pattern shows up as a regression against the previous run.
+
+  linkify_all              linkify_efta.py (linkify_stream above --stream-above)
+  convert_external_links   convert_links_new_tab.py
+  build_source_table       inject_efta_source_table.py, --derive rows
+  parse_appendices         append_source_appendices.py (AppendixIndex above --stream-above)
+
+convert_external_links and build_source_table hold whole files in memory
+and are skipped above --stream-above (default 256M).
+
+CORPUS: markdown is generated block by block from a seed, so the same
+parameters always produce the same bytes. Axes:
+
+  --sizes           1K … 1G per file
+  --efta-density    EFTA / dataset references per KB
+  --linked-ratio    share of references already inside a link
+  --fence-density   share of blocks that are ``` code fences
+
+Files are written once to --corpus-dir and reused. parse_appendices gets
+a matching combined-appendices file of the same size.
+
+MEASUREMENT: each case runs in a fresh process. Time is the best of
+--repeat rounds, each round long enough to time reliably (timeit
+autorange). Peak memory is the growth in that process's maximum RSS,
+input text included. Throughput is reported as MB/s and matches/s
+(links made, links converted, table rows or appendix sections).
+
+HISTORY: every run is appended to --history. Each case is compared with
+the last run that measured the same case in the same mode (streamed or
+in memory, see --stream-above); slowdowns beyond --threshold are flagged
+(and fail the run with --fail-on-regression).
+
+Usage:
+    python3 benchmark.py
+    python3 benchmark.py --sizes 1K 1M 64M 1G --only linkify_all
+    python3 benchmark.py --efta-density 1 8 32 --linked-ratio 0 0.5 0.9
+    python3 benchmark.py --fail-on-regression --threshold 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import resource
+except ImportError:  # Windows: no peak-RSS figure
+    resource = None
+
+from append_source_appendices import AppendixIndex, parse_appendices
+from convert_links_new_tab import convert_external_links
+from efta_core import DATASET_RANGES
+from inject_efta_source_table import build_source_table, derive_rows
+from linkify_efta import dataset_to_md_link, efta_to_md_link, linkify_all, linkify_stream
+
+TARGETS = ('linkify_all', 'convert_external_links', 'build_source_table', 'parse_appendices')
+DEFAULT_SIZES = ['1K', '64K', '1M', '16M']
+DEFAULT_EFTA_DENSITY = 4.0
+DEFAULT_LINKED_RATIO = 0.3
+DEFAULT_FENCE_DENSITY = 0.05
+DEFAULT_SEED = 25
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_STREAM_ABOVE = '256M'
+DEFAULT_HISTORY = '.benchmark_history.json'
+DEFAULT_CORPUS_DIR = '.benchmark_corpus'
+SIZE_UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+BLOCK_POOL = 1024       # distinct blocks per corpus; files are seeded draws from the pool
+BENCH_NARRATIVE = '01'  # narrative whose curated rows seed build_source_table
+
+
+def parse_size(text: str) -> int:
+    """'64K' / '1M' / '1G' / '512' → bytes."""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(n: int) -> str:
+    for unit in ('G', 'M', 'K'):
+        if n >= SIZE_UNITS[unit] and n % SIZE_UNITS[unit] == 0:
+            return f"{n // SIZE_UNITS[unit]}{unit}"
+    return str(n)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# SYNTHETIC CORPUS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+WORDS = ('the wire transfer from account to trust was booked as a capital contribution '
+         'with no invoice and the beneficiary shell received funds through an intermediary '
+         'bank on behalf of the estate per exhibit statement ledger memo routing counterparty '
+         'deposit withdrawal balance production subpoena records show that').split()
+EXTERNAL_URLS = ('https://www.sec.gov/cgi-bin/browse-edgar',
+                 'https://registry.faa.gov/AircraftInquiry',
+                 'https://www.dfs.ny.gov/reports_and_publications')
+
+
+class CorpusSpec(NamedTuple):
+    size: int               # bytes
+    efta_density: float     # references per KB
+    linked_ratio: float     # share of references already linked
+    fence_density: float    # share of blocks that are code fences
+    seed: int
+
+    def file_name(self, kind: str = 'md') -> str:
+        return (f"{kind}-{format_size(self.size)}-e{self.efta_density:g}"
+                f"-l{self.linked_ratio:g}-f{self.fence_density:g}-s{self.seed}.md")
+
+    def label(self) -> str:
+        return (f"{format_size(self.size)} · {self.efta_density:g}/KB · "
+                f"{self.linked_ratio:.0%} linked · {self.fence_density:.0%} fenced")
+
+
+def _reference(rng: random.Random) -> tuple[str, str]:
+    """(plain text, linked form) of one EFTA or dataset reference."""
+    kind = rng.random()
+    if kind < 0.7:
+        ds, start, end = rng.choice(DATASET_RANGES)
+        ref = f"EFTA{rng.randint(start, end):08d}"
+        return ref, efta_to_md_link(ref) or ref
+    ds = rng.randint(1, 12)
+    if kind < 0.8:
+        ref = f"Dataset {ds}"
+    elif kind < 0.9:
+        ref = f"DS{ds}"
+    else:
+        a, b = sorted(rng.sample(range(1, 13), 2))
+        return f"Datasets {a}, {b}, and {ds}", f"Datasets {a}, {b}, and {ds}"
+    return ref, dataset_to_md_link(ref, ds)
+
+
+def _words(rng: random.Random, n_bytes: int, density: float, linked_ratio: float) -> str:
+    """About n_bytes of prose with density references per KB."""
+    out, size = [], 0
+    p_ref = density * 6 / 1024     # ~6 bytes per word slot
+    while size < n_bytes:
+        if rng.random() < p_ref:
+            plain, linked = _reference(rng)
+            if rng.random() < linked_ratio:
+                # Half HTML anchors (linkify skips), half markdown links (convert rewrites)
+                word = linked if rng.random() < 0.5 else f"[{plain}]({rng.choice(EXTERNAL_URLS)})"
+            else:
+                word = plain
+        elif rng.random() < 0.01:
+            word = f"`{rng.choice(WORDS)}`"
+        else:
+            word = rng.choice(WORDS)
+        out.append(word)
+        size += len(word) + 1
+    return ' '.join(out)
+
+
+def _block(rng: random.Random, spec: CorpusSpec) -> str:
+    if rng.random() < spec.fence_density:
+        lines = [_words(rng, rng.randint(40, 80), spec.efta_density, 0) for _ in range(rng.randint(3, 12))]
+        return '```\n' + '\n'.join(lines) + '\n```\n'
+    if rng.random() < 0.05:
+        return f"## {_words(rng, 30, 0, 0).title()}\n"
+    return _words(rng, rng.randint(200, 1200), spec.efta_density, spec.linked_ratio) + '\n'
+
+
+def _appendix_section(rng: random.Random, num: int, spec: CorpusSpec) -> str:
+    rows = []
+    for _ in range(rng.randint(5, 40)):
+        plain, linked = _reference(rng)
+        rows.append(f"| {linked} | {_words(rng, rng.randint(30, 120), 0, 0)} |")
+    return (f"# N{num} — Synthetic Narrative {num}\n\n"
+            f"## Source Documents & Exhibits\n\n| Document | Description |\n|---|---|\n"
+            + '\n'.join(rows) + '\n')
+
+
+def write_corpus(spec: CorpusSpec, path: Path, kind: str = 'md'):
+    """Write a spec.size-byte corpus file (markdown, or a combined appendices
+    file for kind='appendices'). Blocks are drawn from a seeded pool so even
+    1G files generate at disk speed."""
+    rng = random.Random(f"{kind}:{spec}")
+    if kind == 'md':
+        pool = [_block(rng, spec).encode('utf-8') for _ in range(BLOCK_POOL)]
+        sep = b'\n'
+    else:
+        pool = None
+        sep = b'\n---\n\n'
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        written, num = 0, 0
+        while written < spec.size:
+            num += 1
+            block = rng.choice(pool) if pool else _appendix_section(rng, num, spec).encode('utf-8')
+            if written:
+                block = sep + block
+            if written + len(block) > spec.size:
+                # Trim to size without leaving half a UTF-8 character
+                block = block[:spec.size - written].decode('utf-8', 'ignore').encode('utf-8')
+                if not block:
+                    break
+            f.write(block)
+            written += len(block)
+    os.replace(tmp, path)
+
+
+def corpus_path(spec: CorpusSpec, corpus_dir: Path, kind: str, regenerate: bool) -> Path:
+    path = corpus_dir / spec.file_name(kind)
+    if regenerate or not path.exists():
+        corpus_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        write_corpus(spec, path, kind)
+        print(f"  📝 Generated {path.name} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# MEASUREMENT
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _max_rss() -> int | None:
+    """Peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _case_call(target: str, path: str, stream: bool):
+    """(zero-arg callable returning the match count, mode) for one case."""
+    if target == 'parse_appendices':
+        if stream:
+            def call():
+                with AppendixIndex(path) as index:
+                    return len(index)
+            return call, 'mmap'
+        def call():
+            return len(parse_appendices(path))
+        return call, 'file'
+    if stream:
+        def call():
+            with open(path, 'r', encoding='utf-8', newline='') as src, \
+                    open(os.devnull, 'w', encoding='utf-8') as dst:
+                return sum(linkify_stream(src, dst))
+        return call, 'stream'
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    if target == 'linkify_all':
+        def call():
+            _, efta, ds = linkify_all(text)
+            return efta + ds
+    elif target == 'convert_external_links':
+        def call():
+            return convert_external_links(text)[1]
+    else:
+        def call():
+            rows = derive_rows(BENCH_NARRATIVE, text)
+            build_source_table(BENCH_NARRATIVE, rows)
+            return len(rows)
+    return call, 'memory'
+
+
+def run_case(target: str, path: str, repeat: int, stream: bool) -> dict:
+    """Time one target on one corpus file. Runs in its own process."""
+    baseline = _max_rss()
+    call, mode = _case_call(target, path, stream)
+    start = time.perf_counter()
+    matches = call()
+    first = time.perf_counter() - start
+    timer = timeit.Timer(call)
+    if first >= 0.2:
+        # Long case (big files): the warm-up call is already a fair sample
+        seconds = min([first] + timer.repeat(repeat=repeat - 1, number=1))
+    else:
+        number, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+    peak = _max_rss()
+    size = os.path.getsize(path)
+    return {
+        'mode': mode,
+        'bytes': size,
+        'seconds': seconds,
+        'mb_per_s': size / 1e6 / seconds,
+        'matches': matches,
+        'matches_per_s': matches / seconds,
+        'peak_mb': (peak - baseline) / 1e6 if peak is not None else None,
+    }
+
+
+def measure(target: str, path: Path, repeat: int, stream: bool) -> dict:
+    """run_case in a fresh interpreter so peak RSS belongs to this case alone."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_case, target, str(path), repeat, stream).result()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# HISTORY
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_history(path) -> list[dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return history if isinstance(history, list) else []
+
+
+def save_history(path, history: list[dict]):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def previous_result(history: list[dict], case: str, mode: str) -> tuple[dict, dict] | None:
+    """(run, result) of the most recent run that measured case in mode —
+    a streaming run is never compared with an in-memory one."""
+    for run in reversed(history):
+        for result in run.get('results', []):
+            if result.get('case') == case and result.get('mode') == mode:
+                return run, result
+    return None
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=Path(__file__).parent, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the markdown link tools on synthetic corpora'
+    )
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, metavar='SIZE',
+                        help=f'Corpus file sizes, 1K … 1G (default {" ".join(DEFAULT_SIZES)})')
+    parser.add_argument('--efta-density', type=float, nargs='+', default=[DEFAULT_EFTA_DENSITY],
+                        metavar='N', help=f'References per KB (default {DEFAULT_EFTA_DENSITY:g})')
+    parser.add_argument('--linked-ratio', type=float, nargs='+', default=[DEFAULT_LINKED_RATIO],
+                        metavar='R', help=f'Share already linked (default {DEFAULT_LINKED_RATIO:g})')
+    parser.add_argument('--fence-density', type=float, nargs='+', default=[DEFAULT_FENCE_DENSITY],
+                        metavar='R', help=f'Share of code-fence blocks (default {DEFAULT_FENCE_DENSITY:g})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Corpus seed (default {DEFAULT_SEED})')
+    parser.add_argument('--only', action='append', choices=TARGETS, help='Benchmark only this target (repeatable)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Timing rounds per case, best kept (default {DEFAULT_REPEAT})')
+    parser.add_argument('--stream-above', default=DEFAULT_STREAM_ABOVE, metavar='SIZE',
+                        help=f'Use linkify_stream and skip in-memory targets above this size '
+                             f'(default {DEFAULT_STREAM_ABOVE})')
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR,
+                        help=f'Where corpus files are kept (default ./{DEFAULT_CORPUS_DIR})')
+    parser.add_argument('--regenerate', action='store_true', help='Rewrite corpus files even if present')
+    parser.add_argument('--history', default=DEFAULT_HISTORY,
+                        help=f'Run history JSON (default ./{DEFAULT_HISTORY})')
+    parser.add_argument('--no-record', action='store_true', help="Don't append this run to the history")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Slowdown that counts as a regression (default {DEFAULT_THRESHOLD:.0%}%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 if any case regressed')
+    args = parser.parse_args()
+
+    try:
+        sizes = sorted({parse_size(s) for s in args.sizes})
+        stream_above = parse_size(args.stream_above)
+    except ValueError as e:
+        parser.error(f"bad size: {e}")
+    if any(not 0 <= r <= 1 for r in args.linked_ratio + args.fence_density):
+        parser.error('--linked-ratio and --fence-density are shares between 0 and 1')
+    targets = [t for t in TARGETS if not args.only or t in args.only]
+    corpus_dir = Path(args.corpus_dir)
+    history = load_history(args.history)
+
+    specs = [CorpusSpec(size, e, l, f, args.seed) for size in sizes for e in args.efta_density
+             for l in args.linked_ratio for f in args.fence_density]
+
+    print(f"━━━ LINK TOOL BENCHMARKS ━━━")
+    print(f"  Corpora: {len(specs)} · Targets: {', '.join(targets)} · Best of {args.repeat}")
+    print(f"{'━' * 60}")
+
+    results, regressions = [], []
+    for spec in specs:
+        print(f"\n  📦 {spec.label()}")
+        for target in targets:
+            stream = spec.size > stream_above
+            if stream and target not in ('linkify_all', 'parse_appendices'):
+                print(f"     {target:<24} skipped (in-memory only; --stream-above)")
+                continue
+            kind = 'appendices' if target == 'parse_appendices' else 'md'
+            path = corpus_path(spec, corpus_dir, kind, args.regenerate)
+            result = measure(target, path, args.repeat, stream)
+            case = f"{target}:{spec.file_name(kind)}"
+            result = {'case': case, 'target': target, **spec._asdict(), **result}
+            results.append(result)
+
+            peak = f"{result['peak_mb']:8.1f} MB" if result['peak_mb'] is not None else '       — MB'
+            line = (f"     {target:<24} {result['mb_per_s']:9.2f} MB/s  "
+                    f"{result['matches_per_s']:12,.0f} matches/s  peak {peak}")
+            prev = previous_result(history, case, result['mode'])
+            if prev:
+                change = result['seconds'] / prev[1]['seconds'] - 1
+                line += f"  {change:+.1%}"
+                if change > args.threshold:
+                    line += " ⚠️"
+                    regressions.append((case, change, prev[0].get('commit')))
+            print(line)
+
+    if not args.no_record and results:
+        history.append({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'results': results,
+        })
+        save_history(args.history, history)
+        print(f"\n  History: {args.history} ({len(history)} runs)")
+
+    if regressions:
+        print(f"\n  ⚠️  {len(regressions)} case(s) slower than the previous run by > {args.threshold:.0%}:")
+        for case, change, commit in regressions:
+            print(f"     {case}  {change:+.1%}  (vs {commit or 'unknown commit'})")
+    print(f"\n━━━ BENCHMARKS COMPLETE ━━━")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
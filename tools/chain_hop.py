@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+chain_hop.py — Time-respecting chain-hop finder (Narrative 04)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Finds money that moves A → B → C …, where each hop
+
+  • leaves the entity the previous hop arrived at,
+  • happens on or after the previous hop, and no more than --window
+    days later,
+  • moves an amount within --tolerance of the previous hop,
+  • never revisits an entity already on the chain.
+
+GRAPH: dated wires are edges in CSR form — edges grouped by sender, and
+within each sender sorted by date. Each edge also has a composite key
+sender × span + day, globally sorted, so "edges leaving v between day d
+and d + window" is two binary searches for a whole frontier at once.
+
+SEARCH: breadth-first by hop count. The frontier is a set of partial
+chains held as arrays; every hop expands all of them together (two
+searchsorted calls, a repeat, and a vectorized amount / revisit filter).
+Every chain of --min-hops to --hops hops is reported. Undated wires can't
+be placed in time and are left out.
+
+Inputs: the master wire ledger (via its columnar store) or any table with
+amount / entity_from / entity_to / date columns — e.g. the 23,832-row
+fund_flows table.
+
+Requires NumPy.
+
+Usage:
+    python3 chain_hop.py
+    python3 chain_hop.py --from "Southern Trust" --hops 3 --window 60
+    python3 chain_hop.py --db ./epstein.db --table fund_flows --tolerance 0.01 --json chains.json
+"""
+
+import sys
+import json
+import argparse
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("chain_hop.py requires NumPy (pip install numpy)")
+
+from entity_normalizer import fold
+from ledger_store import NO_DATE, format_date, open_ledger
+from wire_dedup import load_table
+
+DEFAULT_LEDGER = 'data/master_wire_ledger_phase25.json'
+DEFAULT_HOPS = 3
+DEFAULT_WINDOW = 30
+DEFAULT_TOLERANCE = 0.05
+
+
+class Hop(NamedTuple):
+    id: int             # ledger index or SQLite rowid
+    entity_from: str
+    entity_to: str
+    day: int
+    cents: int
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# GRAPH
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class WireGraph:
+    """Dated wires in CSR order: edges of node v are src-sorted positions
+    indptr[v]:indptr[v + 1], ascending by day."""
+
+    def __init__(self, ids, senders, receivers, days, cents):
+        days = np.asarray(days, dtype=np.int64)
+        dated = days != NO_DATE
+        self.undated = int((~dated).sum())
+
+        self.nodes, codes = np.unique(np.concatenate([np.asarray(senders, dtype=object),
+                                                      np.asarray(receivers, dtype=object)])
+                                      .astype(str), return_inverse=True)
+        src, dst = codes[:len(days)][dated], codes[len(days):][dated]
+        days = days[dated]
+        self.day0 = int(days.min()) if len(days) else 0
+        self.span = int(days.max()) - self.day0 + 1 if len(days) else 1
+
+        order = np.lexsort((days, src))
+        self.src = src[order]
+        self.dst = dst[order]
+        self.day = days[order] - self.day0
+        self.cents = np.asarray(cents, dtype=np.int64)[dated][order]
+        self.ids = np.asarray(ids, dtype=np.int64)[dated][order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=len(self.nodes)))])
+        self.keys = self._key(self.src, self.day)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def _key(self, node, day):
+        """Composite sort key; ascending over the CSR order."""
+        return node * (2 * self.span) + day
+
+    def window(self, node, start, end):
+        """CSR positions [lo, hi) of edges leaving node with start ≤ day ≤ end,
+        for arrays of (node, start, end)."""
+        start = np.clip(start, 0, 2 * self.span - 1)
+        end = np.clip(end, -1, 2 * self.span - 1)
+        lo = np.searchsorted(self.keys, self._key(node, start), side='left')
+        hi = np.searchsorted(self.keys, self._key(node, end), side='right')
+        return lo, np.maximum(lo, hi)
+
+    def match_nodes(self, pattern: str) -> np.ndarray:
+        """Node ids whose folded name contains the folded pattern."""
+        needle = fold(pattern)
+        return np.array([i for i, name in enumerate(self.nodes.tolist()) if needle in fold(name)],
+                        dtype=np.int64)
+
+    def hop(self, pos: int) -> Hop:
+        return Hop(int(self.ids[pos]), str(self.nodes[self.src[pos]]), str(self.nodes[self.dst[pos]]),
+                   int(self.day[pos]) + self.day0, int(self.cents[pos]))
+
+    def chains(self, start=None, end=None, max_hops: int = DEFAULT_HOPS, min_hops: int = 2,
+               window: int = DEFAULT_WINDOW, tolerance: float = DEFAULT_TOLERANCE,
+               min_gap: int = 0) -> list[list[Hop]]:
+        """Every time-respecting chain of min_hops..max_hops hops. start / end
+        restrict the first sender / last receiver to those node ids."""
+        if start is None:
+            frontier = np.arange(len(self), dtype=np.int64)
+        else:
+            frontier = np.concatenate([np.arange(self.indptr[v], self.indptr[v + 1]) for v in start]
+                                      + [np.zeros(0, dtype=np.int64)])
+        paths = frontier[:, None]                                   # (P, hops) CSR positions
+        visited = np.stack([self.src[frontier], self.dst[frontier]], axis=1)
+        end_mask = None
+        if end is not None:
+            end_mask = np.zeros(len(self.nodes), dtype=bool)
+            end_mask[np.asarray(end, dtype=np.int64)] = True
+
+        found = []
+        for hops in range(1, max_hops + 1):
+            if hops >= min_hops:
+                last = self.dst[paths[:, -1]]
+                keep = paths if end_mask is None else paths[end_mask[last]]
+                found += [[self.hop(p) for p in row] for row in keep.tolist()]
+            if hops == max_hops or not len(paths):
+                break
+
+            tail = paths[:, -1]
+            lo, hi = self.window(self.dst[tail], self.day[tail] + min_gap, self.day[tail] + window)
+            count = hi - lo
+            parent = np.repeat(np.arange(len(paths)), count)
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            nxt = lo[parent] + offset
+
+            prev = self.cents[tail][parent]
+            ok = np.abs(self.cents[nxt] - prev) <= tolerance * prev
+            ok &= ~(visited[parent] == self.dst[nxt][:, None]).any(axis=1)
+            parent, nxt = parent[ok], nxt[ok]
+            paths = np.concatenate([paths[parent], nxt[:, None]], axis=1)
+            visited = np.concatenate([visited[parent], self.dst[nxt][:, None]], axis=1)
+        return found
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# INPUTS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def graph_from_ledger(path) -> WireGraph:
+    with open_ledger(path) as ledger:
+        entities = np.array(ledger.entities, dtype=object)
+        return WireGraph(np.arange(len(ledger)),
+                         entities[ledger.array('entity_from')],
+                         entities[ledger.array('entity_to')],
+                         ledger.array('date'),
+                         ledger.array('amount_cents'))
+
+
+def graph_from_table(db_path, table: str) -> WireGraph:
+    wires = [w for w in load_table(db_path, table) if w.cents is not None]
+    return WireGraph([w.id for w in wires],
+                     [w.entity_from for w in wires],
+                     [w.entity_to for w in wires],
+                     [w.date if isinstance(w.date, int) else NO_DATE for w in wires],
+                     [w.cents for w in wires])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _chain_line(chain: list[Hop]) -> str:
+    parts = [chain[0].entity_from]
+    for h in chain:
+        parts.append(f"─[${h.cents / 100:,.0f} · {format_date(h.day)} · #{h.id}]→ {h.entity_to}")
+    return ' '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Find time-respecting multi-hop money chains in the wire ledger'
+    )
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER,
+                        help=f'Ledger JSON (default ./{DEFAULT_LEDGER})')
+    parser.add_argument('--db', help='SQLite database (use with --table instead of --ledger)')
+    parser.add_argument('--table', help='Table with amount / entity_from / entity_to / date')
+    parser.add_argument('--from', dest='start', metavar='NAME',
+                        help='First sender (case-insensitive substring)')
+    parser.add_argument('--to', dest='end', metavar='NAME',
+                        help='Last receiver (case-insensitive substring)')
+    parser.add_argument('--hops', type=int, default=DEFAULT_HOPS, metavar='K',
+                        help=f'Maximum hops per chain (default {DEFAULT_HOPS})')
+    parser.add_argument('--min-hops', type=int, default=2, metavar='K',
+                        help='Minimum hops per chain (default 2)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, metavar='DAYS',
+                        help=f'Maximum days between consecutive hops (default {DEFAULT_WINDOW})')
+    parser.add_argument('--min-gap', type=int, default=0, metavar='DAYS',
+                        help='Minimum days between consecutive hops (default 0: same day allowed)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed relative amount change per hop (default {DEFAULT_TOLERANCE})')
+    parser.add_argument('--limit', type=int, default=50, help='Chains to print (default 50)')
+    parser.add_argument('--json', metavar='PATH', help='Write every chain as JSON')
+    args = parser.parse_args()
+
+    if bool(args.db) != bool(args.table):
+        parser.error('--db and --table go together')
+    if not 1 <= args.min_hops <= args.hops:
+        parser.error('need 1 ≤ --min-hops ≤ --hops')
+    try:
+        graph = graph_from_table(args.db, args.table) if args.db else graph_from_ledger(args.ledger)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = end = None
+    for name, attr in ((args.start, 'start'), (args.end, 'end')):
+        if name:
+            ids = graph.match_nodes(name)
+            if not len(ids):
+                parser.error(f"no entity matches {name!r}")
+            if attr == 'start':
+                start = ids
+            else:
+                end = ids
+
+    chains = graph.chains(start, end, args.hops, args.min_hops, args.window,
+                          args.tolerance, args.min_gap)
+    chains.sort(key=lambda c: (-len(c), -c[0].cents, c[0].day))
+
+    source = f"{args.db}:{args.table}" if args.db else args.ledger
+    print(f"━━━ CHAIN-HOP FINDER ━━━")
+    print(f"  Graph:  {source} — {len(graph):,} dated wires, {len(graph.nodes):,} entities "
+          f"({graph.undated:,} undated skipped)")
+    print(f"  Rules:  {args.min_hops}–{args.hops} hops, {args.min_gap}–{args.window} days apart, "
+          f"±{args.tolerance:.0%} per hop")
+    print(f"  Chains: {len(chains):,}")
+    print(f"{'━' * 60}\n")
+    for chain in chains[:args.limit]:
+        print(f"  🔗 {_chain_line(chain)}")
+    if len(chains) > args.limit:
+        print(f"\n  … {len(chains) - args.limit:,} more (--limit / --json)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([[{'id': h.id, 'entity_from': h.entity_from, 'entity_to': h.entity_to,
+                         'date': format_date(h.day), 'amount': h.cents / 100} for h in chain]
+                       for chain in chains], f, indent=1)
+        print(f"\n  Chains: {args.json}")
+    print(f"\n━━━ CHAIN SEARCH COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
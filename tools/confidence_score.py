@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+confidence_score.py — 5-axis forensic confidence scorer (METHODOLOGY.md)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Scores financial records on the five axes behind the ledger's tier and
+source columns ("audited_PROVEN", …):
+
+  axis                 weight  −2 … +2
+  context_language       ×3    transaction vocabulary minus noise vocabulary
+  amount_specificity     ×1    $2,473,891.55 → 2 · $292,000 → 1 · $10,000,000 → 0
+  date_presence          ×1    full date → 2 · year only → 1 · none → 0
+  entity_quality         ×2    known bank / Epstein entity (Epstein himself,
+                               "JEFFREY -", "E STEIN", included) → 2 · external
+                               party → 1 · unknown → 0 · garbage ("ACCT NAME",
+                               "JUN 14") → −2;
+                               a from/to pair takes the mean rounded up, leaving
+                               out a garbage side (both garbage → −2)
+  source_doc_type        ×1    statement / spreadsheet → 2 · email → 1 · other → 0
+
+  PROVEN ≥ 12 (and ctx_txn ≥ 2) · STRONG ≥ 8 · MODERATE ≥ 5 · WEAK ≥ 3
+  · VERY_WEAK ≥ 1 · REJECT
+
+ENGINE: the whole batch is scored column-wise. All contexts are lower-cased
+and joined into one string, and every keyword set (transaction, noise,
+statement markers, known names) plus the date anchors is compiled into
+one trie-shaped regex, so the batch is scanned once; match offsets are
+binned back to rows with searchsorted + bincount. The full date parser
+only runs in a small window around each year anchor. Entity quality is
+one lookup per distinct name (entity_classification.json via
+EntityNormalizer), gathered back to rows. The weighted sum and tier cut
+are NumPy expressions, so re-tiering with different --thresholds costs
+nothing once the axes are computed; after --write, --retier re-cuts from
+the stored axes without rescanning.
+
+Tables are read by column alias (context / context_snippet / raw_text,
+amount / extracted_amount, date / date_ref, doc_type / source_file).
+Without entity columns (financial_hits) entity quality comes from the
+names mentioned in the context; without a date column, from dates in it.
+
+--check compares with a stored tier column: tiers re-cut from stored axis
+columns (if the table has them) test weights and thresholds exactly;
+tiers from recomputed axes test the axis scorers. It exits 1 when a
+stored tier falls below its CHECK_BARS entry (share recomputed at that
+tier, share within one tier). The bars are what the ledger's audited rows
+support. Those rows carry ~100-char snippets of the contexts they were
+scored on, and the 46 STRONG / MODERATE rows carry none and mostly no
+date. Recomputed tiers therefore run low: PROVEN 4% exact / 36% within
+one, STRONG 0% / 40%, MODERATE 62% / 88%, and no row comes out higher
+than audited. Without a snippet a row tops out at 8 (amount 2 + date 2 +
+entity 2×2), so STRONG needs every remaining axis at its maximum, and
+none of the 20 has that. Weights and thresholds are the documented ones;
+nothing is fitted to the ledger.
+
+Requires NumPy.
+
+Usage:
+    python3 confidence_score.py --db ./epstein.db
+    python3 confidence_score.py --db ./epstein.db --table fund_flows_audited --check
+    python3 confidence_score.py --db ./epstein.db --thresholds 13 9 6 3 1
+    python3 confidence_score.py --db ./epstein.db --write
+    python3 confidence_score.py --db ./epstein.db --retier --thresholds 13 9 6 3 1
+    python3 confidence_score.py --ledger data/master_wire_ledger_phase25.json
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("confidence_score.py requires NumPy (pip install numpy)")
+
+from date_recovery import DATE_RE, DEFAULT_YEARS, normalize_date
+from entity_normalizer import DEFAULT_CLASSIFICATION, EntityNormalizer, fold
+from linkify_db import IDENT_RE, connect
+from wire_dedup import to_cents
+
+DEFAULT_TABLE = 'financial_hits'
+RESULT_TABLE = 'confidence_scores'
+
+AXES = ('context_language', 'amount_specificity', 'date_presence', 'entity_quality', 'source_doc_type')
+WEIGHTS = np.array([3, 1, 1, 2, 1], dtype=np.int16)
+TIERS = ('PROVEN', 'STRONG', 'MODERATE', 'WEAK', 'VERY_WEAK', 'REJECT')
+THRESHOLDS = (12, 8, 5, 3, 1)      # minimum score for each tier but REJECT
+PROVEN_MIN_TXN = 2                 # PROVEN also needs this many transaction terms
+# --check fails below these, per stored tier: (share recomputed at that tier,
+# share recomputed within one tier of it). Measured on the audited ledger
+# rows; see the docstring for why exact agreement is low there.
+CHECK_BARS = {
+    'PROVEN': (0.04, 0.35),
+    'STRONG': (0.00, 0.40),
+    'MODERATE': (0.60, 0.85),
+}
+
+COLUMN_ALIASES = {
+    'context': ('context', 'context_snippet', 'raw_text', 'snippet'),
+    'amount': ('amount', 'extracted_amount'),
+    'date': ('date', 'date_ref'),
+    'entity_from': ('entity_from',),
+    'entity_to': ('entity_to',),
+    'doc_type': ('doc_type', 'document_type', 'source_type', 'source_file', 'file_name'),
+    'tier': ('tier', 'confidence_tier'),
+    'ctx_txn': ('ctx_txn',),
+}
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# VOCABULARY
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# Each term belongs to exactly one set, so a token counts toward one axis.
+# Where two terms overlap ("account no" / "account number") the scan takes
+# the longer one, and with it the longer one's set.
+TXN_TERMS = (
+    'wire', 'wires', 'wired', 'wire transfer', 'wire transfers', 'incoming wire', 'outgoing wire',
+    'wiring instructions', 'fedwire', 'swift', 'chips', 'routing', 'aba', 'imad', 'omad',
+    'beneficiary', 'originator', 'remitter', 'ordering customer', 'credit advice', 'debit advice',
+    'value date', 'transfer', 'transfers', 'transferred', 'funds transfer',
+    'electronic funds transfer', 'ach', 'deposit', 'deposits', 'deposited', 'withdrawal',
+    'withdrawals', 'remittance', 'payment to', 'payment from', 'paid to', 'received from',
+    'sent to', 'funds', 'account no', 'acct', 'reference', 'ref no', 'confirmation', 'check no',
+    'check #', 'posted', 'debit', 'debits', 'credit', 'credits',
+)
+NOISE_TERMS = (
+    'lawsuit', 'plaintiff', 'defendant', 'complaint', 'allegedly', 'alleged', 'reportedly',
+    'according to', 'net worth', 'worth', 'valued at', 'valuation', 'estimated', 'estimate',
+    'market value', 'total assets', 'balance', 'ending balance', 'beginning balance',
+    'available balance', 'closing balance', 'opening balance', 'article', 'interview',
+    'magazine', 'newspaper', 'podcast', 'salary', 'fine', 'penalty', 'damages', 'verdict',
+    'per year', 'annually', 'budget',
+)
+STATEMENT_MARKERS = (
+    'statement period', 'account statement', 'account summary', 'account number',
+    'deposits and other credits', 'withdrawals and other debits',
+    'db-sdny',          # Bates prefix of the Deutsche Bank production: its wire spreadsheet
+    'wire detail', 'transaction detail', 'spreadsheet', 'ledger', 'xlsx', 'csv',
+)
+EMAIL_MARKERS = ('from:', 'sent:', 'to:', 'cc:', 'subject:', 'wrote:', 'original message', 'forwarded message')
+
+DOC_TYPE_CLASSES = (
+    (2, re.compile(r'statement|spreadsheet|ledger|bank|financial|wire|\.xlsx?$|\.csv$', re.IGNORECASE)),
+    (1, re.compile(r'e-?mail|\.eml$|\.msg$|correspondence', re.IGNORECASE)),
+)
+
+# Banks recognized by name in free text, in addition to the classification's BANK/CUSTODIAN rows
+KNOWN_BANKS = (
+    'Deutsche Bank', 'DBAGNY', 'JPMorgan', 'JP Morgan', 'Chase', 'Citibank', 'Citigroup', 'HSBC',
+    'BNY Mellon', 'Bank of New York', 'Bank of America', 'Wells Fargo', 'Morgan Stanley',
+    'Goldman Sachs', 'UBS', 'Credit Suisse', 'Barclays', 'First Bank', 'Banco Popular',
+    'Bear Stearns', 'Merrill Lynch', 'Highbridge', 'Royal Bank of Canada', 'RBC', 'TD Bank',
+    'BNP Paribas', 'Societe Generale', 'Edmond de Rothschild',
+)
+BANK_TYPE = 'BANK/CUSTODIAN'
+INSIDER_TYPE = 'EPSTEIN_ENTITY'
+
+# Extraction artefacts that land in entity columns: form labels, dates, addresses
+GARBAGE_RE = re.compile(
+    r'^(?:'
+    r'(?:acct|account|beneficiary|detail|order|pay|remittance|wire|wireless|mobile|need|'
+    r'primary|exhibit|subtotal|total|date|amount|memo|reference)\b.*'
+    r'|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* \d{1,2}'
+    r'|(?:box|suite|ste|unit|po box) \w+'
+    r'|.* (?:blvd|street|st|ave|avenue|road|rd|falls)'
+    r'|unknown|n a|none|null'
+    r'|\W*\w?\W*'
+    r')$'
+)
+# Epstein himself under the names extraction leaves in entity columns
+# ("JEFFREY -", "MR EPSTEIN", the OCR split "E STEIN"): the core subject,
+# scored like an Epstein entity even where the classification lists the
+# name as an external party
+SUBJECT_RE = re.compile(r'^(?:(?:mr|jeffrey|jeffery|jeff|j) )?(?:epstein|e stein)$|^jeffe?re?y$')
+
+
+def trie_pattern(words) -> str:
+    """Regex source matching any of words (lower case). Alternatives are
+    nested by shared prefix, so the engine walks a trie instead of trying
+    every word at every offset; a space matches any run of whitespace."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node) -> str:
+        end = node.get('') is True
+        branches = [re.escape(ch).replace(r'\ ', r'\s+') + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            return f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+
+def _key(word: str) -> str:
+    return ' '.join(word.lower().split())
+
+
+# a header at a line start, or after a run of spaces where OCR flattened the line breaks
+EMAIL_RE = re.compile(r'(?m)(?:^|\s\s)\s*(?:' + '|'.join(re.escape(m) for m in EMAIL_MARKERS) + r')')
+YEAR_RE = re.compile(r'(?<!\d)(?:19[89]\d|20[0-3]\d)(?!\d)')
+# Every DATE_RE match contains one of these: a 4-digit year, or a US date with a 2-digit year
+DATE_ANCHOR = r'19[89]\d|20[0-3]\d|\d{1,2}/\d{1,2}/\d{2}(?:\d{2})?'
+DATE_WINDOW = (24, 8)              # chars before / after an anchor that DATE_RE may span
+ROW_SEP = '\n\x00\n'
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BATCH TEXT SCAN
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class TextColumn:
+    """A column of strings, lower-cased and joined into one buffer, so a
+    pattern is one regex pass over the batch instead of one call per row."""
+
+    def __init__(self, values):
+        values = ['' if v is None else str(v).lower() for v in values]
+        self.n = len(values)
+        self.empty = np.array([not v for v in values], dtype=bool)
+        lengths = np.fromiter((len(v) + len(ROW_SEP) for v in values), dtype=np.int64, count=self.n)
+        self.starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if self.n else np.zeros(0, np.int64)
+        self.ends = self.starts + lengths - len(ROW_SEP)
+        self.text = ROW_SEP.join(values)
+
+    def rows(self, offsets) -> np.ndarray:
+        return np.searchsorted(self.starts, np.asarray(offsets, dtype=np.int64), side='right') - 1
+
+    def count(self, offsets) -> np.ndarray:
+        """Per-row count of match offsets."""
+        return np.bincount(self.rows(offsets), minlength=self.n)
+
+    def any(self, pattern: re.Pattern) -> np.ndarray:
+        return self.count([m.start() for m in pattern.finditer(self.text)]) > 0
+
+    def full_dates(self, anchors, years=DEFAULT_YEARS) -> np.ndarray:
+        """Rows with a valid DATE_RE date. DATE_RE runs only in a small
+        window around each anchor, and stops at a row's first hit."""
+        found = np.zeros(self.n, dtype=bool)
+        if not anchors:
+            return found
+        before, after = DATE_WINDOW
+        starts, ends = self.starts.tolist(), self.ends.tolist()
+        for (s, e), row in zip(anchors, self.rows([s for s, _ in anchors]).tolist()):
+            if found[row]:
+                continue
+            lo, hi = max(starts[row], s - before), min(ends[row] + 1, e + after)
+            if any(normalize_date(m, years) for m in DATE_RE.finditer(self.text, lo, hi)):
+                found[row] = True
+        return found
+
+
+class Scanner:
+    """Every keyword set as one whole-word trie regex, plus date anchors.
+    A single pass over a TextColumn yields per-row counts for each set."""
+
+    def __init__(self, vocabulary: dict):
+        self.sets = tuple(vocabulary)
+        self.lookup = {}                    # lower-case word → indices into self.sets
+        for i, words in enumerate(vocabulary.values()):
+            for word in words:
+                hits = self.lookup.setdefault(_key(word), []) if _key(word) else [i]
+                if i not in hits:
+                    hits.append(i)
+        self.regex = re.compile(r'(?<!\w)(?:' + trie_pattern(self.lookup) + '|' + DATE_ANCHOR + r')(?!\w)')
+
+    def scan(self, col: TextColumn) -> tuple[dict, list]:
+        """({set name: per-row match count}, date anchor spans)."""
+        found = [(m.start(), m.group()) for m in self.regex.finditer(col.text)]
+        ids = {}
+        word_ids = np.fromiter((ids.setdefault(w, len(ids)) for _, w in found), dtype=np.int64, count=len(found))
+        rows = col.rows(np.fromiter((s for s, _ in found), dtype=np.int64, count=len(found)))
+        # membership of each distinct word; unknown words are date anchors
+        member = np.zeros((len(ids) + 1, len(self.sets)), dtype=bool)
+        anchor = np.zeros(len(ids) + 1, dtype=bool)
+        for word, i in ids.items():
+            hits = self.lookup.get(word)
+            if hits is None and word[0].isdigit():
+                anchor[i] = True
+                continue
+            member[i, hits if hits is not None else self.lookup[_key(word)]] = True
+        counts = {name: np.bincount(rows[member[word_ids, k]], minlength=col.n)
+                  for k, name in enumerate(self.sets)}
+        anchors = [(s, s + len(w)) for (s, w), a in zip(found, anchor[word_ids].tolist()) if a]
+        return counts, anchors
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# AXES
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def context_axis(counts: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(axis, ctx_txn): capped transaction-term count minus capped noise count."""
+    txn = counts['txn']
+    return np.minimum(txn, 2) - np.minimum(counts['noise'], 2), txn
+
+
+def amount_axis(cents: np.ndarray) -> np.ndarray:
+    """2 for odd amounts, 1 for round thousands, 0 for round hundred-thousands or none."""
+    cents = np.asarray(cents, dtype=np.int64)
+    axis = np.where(cents % 100_000 != 0, 2, np.where(cents % 10_000_000 != 0, 1, 0))
+    return np.where(cents > 0, axis, 0)
+
+
+def _date_levels(col: TextColumn, anchors: list) -> tuple[np.ndarray, np.ndarray]:
+    """(full date, year) per row from the scanner's date anchors."""
+    year = col.count([s for s, e in anchors if YEAR_RE.search(col.text, s, e)]) > 0
+    return col.full_dates(anchors), year
+
+
+def date_axis(ctx: TextColumn, ctx_anchors: list, dates: TextColumn | None = None,
+              date_anchors: list = ()) -> np.ndarray:
+    """2 for a full date, 1 for a year alone, 0 otherwise. The date column
+    wins where it has a value; the context is the fallback."""
+    full, year = _date_levels(ctx, ctx_anchors)
+    if dates is not None:
+        col_full, col_year = _date_levels(dates, date_anchors)
+        full = np.where(dates.empty, full, col_full)
+        year = np.where(dates.empty, year, col_year)
+    return np.where(full, 2, np.where(year, 1, 0))
+
+
+class EntityQuality:
+    """Per-name entity quality from entity_classification.json."""
+
+    def __init__(self, normalizer: EntityNormalizer):
+        self.normalizer = normalizer
+        self.banks = {fold(b) for b in KNOWN_BANKS}
+        # names worth counting when they appear in free text
+        self.mentionable = list(KNOWN_BANKS) + [raw for raw in normalizer._exact
+                                                if not GARBAGE_RE.match(fold(raw))]
+        self._cache = {}
+
+    def quality(self, raw) -> int:
+        if raw in self._cache:
+            return self._cache[raw]
+        key = fold(raw or '')
+        if not key:
+            q = 0
+        elif SUBJECT_RE.match(key):
+            q = 2
+        elif GARBAGE_RE.match(key):
+            q = -2
+        elif key in self.banks:
+            q = 2
+        else:
+            r = self.normalizer.resolve(raw)
+            q = 2 if r.type in (BANK_TYPE, INSIDER_TYPE) else 1 if r.method else 0
+            if GARBAGE_RE.match(fold(r.name)):
+                q = -2
+        self._cache[raw] = q
+        return q
+
+    def column(self, values) -> np.ndarray:
+        names, inverse = np.unique(np.array(['' if v is None else str(v) for v in values], dtype=object)
+                                   .astype(str), return_inverse=True)
+        return np.array([self.quality(n) for n in names.tolist()], dtype=np.int64)[inverse]
+
+    def pair(self, froms, tos) -> np.ndarray:
+        """Mean of the two sides, rounded up. A garbage side is left out;
+        only a pair of two garbage names scores −2."""
+        a, b = self.column(froms), self.column(tos)
+        return np.where((a >= 0) & (b >= 0), (a + b + 1) // 2,
+                        np.where((a < 0) & (b < 0), -2, np.maximum(a, b)))
+
+    @staticmethod
+    def mentions(counts: dict) -> np.ndarray:
+        """Known names mentioned in the context: 2 for two or more, 1 for one."""
+        return np.minimum(counts['mention'], 2)
+
+
+def doc_type_axis(doc_types: list | None, ctx: TextColumn, counts: dict) -> np.ndarray:
+    """2 for statements / spreadsheets, 1 for email, 0 otherwise — from the
+    doc type or file name column when present, else from the context."""
+    from_ctx = np.where(counts['statement'] > 0, 2, np.where(ctx.any(EMAIL_RE), 1, 0))
+    if doc_types is None:
+        return from_ctx
+    names, inverse = np.unique(np.array(['' if v is None else str(v) for v in doc_types], dtype=object)
+                               .astype(str), return_inverse=True)
+    by_name = np.array([next((v for v, rx in DOC_TYPE_CLASSES if rx.search(n)), -1) if n else -1
+                        for n in names.tolist()], dtype=np.int64)[inverse]
+    return np.where(by_name >= 0, by_name, from_ctx)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# SCORE + TIER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def build_scanner(quality: EntityQuality) -> Scanner:
+    return Scanner({'txn': TXN_TERMS, 'noise': NOISE_TERMS,
+                    'statement': STATEMENT_MARKERS, 'mention': quality.mentionable})
+
+
+def score_axes(columns: dict, quality: EntityQuality,
+               scanner: Scanner | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """columns: alias → list of values (see COLUMN_ALIASES).
+    Returns (axes (n, 5) int8, ctx_txn)."""
+    scanner = scanner or build_scanner(quality)
+    ctx = TextColumn(columns['context'])
+    counts, anchors = scanner.scan(ctx)
+    context, txn = context_axis(counts)
+    cents = np.array([to_cents(v) or 0 for v in columns.get('amount', [None] * ctx.n)], dtype=np.int64)
+    if 'date' in columns:
+        dates = TextColumn(columns['date'])
+        dated = date_axis(ctx, anchors, dates, scanner.scan(dates)[1])
+    else:
+        dated = date_axis(ctx, anchors)
+    if 'entity_from' in columns and 'entity_to' in columns:
+        entity = quality.pair(columns['entity_from'], columns['entity_to'])
+    else:
+        entity = quality.mentions(counts)
+    axes = np.stack([context, amount_axis(cents), dated, entity,
+                     doc_type_axis(columns.get('doc_type'), ctx, counts)], axis=1).astype(np.int8)
+    return axes, txn
+
+
+def weighted(axes: np.ndarray) -> np.ndarray:
+    return axes.astype(np.int16) @ WEIGHTS
+
+
+def assign_tiers(scores: np.ndarray, ctx_txn: np.ndarray | None,
+                 thresholds=THRESHOLDS) -> np.ndarray:
+    """Tier index into TIERS per row. A PROVEN score without enough
+    transaction terms drops to STRONG."""
+    cuts = np.asarray(thresholds)[::-1]                 # ascending
+    tier = len(TIERS) - 1 - np.searchsorted(cuts, scores, side='right')
+    if ctx_txn is not None:
+        tier = np.where((tier == 0) & (ctx_txn < PROVEN_MIN_TXN), 1, tier)
+    return tier
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# INPUTS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_table(db_path, table: str) -> tuple[np.ndarray, dict, np.ndarray | None]:
+    """(rowids, columns by alias, stored axes or None) from a SQLite table."""
+    if not IDENT_RE.fullmatch(table):
+        raise ValueError(f"bad table name {table!r}")
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        cols = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        if not cols:
+            raise ValueError(f"no table {table}")
+        picked = {alias: next((c for c in names if c in cols), None) for alias, names in COLUMN_ALIASES.items()}
+        picked = {alias: c for alias, c in picked.items() if c}
+        if 'context' not in picked:
+            raise ValueError(f"{table} has no context column ({', '.join(COLUMN_ALIASES['context'])})")
+        stored = [a for a in AXES if a in cols]
+        select = [f'"{c}"' for c in picked.values()] + [f'"{a}"' for a in stored]
+        rows = conn.execute(f'SELECT rowid, {", ".join(select)} FROM "{table}" ORDER BY rowid').fetchall()
+    finally:
+        conn.close()
+
+    columns = {alias: [r[i + 1] for r in rows] for i, alias in enumerate(picked)}
+    stored_axes = None
+    if len(stored) == len(AXES):
+        base = 1 + len(picked)
+        stored_axes = np.array([[r[base + i] or 0 for i in range(len(AXES))] for r in rows], dtype=np.int8)
+    return np.array([r[0] for r in rows], dtype=np.int64), columns, stored_axes
+
+
+def load_ledger(path) -> tuple[np.ndarray, dict, None]:
+    """Ledger rows that went through the audited scorer (a tier and a snippet)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        wires = json.load(f)
+    idx = [i for i, w in enumerate(wires) if w.get('tier')]
+    columns = {
+        'context': [wires[i].get('context_snippet') for i in idx],
+        'amount': [wires[i].get('amount') for i in idx],
+        'date': [wires[i].get('date') for i in idx],
+        'entity_from': [wires[i].get('entity_from') for i in idx],
+        'entity_to': [wires[i].get('entity_to') for i in idx],
+        'tier': [wires[i].get('tier') for i in idx],
+    }
+    return np.array(idx, dtype=np.int64), columns, None
+
+
+RESULT_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {RESULT_TABLE} (
+    source      TEXT NOT NULL,          -- table scored
+    src_rowid   INTEGER NOT NULL,
+    {" INTEGER NOT NULL, ".join(AXES)} INTEGER NOT NULL,
+    ctx_txn     INTEGER NOT NULL,
+    score       INTEGER NOT NULL,
+    tier        TEXT NOT NULL,
+    PRIMARY KEY (source, src_rowid)
+) WITHOUT ROWID
+'''
+
+
+def load_scores(db_path, table: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rowids, axes, ctx_txn) stored for table by an earlier --write."""
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(f'SELECT src_rowid, {", ".join(AXES)}, ctx_txn FROM {RESULT_TABLE} '
+                            f'WHERE source = ? ORDER BY src_rowid', (table,)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        raise ValueError(f"no stored scores for {table} (run with --write first)")
+    data = np.array(rows, dtype=np.int64)
+    return data[:, 0], data[:, 1:1 + len(AXES)].astype(np.int8), data[:, -1]
+
+
+def write_scores(db_path, table: str, rowids, axes, txn, scores, tiers):
+    conn = connect(db_path, dry_run=False)
+    with conn:
+        conn.execute(RESULT_SCHEMA)
+        conn.execute(f'DELETE FROM {RESULT_TABLE} WHERE source = ?', (table,))
+        conn.executemany(
+            f'INSERT INTO {RESULT_TABLE} VALUES (?, ?, {", ".join("?" * len(AXES))}, ?, ?, ?)',
+            ((table, rid, *ax, t, s, TIERS[k]) for rid, ax, t, s, k in
+             zip(rowids.tolist(), axes.tolist(), txn.tolist(), scores.tolist(), tiers.tolist())))
+    conn.close()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _distribution(tiers: np.ndarray) -> str:
+    counts = np.bincount(tiers, minlength=len(TIERS))
+    return ' · '.join(f"{name} {c:,}" for name, c in zip(TIERS, counts.tolist()) if c)
+
+
+def agreement(predicted: np.ndarray, stored: list) -> dict:
+    """{tier: (rows, exact share, within-one-tier share)} for each stored tier."""
+    truth = np.array([TIERS.index(t) if t in TIERS else -1 for t in stored])
+    result = {}
+    for k, name in enumerate(TIERS):
+        mask = truth == k
+        if mask.any():
+            pred = predicted[mask]
+            result[name] = (int(mask.sum()), float((pred == k).mean()), float((abs(pred - k) <= 1).mean()))
+    return result
+
+
+def below_bar(stats: dict) -> list[str]:
+    """Tiers whose agreement misses CHECK_BARS."""
+    return [name for name, (_, exact, near) in stats.items()
+            if name in CHECK_BARS and (exact < CHECK_BARS[name][0] or near < CHECK_BARS[name][1])]
+
+
+def _agreement(label: str, predicted: np.ndarray, stored: list) -> list[str]:
+    """Print agreement with the stored tiers; returns the tiers below their bar."""
+    known = np.array([t in TIERS for t in stored])
+    if not known.any():
+        return []
+    truth = np.array([TIERS.index(t) if t in TIERS else -1 for t in stored])[known]
+    pred = predicted[known]
+    print(f"  {label}: {int((pred == truth).sum()):,} of {len(truth):,} agree "
+          f"({(pred == truth).mean():.1%}), {int((pred < truth).sum()):,} recomputed higher")
+    stats = agreement(predicted, stored)
+    failed = below_bar(stats)
+    for k, name in enumerate(TIERS):
+        mask = truth == k
+        if mask.any():
+            got = np.bincount(pred[mask], minlength=len(TIERS))
+            _, exact, near = stats[name]
+            bar = (f"  (bar {CHECK_BARS[name][0]:.0%} / {CHECK_BARS[name][1]:.0%})"
+                   + (' ❌' if name in failed else '')) if name in CHECK_BARS else ''
+            print(f"    {name:<10} {exact:6.1%} exact · {near:6.1%} within one{bar}  → "
+                  + ' · '.join(f"{TIERS[j]} {c}" for j, c in enumerate(got.tolist()) if c))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Batch 5-axis confidence scoring and tier assignment'
+    )
+    parser.add_argument('--db', help='SQLite database')
+    parser.add_argument('--table', default=DEFAULT_TABLE, help=f'Table to score (default {DEFAULT_TABLE})')
+    parser.add_argument('--ledger', help='Score the audited rows of a ledger JSON instead')
+    parser.add_argument('--classification', default=DEFAULT_CLASSIFICATION,
+                        help=f'Entity classification JSON (default ./{DEFAULT_CLASSIFICATION})')
+    parser.add_argument('--thresholds', type=int, nargs=5, default=THRESHOLDS,
+                        metavar=('PROVEN', 'STRONG', 'MODERATE', 'WEAK', 'VERY_WEAK'),
+                        help=f'Minimum score per tier (default {" ".join(map(str, THRESHOLDS))})')
+    parser.add_argument('--retier', action='store_true',
+                        help=f'Re-cut tiers from the axes an earlier --write stored in {RESULT_TABLE} '
+                             f'(no text scan: for threshold experiments)')
+    parser.add_argument('--check', action='store_true', help='Compare with the stored tier column')
+    parser.add_argument('--write', action='store_true', help=f'Store scores in the {RESULT_TABLE} table')
+    parser.add_argument('--json', metavar='PATH', help='Write per-row axes, score and tier as JSON')
+    args = parser.parse_args()
+
+    thresholds = tuple(args.thresholds)
+    if list(thresholds) != sorted(thresholds, reverse=True):
+        parser.error('--thresholds must be in descending order')
+    if not args.db and not args.ledger:
+        parser.error('give --db or --ledger')
+    if args.retier and (args.ledger or args.check):
+        parser.error('--retier works on --db scores and cannot --check')
+
+    start = time.perf_counter()
+    try:
+        if args.retier:
+            rowids, axes, txn = load_scores(args.db, args.table)
+            columns, stored_axes = {}, None
+        else:
+            rowids, columns, stored_axes = (load_ledger(args.ledger) if args.ledger
+                                            else load_table(args.db, args.table))
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+    loaded = time.perf_counter()
+    if not args.retier:
+        quality = EntityQuality(EntityNormalizer.from_file(args.classification))
+        axes, txn = score_axes(columns, quality)
+    scores = weighted(axes)
+    tiers = assign_tiers(scores, txn, thresholds)
+    scored = time.perf_counter()
+
+    source = args.ledger or f"{args.db}:{args.table}"
+    print(f"━━━ 5-AXIS CONFIDENCE SCORER ━━━")
+    print(f"  Source:     {source} — {len(rowids):,} rows")
+    print(f"  Inputs:     " + (f"stored axes ({RESULT_TABLE})" if args.retier else
+                             ', '.join(a for a in COLUMN_ALIASES if a in columns and a != 'tier')))
+    print(f"  Thresholds: " + ' · '.join(f"{t} ≥ {c}" for t, c in zip(TIERS, thresholds)))
+    print(f"  Time:       {loaded - start:.2f}s load · {scored - loaded:.2f}s score")
+    print(f"{'━' * 60}")
+    print(f"  Tiers: {_distribution(tiers)}")
+    print(f"  Mean axis: " + ' · '.join(f"{a} {m:+.2f}" for a, m in zip(AXES, axes.mean(axis=0).tolist()))
+          if len(axes) else '')
+
+    failed = []
+    if args.check:
+        stored = columns.get('tier')
+        if stored is None:
+            print(f"\n  ⚠️  {args.table} has no tier column to check against")
+        else:
+            print()
+            if stored_axes is not None:
+                stored_txn = (np.array([v or 0 for v in columns['ctx_txn']]) if 'ctx_txn' in columns else None)
+                failed += _agreement('Stored axes → tier',
+                                     assign_tiers(weighted(stored_axes), stored_txn, thresholds), stored)
+            failed += _agreement('Recomputed axes → tier', tiers, stored)
+
+    if args.write:
+        if not args.db:
+            parser.error('--write needs --db')
+        write_scores(args.db, args.table, rowids, axes, txn, scores, tiers)
+        print(f"\n  ✅ Scores in {args.db}:{RESULT_TABLE}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{'rowid': r, **dict(zip(AXES, ax)), 'ctx_txn': t, 'score': s, 'tier': TIERS[k]}
+                       for r, ax, t, s, k in zip(rowids.tolist(), axes.tolist(), txn.tolist(),
+                                                 scores.tolist(), tiers.tolist())], f, indent=1)
+        print(f"\n  Scores: {args.json}")
+    if failed:
+        print(f"\n  ❌ Agreement below the bar for {', '.join(dict.fromkeys(failed))}")
+        sys.exit(1)
+    print(f"\n━━━ SCORING COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,12 +24,23 @@ Skips:
 Usage:
     python3 convert_links_new_tab.py --dir ./narratives --recursive
     python3 convert_links_new_tab.py --dir . --recursive --dry-run
+    python3 convert_links_new_tab.py --dir . --recursive --jobs 8
+    python3 convert_links_new_tab.py --dir . --recursive --no-cache
+    python3 convert_links_new_tab.py --dir . --recursive --profile
+    python3 convert_links_new_tab.py --watch              # narratives/ + docs/, on save
 """
 
 import re
 import argparse
+from collections import Counter
+from functools import partial
 from pathlib import Path
 
+from file_batch import add_jobs_argument
+from link_cache import LinkCache, add_cache_arguments, content_hash, decode_text, source_version
+from link_profile import Profiler, add_profile_argument, map_profiled, timed
+from link_watch import add_watch_argument, md_files, watch, watch_roots
+
 # Match markdown links: [text](url)
 # But only external ones (http:// or https://)
 # EXCLUDES image syntax: ![alt](url) and badge links: [![badge](img)](url)
@@ -38,10 +49,18 @@ MD_LINK_RE = re.compile(
 )
 
 
-def convert_external_links(text: str) -> tuple[str, int]:
+def _skip(stats: Counter, reason: str, line: str):
+    """Profiling: count the external links on a line left as-is."""
+    n = len(MD_LINK_RE.findall(line))
+    stats['matches'] += n
+    stats[reason] += n
+
+
+def convert_external_links(text: str, stats: Counter | None = None) -> tuple[str, int]:
     """
     Convert markdown [text](https://...) to <a href="..." target="_blank">text</a>.
-    Returns (modified_text, count).
+    Returns (modified_text, count). stats, if given, collects match / link
+    counts and links left alone inside fences or <a> lines (--profile).
     """
     count = 0
     
@@ -58,11 +77,15 @@ def convert_external_links(text: str) -> tuple[str, int]:
             continue
         
         if in_code_block:
+            if stats is not None:
+                _skip(stats, 'fence', line)
             result_lines.append(line)
             continue
         
         # Skip lines that are already HTML <a> tags
         if '<a href=' in line and 'target="_blank"' in line:
+            if stats is not None:
+                _skip(stats, 'anchor', line)
             result_lines.append(line)
             continue
         
@@ -79,23 +102,75 @@ def convert_external_links(text: str) -> tuple[str, int]:
         converted_line = MD_LINK_RE.sub(replace_link, line)
         result_lines.append(converted_line)
     
+    if stats is not None:
+        stats['matches'] += count
+        stats['links'] += count
     return '\n'.join(result_lines), count
 
 
+def process_file_cached(item: tuple[Path, str | None], dry_run: bool = False,
+                        profile=None) -> tuple[int, str | None, bool]:
+    """Process a single .md file unless its content hash matches the one
+    recorded when it was last left clean. item is (file_path, clean_hash).
+    Returns (count, new_clean_hash, cache_hit); new_clean_hash is None when
+    the file still has links to convert (dry run).
+    profile is a link_profile.FileProfile under --profile."""
+    file_path, clean_hash = item
+    with timed(profile, 'read'):
+        data = Path(file_path).read_bytes()
+        digest = content_hash(data)
+    if profile:
+        profile.bytes_read = len(data)
+    if digest == clean_hash:
+        if profile:
+            profile.cache_hit = True
+        return 0, digest, True
+
+    with timed(profile, 'convert') as stats:
+        modified, count = convert_external_links(decode_text(data), stats)
+
+    if count > 0:
+        if dry_run:
+            return count, None, False
+        with timed(profile, 'write'):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(modified)
+            encoded = modified.encode('utf-8')
+            digest = content_hash(encoded)
+        if profile:
+            profile.bytes_written = len(encoded)
+
+    return count, digest, False
+
+
 def process_file(file_path: Path, dry_run: bool = False) -> int:
     """Process a single .md file. Returns count of conversions."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        original = f.read()
-    
-    modified, count = convert_external_links(original)
-    
-    if count > 0 and not dry_run:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(modified)
-    
+    count, _, _ = process_file_cached((file_path, None), dry_run)
     return count
 
 
+def run_batch(files: list[Path], cache, worker, profiler, dry_run: bool,
+              jobs: int = 1, watching: bool = False) -> tuple[int, int]:
+    """Convert files, print one line per file and record results in the
+    cache. Returns (links converted, files changed). Under --watch only
+    files that needed work are printed."""
+    items = [(f, cache.clean_hash(f)) for f in files]
+    results = map_profiled(worker, items, jobs, profiler)
+
+    total = 0
+    changed = 0
+    for f, (n, clean_hash, hit) in zip(files, results):
+        cache.mark_clean(f, clean_hash, hit)
+        if n > 0:
+            verb = "Would convert" if dry_run else "Converted"
+            print(f"  🔗 {f.name}: {verb} {n} links → target=\"_blank\"")
+            total += n
+            changed += 1
+        elif not watching:
+            print(f"  ✅ {f.name}: No external links to convert")
+    return total, changed
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Convert external markdown links to HTML <a target="_blank"> tags'
@@ -103,13 +178,20 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--dir', help='Directory of .md files')
     group.add_argument('--file', help='Single .md file')
+    add_watch_argument(group, parser)
     parser.add_argument('--dry-run', action='store_true')
     parser.add_argument('--recursive', '-r', action='store_true')
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
 
     files = []
     if args.file:
         files = [Path(args.file)]
+    elif args.watch is not None:
+        roots = watch_roots(args.watch)
+        files = md_files(roots, args.recursive)
     else:
         p = Path(args.dir)
         files = sorted(p.rglob('*.md') if args.recursive else p.glob('*.md'))
@@ -119,18 +201,25 @@ def main():
     print(f"  Files: {len(files)}")
     print(f"{'━' * 55}\n")
 
-    total = 0
-    for f in files:
-        n = process_file(f, args.dry_run)
-        if n > 0:
-            verb = "Would convert" if args.dry_run else "Converted"
-            print(f"  🔗 {f.name}: {verb} {n} links → target=\"_blank\"")
-            total += n
-        else:
-            print(f"  ✅ {f.name}: No external links to convert")
+    cache = LinkCache.open(args, 'convert_links_new_tab', source_version(__file__))
+    profiler = Profiler.open(args, 'convert_links_new_tab')
+    worker = partial(process_file_cached, dry_run=args.dry_run)
+    total, _ = run_batch(files, cache, worker, profiler, args.dry_run, args.jobs)
 
     print(f"\n{'━' * 55}")
     print(f"  Total: {total} links {'would be' if args.dry_run else ''} converted")
+    if cache.hits:
+        print(f"  Unchanged (cached): {cache.hits} files skipped")
+    cache.save()
+
+    if args.watch is not None:
+        def handle_batch(batch):
+            _, batch_changed = run_batch(batch, cache, worker, profiler, args.dry_run, watching=True)
+            cache.save()
+            return batch_changed
+        watch(roots, handle_batch, args)
+
+    profiler.report()
     if args.dry_run and total > 0:
         print(f"  Run without --dry-run to apply.")
     print(f"━━━ COMPLETE ━━━")
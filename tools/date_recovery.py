@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+date_recovery.py — Date recovery from context snippets (METHODOLOGY.md, Phase 25)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Phase 25 recovered dates for undated wires from the text around them.
+This is that step as code. For each row:
+
+  1. every date in the snippet is found by one precompiled regex
+     (2014-05-21 · 5/21/2014 · 5/21/14 · May 21, 2014 · 21 May 2014)
+     and normalized to ISO; impossible or out-of-range dates are dropped
+  2. each date is scored by its distance in characters to the row's own
+     amount ("$698,000") and to its entity names ("Indyke")
+  3. the best-scoring date wins
+
+  method      <source>_proximity      anchored by the amount
+              <source>_entity_match   anchored by an entity name
+              <source>_first_date     no anchor; nearest the snippet start
+  confidence  HIGH ≥ 0.6 · MEDIUM ≥ 0.3 · LOW
+
+Source prefixes follow the ledger's date_recovery_method values
+(fund_flows → fund_flows_context, fund_flows_audited → audited_snippet).
+
+Rows are read in batches and recovered across a process pool (--jobs).
+With --write, results go to a `date_recovery` table in the same database
+(one row per source row, replaced on re-run); source tables are never
+modified. --ledger instead re-recovers the master ledger's snippets and
+reports agreement with the dates it already carries.
+
+Usage:
+    python3 date_recovery.py --db ./epstein.db
+    python3 date_recovery.py --db ./epstein.db --undated-only --write --jobs 0
+    python3 date_recovery.py --db ./epstein.db --target fund_flows.context --json recovered.json
+    python3 date_recovery.py --ledger data/master_wire_ledger_phase25.json
+"""
+
+import re
+import math
+import json
+import time
+import argparse
+from collections import Counter
+from datetime import date
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import NamedTuple
+
+from entity_normalizer import fold
+from file_batch import add_jobs_argument, map_files
+from ledger_store import parse_date
+from linkify_db import connect, parse_target
+from wire_dedup import to_cents
+
+DEFAULT_TARGETS = ['fund_flows.context', 'fund_flows_audited.context_snippet']
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_YEARS = (1980, 2030)
+RESULT_TABLE = 'date_recovery'
+METHOD_PREFIX = {
+    'fund_flows': 'fund_flows_context',
+    'fund_flows_audited': 'audited_snippet',
+}
+AMOUNT_SCALE = 60       # chars; amount anchor weight falls to 1/e at this distance
+ENTITY_SCALE = 120
+ENTITY_WEIGHT = 0.6
+UNANCHORED_SCORE = 0.2
+CONFIDENCE_BANDS = ((0.6, 'HIGH'), (0.3, 'MEDIUM'), (0.0, 'LOW'))
+
+_MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+_MONTH_RE = (r'\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+             r'|sep(?:t|tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?')
+DATE_RE = re.compile(
+    r'(?<![\d/.-])(?:'
+    r'(?P<iy>(?:19|20)\d{2})-(?P<im>\d{1,2})-(?P<id>\d{1,2})'
+    r'|(?P<um>\d{1,2})/(?P<ud>\d{1,2})/(?P<uy>\d{4}|\d{2})'
+    rf'|(?P<mn>{_MONTH_RE})\s+(?P<md>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<my>\d{{4}})'
+    rf'|(?P<dd>\d{{1,2}})\s+(?P<dn>{_MONTH_RE}),?\s+(?P<dy>\d{{4}})'
+    r')(?![\d/])',
+    re.IGNORECASE)
+AMOUNT_RE = re.compile(r'\$?\s?(?<![\d.,])(\d{1,3}(?:,\d{3})+|\d+)(\.\d{2})?(?![\d,]*\d)')
+ENTITY_STOPWORDS = frozenset(
+    'inc llc ltd corp company trust account accounts bank the and of for c o '
+    'checking savings fund group holdings partners management unknown dbagny'.split())
+MIN_ENTITY_TOKEN = 4
+
+
+class Recovery(NamedTuple):
+    date: str           # ISO 8601
+    method: str
+    confidence: str     # HIGH / MEDIUM / LOW
+    score: float
+    offset: int         # character offset of the date in the snippet
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# EXTRACTION
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _month(name: str) -> int:
+    return _MONTHS.index(name[:3].lower()) + 1
+
+
+def normalize_date(m: re.Match, years=DEFAULT_YEARS) -> str | None:
+    """A DATE_RE match → 'YYYY-MM-DD', or None if it isn't a real date in range."""
+    g = m.groupdict()
+    try:
+        if g['iy']:
+            y, mo, d = int(g['iy']), int(g['im']), int(g['id'])
+        elif g['uy']:
+            y, mo, d = int(g['uy']), int(g['um']), int(g['ud'])
+            if len(g['uy']) == 2:
+                y += 2000 if y < 50 else 1900
+        elif g['my']:
+            y, mo, d = int(g['my']), _month(g['mn']), int(g['md'])
+        else:
+            y, mo, d = int(g['dy']), _month(g['dn']), int(g['dd'])
+        if not years[0] <= y <= years[1]:
+            return None
+        return date(y, mo, d).isoformat()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1 << 14)
+def entity_pattern(*names: str) -> re.Pattern | None:
+    """Regex over the distinctive words of the row's entity names."""
+    tokens = {t for name in names if name for t in fold(name).split()
+              if len(t) >= MIN_ENTITY_TOKEN and t not in ENTITY_STOPWORDS}
+    if not tokens:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(tokens, key=len, reverse=True)))
+                      + r')\b', re.IGNORECASE)
+
+
+def _gap(a: tuple[int, int], b: tuple[int, int]) -> int:
+    """Characters between two spans (0 if they touch or overlap)."""
+    return max(0, b[0] - a[1], a[0] - b[1])
+
+
+def recover(snippet: str, cents: int | None, entities: tuple[str, ...], prefix: str,
+            years=DEFAULT_YEARS) -> Recovery | None:
+    """Best-anchored date in snippet for a row of the given amount and entities."""
+    if not snippet:
+        return None
+    dates = [(iso, m.span()) for m in DATE_RE.finditer(snippet)
+             if (iso := normalize_date(m, years))]
+    if not dates:
+        return None
+
+    amounts = []
+    if cents:
+        for m in AMOUNT_RE.finditer(snippet):
+            value = to_cents(m.group(1).replace(',', '') + (m.group(2) or ''))
+            if value == cents:
+                amounts.append(m.span())
+    pattern = entity_pattern(*entities)
+    names = [m.span() for m in pattern.finditer(snippet)] if pattern else []
+
+    best = None
+    for iso, span in dates:
+        score, kind = UNANCHORED_SCORE * math.exp(-span[0] / len(snippet)), 'first_date'
+        if amounts:
+            s = math.exp(-min(_gap(span, a) for a in amounts) / AMOUNT_SCALE)
+            if s > score:
+                score, kind = s, 'proximity'
+        if names:
+            s = ENTITY_WEIGHT * math.exp(-min(_gap(span, n) for n in names) / ENTITY_SCALE)
+            if s > score:
+                score, kind = s, 'entity_match'
+        if best is None or score > best[0]:
+            best = (score, kind, iso, span[0])
+
+    score, kind, iso, offset = best
+    confidence = next(label for floor, label in CONFIDENCE_BANDS if score >= floor)
+    return Recovery(iso, f"{prefix}_{kind}", confidence, round(score, 4), offset)
+
+
+def recover_batch(rows: list[tuple], prefix: str, years=DEFAULT_YEARS) -> list[tuple]:
+    """[(rowid, snippet, cents, entity_from, entity_to)] → [(rowid, Recovery)]
+    for rows where a date was found. Runs in worker processes."""
+    out = []
+    for rowid, snippet, cents, frm, to in rows:
+        found = recover(snippet, cents, (frm, to), prefix, years)
+        if found:
+            out.append((rowid, found))
+    return out
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# DATABASE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+RESULT_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {RESULT_TABLE} (
+    source      TEXT NOT NULL,          -- table.column scanned
+    src_rowid   INTEGER NOT NULL,
+    date        TEXT NOT NULL,          -- ISO 8601
+    method      TEXT NOT NULL,
+    confidence  TEXT NOT NULL,
+    score       REAL NOT NULL,
+    PRIMARY KEY (source, src_rowid)
+) WITHOUT ROWID
+'''
+
+
+def read_batches(conn, table: str, column: str, batch_size: int,
+                 undated_only: bool) -> list[list[tuple]]:
+    """Rows with a snippet, as recover_batch input, in rowid order."""
+    cols = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+    if column not in cols:
+        raise ValueError(f"{table} has no column {column}")
+    amount = next((c for c in ('amount', 'extracted_amount') if c in cols), None)
+    date_col = next((c for c in ('date', 'date_ref') if c in cols), None)
+    select = ', '.join([f'"{column}"',
+                        f'"{amount}"' if amount else 'NULL',
+                        '"entity_from"' if 'entity_from' in cols else 'NULL',
+                        '"entity_to"' if 'entity_to' in cols else 'NULL'])
+    where = f'"{column}" IS NOT NULL AND "{column}" != \'\''
+    if undated_only and date_col:
+        where += f' AND ("{date_col}" IS NULL OR "{date_col}" = \'\')'
+
+    batches, last = [], -1
+    while True:
+        rows = conn.execute(f'SELECT rowid, {select} FROM "{table}" WHERE rowid > ? AND {where} '
+                            f'ORDER BY rowid LIMIT ?', (last, batch_size)).fetchall()
+        if not rows:
+            return batches
+        batches.append([(rid, text if isinstance(text, str) else str(text), to_cents(amt), frm, to)
+                        for rid, text, amt, frm, to in rows])
+        last = rows[-1][0]
+
+
+def write_results(conn, source: str, results: list[tuple]):
+    with conn:
+        conn.execute(RESULT_SCHEMA)
+        conn.execute(f'DELETE FROM {RESULT_TABLE} WHERE source = ?', (source,))
+        conn.executemany(f'INSERT INTO {RESULT_TABLE} VALUES (?, ?, ?, ?, ?, ?)',
+                         [(source, rowid, r.date, r.method, r.confidence, r.score)
+                          for rowid, r in results])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _summarize(results: list[tuple]) -> str:
+    conf = Counter(r.confidence for _, r in results)
+    return ' · '.join(f"{label} {conf[label]:,}" for _, label in CONFIDENCE_BANDS)
+
+
+def check_ledger(path, years) -> None:
+    """Re-recover ledger snippets and compare with the dates already there."""
+    with open(path, 'r', encoding='utf-8') as f:
+        wires = json.load(f)
+    rows = [(i, w['context_snippet'], to_cents(w['amount']), w['entity_from'], w['entity_to'])
+            for i, w in enumerate(wires) if w.get('context_snippet')]
+    found = dict(recover_batch(rows, 'ledger_snippet', years))
+
+    agree = disagree = new = phase25 = matched = 0
+    for i, w in enumerate(wires):
+        was_recovered = bool(w.get('is_date_recovery') and w.get('date_recovery_method'))
+        phase25 += was_recovered
+        r = found.get(i)
+        if not r:
+            continue
+        if not w.get('date'):
+            new += 1
+            continue
+        try:
+            same = parse_date(w['date']) == parse_date(r.date)
+        except ValueError:
+            same = False
+        agree += same
+        disagree += not same
+        matched += same and was_recovered
+
+    print(f"━━━ LEDGER CHECK ━━━")
+    print(f"  Snippets:   {len(rows)} of {len(wires)} wires")
+    print(f"  Recovered:  {len(found)} ({_summarize(list(found.items()))})")
+    print(f"  vs ledger:  {agree} agree · {disagree} differ · {new} undated in ledger")
+    print(f"  Phase 25 snippet recoveries reproduced: {matched} of {phase25}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Recover wire dates from context snippets (Phase 25)'
+    )
+    parser.add_argument('--db', type=Path, help='SQLite database')
+    parser.add_argument('--target', action='append', metavar='TABLE.COLUMN',
+                        help=f'Snippet column, repeatable (default: {", ".join(DEFAULT_TARGETS)})')
+    parser.add_argument('--ledger', help='Check recovery against this ledger JSON instead')
+    parser.add_argument('--undated-only', action='store_true',
+                        help='Only rows whose date / date_ref column is empty')
+    parser.add_argument('--years', type=int, nargs=2, default=DEFAULT_YEARS, metavar=('MIN', 'MAX'),
+                        help=f'Plausible year range (default {DEFAULT_YEARS[0]} {DEFAULT_YEARS[1]})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows per worker batch (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--write', action='store_true',
+                        help=f'Store results in the {RESULT_TABLE} table')
+    parser.add_argument('--json', metavar='PATH', help='Write every recovery as JSON')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    years = tuple(args.years)
+    if args.ledger:
+        check_ledger(args.ledger, years)
+        return
+    if not args.db:
+        parser.error('give --db (or --ledger)')
+    try:
+        targets = [parse_target(t) for t in (args.target or DEFAULT_TARGETS)]
+    except ValueError as e:
+        parser.error(str(e))
+
+    conn = connect(args.db, dry_run=not args.write)
+    print(f"━━━ DATE RECOVERY ━━━")
+    print(f"  Database: {args.db}{' (undated rows only)' if args.undated_only else ''}")
+    print(f"{'━' * 60}")
+
+    report = {}
+    for table, column in targets:
+        source = f"{table}.{column}"
+        start = time.perf_counter()
+        try:
+            batches = read_batches(conn, table, column, args.batch_size, args.undated_only)
+        except ValueError as e:
+            print(f"  ⚠️  {source}: {e}")
+            continue
+        prefix = METHOD_PREFIX.get(table, table)
+        results = [r for batch in map_files(partial(recover_batch, prefix=prefix, years=years),
+                                            batches, args.jobs) for r in batch]
+        elapsed = time.perf_counter() - start
+        scanned = sum(len(b) for b in batches)
+        print(f"  📅 {source}: {len(results):,} of {scanned:,} rows dated in {elapsed:.2f}s "
+              f"({_summarize(results)})")
+        if args.write:
+            write_results(conn, source, results)
+        report[source] = [{'rowid': rowid, **r._asdict()} for rowid, r in results]
+
+    conn.close()
+    if args.write:
+        print(f"\n  ✅ Results in {args.db}:{RESULT_TABLE}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"\n  Recoveries: {args.json}")
+    print(f"\n━━━ RECOVERY COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+efta_core — Shared EFTA core: dataset resolver, patterns, link builders
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+One copy of what the link CLIs (linkify_efta.py, inject_efta_source_table.py,
+convert_links_new_tab.py, link_pipeline.py) used to carry each:
+
+  efta_core           Phase 5E dataset ranges and the EFTA → Dataset resolver
+  efta_core.patterns  precompiled EFTA / Dataset reference regexes (LINKIFY_RE …)
+  efta_core.links     DOJ URL builders and memoized anchor builders
+                      (pdf_link, browse_link, efta_to_md_link, …)
+
+The tools run from git hooks and per-file watchers, so start-up is most
+of their cost. Importing efta_core loads only the resolver (array +
+bisect); patterns and links are imported on first use of one of their
+names, e.g. `from efta_core import pdf_link` loads efta_core.links.
+
+Scalar lookups bisect over the sorted range starts (O(log n)). The batch
+entry point resolves a whole column of serials — e.g. `files.efta_number`
+pulled into a NumPy array or an array('I') — with one np.searchsorted call.
+
+Serials that fall between two datasets resolve to GAP (0). The scalar
+efta_to_dataset() keeps its historical contract and returns None instead.
+
+Usage:
+    from efta_core import efta_to_dataset, efta_to_dataset_batch, pdf_link
+    efta_to_dataset(27019)                          # → 8
+    efta_to_dataset_batch(array('I', [27019, 3900]))  # → array([8, 0])
+    pdf_link('EFTA00027019')                        # → '<a href="…/DataSet%208/EFTA00027019.pdf" …'
+"""
+
+import importlib
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# DATASET RANGES — from Phase 5E production scan
+# Same ranges used in the Redaction Map v18 notebook
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+DATASET_RANGES = [
+    # (dataset_number, efta_start, efta_end)
+    (1,  1,        3158),
+    (2,  3159,     3857),
+    (3,  3858,     5586),
+    (4,  5705,     8320),
+    (5,  8409,     8528),
+    (6,  8529,     8998),
+    (7,  9016,     9664),
+    (8,  9676,     39023),
+    (9,  39025,    1262781),
+    (10, 1262782,  2205654),
+    (11, 2205655,  2730264),
+    (12, 2730265,  2731783),
+]
+
+# Dataset number for serials in an inter-dataset gap (DOJ datasets start at 1)
+GAP = 0
+
+_SORTED = sorted(DATASET_RANGES, key=lambda r: r[1])
+_DS = [ds for ds, _, _ in _SORTED]
+_STARTS = [start for _, start, _ in _SORTED]
+_ENDS = [end for _, _, end in _SORTED]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# SCALAR RESOLVER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def resolve_dataset(efta_num: int) -> int:
+    """Map EFTA serial number to DOJ Dataset number, or GAP."""
+    i = bisect_right(_STARTS, efta_num) - 1
+    if i < 0 or efta_num > _ENDS[i]:
+        return GAP
+    return _DS[i]
+
+
+def efta_to_dataset(efta_num: int) -> int | None:
+    """Map EFTA serial number to DOJ Dataset number."""
+    ds = resolve_dataset(efta_num)
+    return None if ds == GAP else ds  # None: falls in inter-dataset gap
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BATCH RESOLVER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def efta_to_dataset_batch(serials):
+    """Resolve many serials at once. Accepts a NumPy integer array,
+    array('I') or any sequence of ints.
+
+    Returns a NumPy uint8 array of dataset numbers (GAP where a serial
+    falls between datasets). Without NumPy installed, falls back to a
+    bisect loop and returns array('B') with the same values."""
+    try:
+        import numpy as np
+    except ImportError:
+        return array('B', (resolve_dataset(n) for n in serials))
+
+    nums = np.asarray(serials, dtype=np.int64)
+    idx = np.searchsorted(np.asarray(_STARTS, dtype=np.int64), nums, side='right') - 1
+    safe = np.clip(idx, 0, None)
+    out = np.asarray(_DS, dtype=np.uint8)[safe]
+    out[(idx < 0) | (nums > np.asarray(_ENDS, dtype=np.int64)[safe])] = GAP
+    return out
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# LAZY SUBMODULES
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_LAZY = {
+    'patterns': ('EFTA_RE', 'DATASET_SINGLE_RE', 'DS_SHORT_RE', 'DATASETS_COMPOUND_RE',
+                 'DIGITS_RE', 'LINKIFY_RE'),
+    'links': ('doj_url_files', 'doj_url_dataset_page', 'efta_to_md_link', 'dataset_to_md_link',
+              'pdf_link', 'browse_link', 'ext_link'),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY.items() for name in names}
+
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def sources() -> list[Path]:
+    """Source files of the package, for link_cache.source_version()."""
+    here = Path(__file__).parent
+    return [here / '__init__.py'] + [here / f'{module}.py' for module in _LAZY]
@@ -0,0 +1,69 @@
+"""
+efta_core.links — DOJ URL builders and memoized anchor builders
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+URL logic from the Phase 5E Redaction Map v18 notebook, shared by
+linkify_efta.py and inject_efta_source_table.py:
+
+  doj_url_files(serial, ds)      → Direct PDF on justice.gov
+  doj_url_dataset_page(ds)       → Dataset browse page on DOJ
+
+Anchors open in a new tab. Narratives cite the same few serials and
+datasets over and over, so serial → anchor and (label, dataset) → anchor
+are lru_cached; the EFTA cache is bounded because --stream runs see
+millions of distinct serials.
+"""
+
+from functools import lru_cache
+
+from efta_core import efta_to_dataset
+
+EFTA_LINK_CACHE = 1 << 16
+
+
+def doj_url_files(serial, ds):
+    """Direct PDF link on DOJ (confirmed working).
+    From Phase 5E Redaction Map v18 notebook."""
+    if serial is None or ds is None:
+        return None
+    return f"https://www.justice.gov/epstein/files/DataSet%20{ds}/EFTA{int(serial):08d}.pdf"
+
+
+def doj_url_dataset_page(ds):
+    """Dataset browse page on DOJ — readers can see neighboring files.
+    From Phase 5E Redaction Map v18 notebook."""
+    if ds is None:
+        return None
+    return f"https://www.justice.gov/epstein/doj-disclosures/data-set-{ds}-files"
+
+
+@lru_cache(maxsize=EFTA_LINK_CACHE)
+def efta_to_md_link(efta_id: str) -> str | None:
+    """Convert 'EFTA00027019' → '<a href="https://...pdf" target="_blank">EFTA00027019</a>'.
+    None when the serial falls in an inter-dataset gap."""
+    num = int(efta_id.replace("EFTA", ""))
+    url = doj_url_files(num, efta_to_dataset(num))
+    if url is None:
+        return None
+    return f'<a href="{url}" target="_blank">{efta_id}</a>'
+
+
+@lru_cache(maxsize=None)
+def dataset_to_md_link(display_text: str, ds_num: int) -> str:
+    """Convert 'Dataset 9' → '<a href="https://...browse-page" target="_blank">Dataset 9</a>'"""
+    url = doj_url_dataset_page(ds_num)
+    return f'<a href="{url}" target="_blank">{display_text}</a>'
+
+
+def pdf_link(efta_id: str) -> str:
+    """<a href> to DOJ PDF, opens new tab; the bare ID if it has no dataset."""
+    return efta_to_md_link(efta_id) or efta_id
+
+
+def browse_link(ds: int, label: str | None = None) -> str:
+    """<a href> to DOJ Dataset browse page, opens new tab."""
+    return dataset_to_md_link(label or f"Dataset {ds}", ds)
+
+
+def ext_link(url: str, label: str) -> str:
+    """External reference link."""
+    return f'<a href="{url}" target="_blank">{label}</a>'
@@ -0,0 +1,41 @@
+"""
+efta_core.patterns — Precompiled EFTA / Dataset reference patterns
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Compiled once per process and shared by linkify_efta.py (linking) and
+inject_efta_source_table.py (reference scan for --derive).
+"""
+
+import re
+
+# EFTA pattern: EFTA followed by 7-8 digits
+EFTA_RE = re.compile(r'EFTA\d{7,8}')
+
+# Dataset patterns: "Dataset 9", "Datasets 8, 9, and 11", "DS8", "Data Set 10"
+# We match individual dataset refs, not the compound "Datasets X, Y, and Z"
+DATASET_SINGLE_RE = re.compile(
+    r'(?:Dataset|Data\s+Set)\s+(\d{1,2})',
+    re.IGNORECASE
+)
+DS_SHORT_RE = re.compile(r'\bDS(\d{1,2})\b')
+
+# Compound "Datasets 8, 9, and 11" or "Datasets 8, 9, 11" — each number
+# inside it gets its own browse link
+DATASETS_COMPOUND_RE = re.compile(
+    r'(Datasets?\s+)(\d{1,2}(?:\s*,\s*(?:and\s+)?\d{1,2})*(?:\s*,?\s*and\s+\d{1,2})?)',
+    re.IGNORECASE
+)
+DIGITS_RE = re.compile(r'\d+')
+
+# Single-pass tokenizer: one alternation of all four patterns above.
+# Alternation order matters — compound is tried before single so that
+# "Datasets 8, 9, and 11" is claimed whole; a compound that doesn't qualify
+# (one number, or a number outside 1–12) falls back to DATASET_SINGLE_RE
+# at the same offset, exactly like the old pass order did.
+LINKIFY_RE = re.compile(
+    r'(?=[EDd])'  # every alternative starts with E, D or d
+    r'(?:(?P<efta>EFTA\d{7,8})'
+    r'|(?P<compound>(?i:Datasets?\s+)'
+    r'(?P<nums>(?i:\d{1,2}(?:\s*,\s*(?:and\s+)?\d{1,2})*(?:\s*,?\s*and\s+\d{1,2})?)))'
+    r'|(?P<single>(?i:(?:Dataset|Data\s+Set)\s+)(?P<single_num>\d{1,2}))'
+    r'|(?P<short>\bDS(?P<short_num>\d{1,2})\b))'
+)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+efta_index.py — Inverted EFTA reference index
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Answers "which narratives, docs and ledger rows cite EFTA00027019?" without
+grepping everything. Scans:
+
+    narratives/*.md
+    docs/*.md
+    data/master_wire_ledger_phase25.json   (context_snippet of every wire)
+
+and keeps a persistent SQLite index of
+
+    EFTA serial → (path, line, offset, dataset)
+
+line is 1-based for .md files and the wire's position in the ledger array
+for ledger rows; offset is the character offset within that line/snippet.
+A linked ID — [EFTA00027019](…/EFTA00027019.pdf), or
+<a href="…results?query=EFTA00584904">EFTA00584904</a> — counts once: the
+copy inside the link target is not a separate citation.
+
+The index is refreshed incrementally before every query. A source whose
+size and mtime are unchanged is skipped outright; one whose content hash
+is unchanged only has its stat refreshed; otherwise its rows are replaced.
+Sources that have disappeared are dropped. refs is a WITHOUT ROWID table
+clustered on serial, so a serial or range lookup is one B-tree seek.
+
+Usage:
+    python3 efta_index.py --update
+    python3 efta_index.py EFTA00027019
+    python3 efta_index.py 27019
+    python3 efta_index.py EFTA00009000-EFTA00040000
+    python3 efta_index.py --summary
+"""
+
+import re
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+
+from efta_core import resolve_dataset
+from link_cache import content_hash, decode_text
+
+DEFAULT_INDEX_FILE = '.efta_index.db'
+DEFAULT_NARRATIVES_DIR = 'narratives'
+DEFAULT_DOCS_DIR = 'docs'
+DEFAULT_LEDGER = 'data/master_wire_ledger_phase25.json'
+
+# An EFTA citation — not the repeat of the ID inside a DOJ PDF URL path.
+# href="…" attributes and markdown ](…) targets match without a serial, so
+# IDs inside them (e.g. a search ?query=EFTA…) are consumed and skipped.
+CITE_RE = re.compile(
+    r'href=(?:"[^"]*"|\'[^\']*\')|\]\([^)\s]*\)|(?<!/)EFTA(\d{7,8})')
+SERIAL_ARG_RE = re.compile(r'(?:EFTA)?(\d{1,8})', re.IGNORECASE)
+
+# Bumped whenever extraction changes; an index built by an older scanner is
+# emptied on open so every source is rescanned.
+SCAN_VERSION = 2
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sources (
+    source_id  INTEGER PRIMARY KEY,
+    path       TEXT NOT NULL UNIQUE,
+    kind       TEXT NOT NULL,           -- narrative / doc / ledger
+    size       INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    hash       TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    serial     INTEGER NOT NULL,
+    source_id  INTEGER NOT NULL REFERENCES sources(source_id) ON DELETE CASCADE,
+    line       INTEGER NOT NULL,
+    offset     INTEGER NOT NULL,
+    dataset    INTEGER NOT NULL,        -- efta_core.GAP (0) between datasets
+    PRIMARY KEY (serial, source_id, line, offset)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refs_by_source ON refs(source_id);
+'''
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# EXTRACTION
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def scan_text(text: str) -> list[tuple[int, int, int]]:
+    """(serial, line, offset) for every citation in a text file."""
+    refs = []
+    for line_no, line in enumerate(text.split('\n'), 1):
+        if 'EFTA' not in line:
+            continue
+        for m in CITE_RE.finditer(line):
+            if m.group(1):
+                refs.append((int(m.group(1)), line_no, m.start()))
+    return refs
+
+
+def scan_ledger(text: str) -> list[tuple[int, int, int]]:
+    """(serial, row, offset) for every citation in the ledger's context_snippet fields."""
+    refs = []
+    for row, wire in enumerate(json.loads(text)):
+        snippet = wire.get('context_snippet') or ''
+        for m in CITE_RE.finditer(snippet):
+            if m.group(1):
+                refs.append((int(m.group(1)), row, m.start()))
+    return refs
+
+
+SCANNERS = {
+    'narrative': scan_text,
+    'doc': scan_text,
+    'ledger': scan_ledger,
+}
+
+
+def collect_sources(narratives_dir, docs_dir, ledger) -> list[tuple[Path, str]]:
+    """(path, kind) for every source that exists, in a stable order."""
+    sources = []
+    for directory, kind in ((narratives_dir, 'narrative'), (docs_dir, 'doc')):
+        if directory and Path(directory).is_dir():
+            sources += [(p, kind) for p in sorted(Path(directory).glob('*.md'))]
+    if ledger and Path(ledger).is_file():
+        sources.append((Path(ledger), 'ledger'))
+    return sources
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# INDEX
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def open_index(index_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(index_path)
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    if conn.execute('PRAGMA user_version').fetchone()[0] != SCAN_VERSION:
+        with conn:
+            conn.execute('DELETE FROM refs')
+            conn.execute('DELETE FROM sources')
+        conn.execute(f'PRAGMA user_version = {SCAN_VERSION}')
+    return conn
+
+
+def update_index(conn: sqlite3.Connection, sources: list[tuple[Path, str]]) -> dict:
+    """Bring the index in line with sources. Returns counts of
+    unchanged / updated / removed sources."""
+    known = {path: (sid, size, mtime, digest) for sid, path, size, mtime, digest
+             in conn.execute('SELECT source_id, path, size, mtime_ns, hash FROM sources')}
+    stats = {'unchanged': 0, 'updated': 0, 'removed': 0}
+
+    with conn:
+        for path, kind in sources:
+            key = path.as_posix()
+            st = path.stat()
+            entry = known.pop(key, None)
+            if entry and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+                stats['unchanged'] += 1
+                continue
+
+            data = path.read_bytes()
+            digest = content_hash(data)
+            if entry and entry[3] == digest:
+                conn.execute('UPDATE sources SET size = ?, mtime_ns = ? WHERE source_id = ?',
+                             (st.st_size, st.st_mtime_ns, entry[0]))
+                stats['unchanged'] += 1
+                continue
+
+            if entry:
+                sid = entry[0]
+                conn.execute('DELETE FROM refs WHERE source_id = ?', (sid,))
+                conn.execute('UPDATE sources SET kind = ?, size = ?, mtime_ns = ?, hash = ? '
+                             'WHERE source_id = ?', (kind, st.st_size, st.st_mtime_ns, digest, sid))
+            else:
+                sid = conn.execute('INSERT INTO sources (path, kind, size, mtime_ns, hash) '
+                                   'VALUES (?, ?, ?, ?, ?)',
+                                   (key, kind, st.st_size, st.st_mtime_ns, digest)).lastrowid
+
+            refs = SCANNERS[kind](decode_text(data))
+            conn.executemany('INSERT OR IGNORE INTO refs (serial, source_id, line, offset, dataset) '
+                             'VALUES (?, ?, ?, ?, ?)',
+                             [(serial, sid, line, offset, resolve_dataset(serial))
+                              for serial, line, offset in refs])
+            stats['updated'] += 1
+
+        for sid, _, _, _ in known.values():
+            conn.execute('DELETE FROM sources WHERE source_id = ?', (sid,))
+            stats['removed'] += 1
+
+    return stats
+
+
+def lookup(conn: sqlite3.Connection, lo: int, hi: int | None = None) -> list[tuple]:
+    """All citations of serials lo..hi (inclusive), as
+    (serial, dataset, path, kind, line, offset) sorted by serial then location."""
+    return conn.execute('''
+        SELECT r.serial, r.dataset, s.path, s.kind, r.line, r.offset
+        FROM refs r JOIN sources s USING (source_id)
+        WHERE r.serial BETWEEN ? AND ?
+        ORDER BY r.serial, s.path, r.line, r.offset''', (lo, lo if hi is None else hi)).fetchall()
+
+
+def serials_by_source(conn: sqlite3.Connection, kind: str | None = None) -> dict[str, list[int]]:
+    """{path: sorted distinct serials cited there}, optionally for one kind."""
+    query = ('SELECT s.path, r.serial FROM refs r JOIN sources s USING (source_id) '
+             + ('WHERE s.kind = ? ' if kind else '')
+             + 'GROUP BY s.path, r.serial ORDER BY s.path, r.serial')
+    result = {}
+    for path, serial in conn.execute(query, (kind,) if kind else ()):
+        result.setdefault(path, []).append(serial)
+    return result
+
+
+def parse_serial_range(spec: str) -> tuple[int, int]:
+    """'EFTA00027019' / '27019' / 'EFTA00009000-EFTA00040000' → (lo, hi)."""
+    parts = spec.split('-')
+    if len(parts) > 2 or not all(SERIAL_ARG_RE.fullmatch(p.strip()) for p in parts):
+        raise ValueError(f"Not an EFTA serial or range: {spec!r}")
+    nums = [int(SERIAL_ARG_RE.fullmatch(p.strip()).group(1)) for p in parts]
+    lo, hi = nums[0], nums[-1]
+    return (lo, hi) if lo <= hi else (hi, lo)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inverted index of EFTA citations across narratives, docs and the wire ledger'
+    )
+    parser.add_argument('query', nargs='*', metavar='SERIAL',
+                        help='EFTA serial (EFTA00027019 or 27019) or range (LO-HI)')
+    parser.add_argument('--update', action='store_true',
+                        help='Refresh the index and print what changed')
+    parser.add_argument('--summary', action='store_true',
+                        help='List the distinct serials cited by each source')
+    parser.add_argument('--index', default=DEFAULT_INDEX_FILE, metavar='PATH',
+                        help=f'Index location (default ./{DEFAULT_INDEX_FILE})')
+    parser.add_argument('--narratives-dir', default=DEFAULT_NARRATIVES_DIR,
+                        help=f'Narratives directory (default ./{DEFAULT_NARRATIVES_DIR})')
+    parser.add_argument('--docs-dir', default=DEFAULT_DOCS_DIR,
+                        help=f'Docs directory (default ./{DEFAULT_DOCS_DIR})')
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER,
+                        help=f'Master wire ledger JSON (default ./{DEFAULT_LEDGER})')
+    args = parser.parse_args()
+
+    if not (args.query or args.update or args.summary):
+        parser.error('give a SERIAL / range, --update or --summary')
+    try:
+        ranges = [parse_serial_range(q) for q in args.query]
+    except ValueError as e:
+        parser.error(str(e))
+
+    conn = open_index(args.index)
+    sources = collect_sources(args.narratives_dir, args.docs_dir, args.ledger)
+    stats = update_index(conn, sources)
+
+    if args.update:
+        total = conn.execute('SELECT COUNT(*), COUNT(DISTINCT serial) FROM refs').fetchone()
+        print(f"━━━ EFTA REFERENCE INDEX ━━━")
+        print(f"  Index:     {args.index}")
+        print(f"  Sources:   {len(sources)} ({stats['updated']} re-indexed, "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed)")
+        print(f"  Citations: {total[0]} of {total[1]} distinct serials")
+
+    if args.summary:
+        for path, serials in serials_by_source(conn).items():
+            print(f"  {path}: {', '.join(f'EFTA{s:08d}' for s in serials)}")
+
+    for lo, hi in ranges:
+        rows = lookup(conn, lo, hi)
+        label = f"EFTA{lo:08d}" if lo == hi else f"EFTA{lo:08d}–EFTA{hi:08d}"
+        if not rows:
+            print(f"  ∅ {label}: not cited")
+            continue
+        print(f"  🔎 {label}: {len(rows)} citation{'s' if len(rows) != 1 else ''}")
+        for serial, ds, path, kind, line, offset in rows:
+            ds_label = f"DS{ds}" if ds else "gap"
+            print(f"     EFTA{serial:08d}  {ds_label:<5} {path}:{line}:{offset}  ({kind})")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+entity_normalizer.py — Entity name resolver backed by entity_classification.json
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Resolves a raw entity string (ledger row, OCR output, `entities.raw_name`)
+to a canonical classified name and its type. Each name goes down a ladder
+and stops at the first rung that answers:
+
+  1. exact     hash lookup of the raw string
+  2. folded    case/punctuation-folded key ("LEON_BLACK" ≡ "Leon Black")
+  3. ocr       folded key with OCR digit confusions repaired inside
+               words ("GHISLA1NE" → "ghislaine")
+  4. fuzzy     trigram index: candidates sharing trigrams, best Jaccard
+               similarity at or above --threshold wins
+  5. contained the longest classified key (≥ 4 chars) that appears as
+               whole words in the name ("Darren Indyke" → INDYKE)
+  6. —         unresolved: returned as-is, type UNKNOWN
+
+Classified strings that name the same entity are grouped before any of
+this, so every spelling resolves to one canonical name:
+
+  • strings that fold to the same key ("ADAM BLY" / "Adam Bly")
+  • a "c/o ..." address clause is ignored ("Leon & Debra Black c/o Apollo
+    Management" / "Leon & Debra Black")
+  • an identifier-style key from the other tables ("LEON_BLACK",
+    "SOUTHERN_TRUST") joins the classified name of the same type whose
+    words are the tightest superset of its own ("Leon & Debra Black",
+    "Southern Trust Company Inc."). Account-qualified names ("... (Checking)")
+    are never targets, and a tie leaves the key on its own ("DEBRA_BLACK").
+
+The human-cased spelling without a c/o clause is the canonical name.
+
+Resolutions are memoized in an LRU cache, so a column with millions of
+rows but far fewer distinct spellings (the 11.4M-row `entities` table)
+only pays for the fuzzy rung once per spelling. Nothing is ever compared
+pairwise.
+
+Usage:
+    python3 entity_normalizer.py "GHISLA1NE MAXWELL" "leon black"
+    python3 entity_normalizer.py --ledger data/master_wire_ledger_phase25.json
+    python3 entity_normalizer.py --db ./epstein.db --table entities --column raw_name
+"""
+
+import re
+import json
+import time
+import sqlite3
+import argparse
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_CLASSIFICATION = 'data/entity_classification.json'
+DEFAULT_THRESHOLD = 0.5
+MIN_CONTAINED_LEN = 4
+DEFAULT_CACHE_SIZE = 1 << 18
+UNKNOWN = 'UNKNOWN'
+
+FOLD_RE = re.compile(r'[^0-9a-z]+')
+CARE_OF_RE = re.compile(r'\s+c/o\s.*$', re.IGNORECASE)
+# A word mixing letters and digits is an OCR casualty; pure numbers
+# ("BOX 371461") are left alone.
+OCR_WORD_RE = re.compile(r'\b(?=[0-9a-z]*[a-z])(?=[0-9a-z]*[0-9])[0-9a-z]+\b')
+OCR_DIGITS = str.maketrans('01568', 'oisgb')
+
+
+class Resolution(NamedTuple):
+    name: str           # canonical name (or the input, if unresolved)
+    type: str           # EPSTEIN_ENTITY / EXTERNAL_PARTY / BANK/CUSTODIAN / UNKNOWN
+    method: str | None  # exact / folded / ocr / fuzzy / contained, None if unresolved
+    score: float        # 1.0 for exact/folded/ocr, trigram Jaccard otherwise
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# KEYS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def fold(name: str) -> str:
+    """'Leon & Debra Black' → 'leon debra black'; 'LEON_BLACK' → 'leon black'."""
+    return FOLD_RE.sub(' ', name.casefold()).strip()
+
+
+def repair_ocr(folded: str) -> str:
+    """Undo digit-for-letter OCR swaps inside words: 'ghisla1ne' → 'ghislaine'."""
+    return OCR_WORD_RE.sub(lambda m: m.group().translate(OCR_DIGITS), folded)
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _canonical_rank(name: str) -> tuple:
+    """Prefer the human-cased spelling without a c/o clause, then the longer
+    one, then alphabetical."""
+    return (name.isupper() or '_' in name, bool(CARE_OF_RE.search(name)), -len(name), name)
+
+
+def group_keys(classification: dict[str, str]) -> dict[str, str]:
+    """Map each classified string to the key of the entity it names (see the
+    module docstring): its folded form without a c/o clause, or for an
+    identifier-style key, the unique tightest same-type superset."""
+    keys = {raw: fold(CARE_OF_RE.sub('', raw)) for raw in classification}
+    targets = {}        # type → {key: words} of plain, unqualified names
+    for raw, key in keys.items():
+        if '_' not in raw and '(' not in raw:
+            targets.setdefault(classification[raw], {})[key] = set(key.split())
+    for raw in classification:
+        if '_' not in raw:
+            continue
+        words = set(keys[raw].split())
+        supersets = [(len(other) - len(words), key)
+                     for key, other in targets.get(classification[raw], {}).items() if words < other]
+        if supersets:
+            tightest = min(supersets)[0]
+            best = [key for extra, key in supersets if extra == tightest]
+            if len(best) == 1:
+                keys[raw] = best[0]
+    return keys
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# NORMALIZER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class EntityNormalizer:
+    """Compiled lookup tables over a {raw name: type} classification."""
+
+    def __init__(self, classification: dict[str, str], threshold: float = DEFAULT_THRESHOLD,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.threshold = threshold
+
+        keys = group_keys(classification)
+        groups = {}
+        for raw, key in keys.items():
+            groups.setdefault(key, []).append(raw)
+        self._folded = {}  # folded key → (canonical, type)
+        for key, names in groups.items():
+            canonical = min(names, key=_canonical_rank)
+            self._folded[key] = (canonical, classification[canonical])
+        for raw, key in keys.items():
+            # Each member's own folded spelling resolves to its group too
+            self._folded.setdefault(fold(raw), self._folded[key])
+        self._exact = {raw: self._folded[keys[raw]] for raw in classification}
+
+        # Trigram → ids of folded keys containing it
+        self._keys = list(self._folded)
+        self._grams = [trigrams(k) for k in self._keys]
+        self._index = {}
+        for i, grams in enumerate(self._grams):
+            for g in grams:
+                self._index.setdefault(g, []).append(i)
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CLASSIFICATION, **kwargs) -> 'EntityNormalizer':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def fuzzy(self, key: str) -> tuple[str | None, float, str | None, float]:
+        """Trigram pass over the index. Returns (best folded key, its Jaccard
+        score, longest key contained in key as whole words, its score)."""
+        grams = trigrams(key)
+        shared = Counter()
+        for g in grams:
+            for i in self._index.get(g, ()):
+                shared[i] += 1
+        best, best_score = None, 0.0
+        inside, inside_score = None, 0.0
+        padded = f" {key} "
+        for i, common in shared.items():
+            candidate = self._keys[i]
+            score = common / (len(grams) + len(self._grams[i]) - common)
+            if score > best_score or (score == best_score and candidate < self._keys[best]):
+                best, best_score = i, score
+            # A key found mid-name lacks only its leading "  x" trigram
+            if (common >= len(self._grams[i]) - 1 and len(candidate) >= MIN_CONTAINED_LEN
+                    and f" {candidate} " in padded
+                    and (inside is None or len(candidate) > len(self._keys[inside]))):
+                inside, inside_score = i, score
+        return (self._keys[best] if best is not None else None, best_score,
+                self._keys[inside] if inside is not None else None, inside_score)
+
+    def _resolve(self, raw: str) -> Resolution:
+        hit = self._exact.get(raw)
+        if hit:
+            return Resolution(*hit, 'exact', 1.0)
+        key = fold(raw)
+        hit = self._folded.get(key)
+        if hit:
+            return Resolution(*hit, 'folded', 1.0)
+        repaired = repair_ocr(key)
+        hit = self._folded.get(repaired)
+        if hit:
+            return Resolution(*hit, 'ocr', 1.0)
+        if repaired:
+            match, score, inside, inside_score = self.fuzzy(repaired)
+            if match is not None and score >= self.threshold:
+                return Resolution(*self._folded[match], 'fuzzy', score)
+            if inside is not None:
+                return Resolution(*self._folded[inside], 'contained', inside_score)
+        return Resolution(raw, UNKNOWN, None, 0.0)
+
+    def canonical(self, raw: str) -> str:
+        return self.resolve(raw).name
+
+    def classify(self, raw: str) -> str:
+        return self.resolve(raw).type
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _print_resolution(raw: str, r: Resolution):
+    how = f"{r.method} {r.score:.2f}" if r.method else "unresolved"
+    print(f"  {raw!r:<40} → {r.name!r} [{r.type}] ({how})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Resolve raw entity names to classified canonical names'
+    )
+    parser.add_argument('names', nargs='*', help='Names to resolve')
+    parser.add_argument('--classification', default=DEFAULT_CLASSIFICATION,
+                        help=f'Classification JSON (default ./{DEFAULT_CLASSIFICATION})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum trigram similarity for a fuzzy match (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--ledger', help='Report how the ledger\'s entity names collapse')
+    parser.add_argument('--db', help='SQLite database to scan (with --table/--column)')
+    parser.add_argument('--table', default='entities', help='Table for --db (default entities)')
+    parser.add_argument('--column', default='raw_name', help='Column for --db (default raw_name)')
+    args = parser.parse_args()
+
+    if not (args.names or args.ledger or args.db):
+        parser.error('give names, --ledger or --db')
+    normalizer = EntityNormalizer.from_file(args.classification, threshold=args.threshold)
+
+    for raw in args.names:
+        _print_resolution(raw, normalizer.resolve(raw))
+
+    if args.ledger:
+        with open(args.ledger, 'r', encoding='utf-8') as f:
+            wires = json.load(f)
+        spellings = {}
+        for w in wires:
+            for raw in (w['entity_from'], w['entity_to']):
+                spellings.setdefault(normalizer.canonical(raw), set()).add(raw)
+        print(f"━━━ LEDGER ENTITIES ━━━")
+        print(f"  {sum(len(s) for s in spellings.values())} spellings → {len(spellings)} entities\n")
+        for canonical, raws in sorted(spellings.items()):
+            if len(raws) > 1:
+                print(f"  {canonical}: {', '.join(sorted(raws))}")
+
+    if args.db:
+        if not (re.fullmatch(r'\w+', args.table) and re.fullmatch(r'\w+', args.column)):
+            parser.error('--table/--column must be plain identifiers')
+        conn = sqlite3.connect(f"{Path(args.db).resolve().as_uri()}?mode=ro", uri=True)
+        methods = Counter()
+        start = time.perf_counter()
+        rows = 0
+        for (raw,) in conn.execute(f'SELECT "{args.column}" FROM "{args.table}"'):
+            if isinstance(raw, str):
+                methods[normalizer.resolve(raw).method] += 1
+            rows += 1
+        elapsed = time.perf_counter() - start
+        conn.close()
+        info = normalizer.resolve.cache_info()
+        print(f"━━━ {args.table}.{args.column} ━━━")
+        print(f"  Rows:     {rows:,} in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f}/s)")
+        print(f"  Distinct: {info.misses:,} spellings resolved, {info.hits:,} cache hits")
+        for method in ('exact', 'folded', 'ocr', 'fuzzy', 'contained', None):
+            print(f"  {method or 'unresolved':<10} {methods[method]:,}")
+
+
+if __name__ == '__main__':
+    main()
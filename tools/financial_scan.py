@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+financial_scan.py — Aho–Corasick financial keyword scan over files.extracted_text
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Produces financial_hits-shaped rows (SCHEMA.md) from the corpus: one row
+per keyword flag, with ±500 bytes of context, the nearest dollar amount
+and the banks / financial actors named in that window.
+
+  keyword        terms
+  wire_transfer  wire transfer · incoming wire · outgoing wire · wired funds · …
+  fedwire        fedwire · fed reference · imad · omad
+  SWIFT          swift · swift code · bic · mt103
+  routing        routing number · aba · aba number · …
+
+  + the 28 known banks (confidence_score.KNOWN_BANKS) and the actor names
+    of entity_classification.json, minus extraction garbage
+
+ENGINE: every term is compiled into one Aho–Corasick automaton, stored as
+a dense NumPy transition table over byte classes (ASCII case folded,
+whitespace folded to one class). A batch of documents is joined into one
+buffer and split into a few thousand equal lanes, each warmed up with the
+longest term's length of overlap; the automaton then advances every lane
+one byte per NumPy step, so a batch costs (buffer / lanes) steps rather
+than one Python iteration per byte. Whole-word checks and overlap
+resolution (leftmost-longest per keyword flag) are array operations on
+the matches. Context windows are memoryview slices of the batch buffer,
+and amounts are parsed from those views, so text is decoded only for the
+hits that are kept.
+
+Documents are read in rowid ranges by a process pool (--jobs); each
+worker opens its own read-only connection and builds its automaton once.
+Throughput is reported in MB/s of extracted_text (wall clock, and
+scan-only per worker). With --write, hits go to a `keyword_hits` table in
+the same database (replaced on re-run); `files` is never modified.
+confidence_score.py --table keyword_hits scores them.
+
+Requires NumPy.
+
+Usage:
+    python3 financial_scan.py --db ./epstein.db
+    python3 financial_scan.py --db ./epstein.db --jobs 0 --write
+    python3 financial_scan.py --db ./epstein.db --window 300 --json hits.json
+    python3 financial_scan.py --db ./epstein.db --target files.ocr_text --limit 10000
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from collections import Counter, deque
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("financial_scan.py requires NumPy (pip install numpy)")
+
+from confidence_score import GARBAGE_RE, KNOWN_BANKS
+from entity_normalizer import DEFAULT_CLASSIFICATION, fold
+from file_batch import add_jobs_argument, map_files
+from linkify_db import connect, parse_target
+from wire_dedup import to_cents
+
+DEFAULT_TARGET = 'files.extracted_text'
+DEFAULT_WINDOW = 500               # bytes of context each side, as financial_hits.context
+DEFAULT_BATCH_SIZE = 2000          # rowids per worker batch
+RESULT_TABLE = 'keyword_hits'
+LANES = 4096                       # automaton lanes per batch buffer
+DOC_SEP = b'\n\x00\n'              # \x00 is in no term, so no match spans two documents
+
+KEYWORDS = {
+    'wire_transfer': ('wire transfer', 'wire transfers', 'wire transferred', 'incoming wire',
+                      'outgoing wire', 'wired funds', 'funds wired', 'wire instructions',
+                      'wire confirmation', 'wire detail'),
+    'fedwire': ('fedwire', 'fed wire', 'fed reference', 'fed ref', 'imad', 'omad'),
+    'SWIFT': ('swift', 'swift code', 'swift bic', 'bic', 'mt103', 'mt 103', 'mt202'),
+    'routing': ('routing number', 'routing no', 'routing #', 'routing/transit', 'aba',
+                'aba number', 'aba #', 'aba routing'),
+}
+KEYWORD, BANK, ACTOR = 0, 1, 2
+ACTOR_TYPES = ('EPSTEIN_ENTITY', 'BANK/CUSTODIAN', 'EXTERNAL_PARTY')
+
+DOLLAR_RE = re.compile(rb'\$\s?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{2})?(?![\d,]*\d)')
+_WORD_BYTE = np.zeros(256, dtype=bool)
+_WORD_BYTE[list(b'0123456789_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')] = True
+_WORD_BYTE[0x80:] = True           # UTF-8 sequences count as word characters
+
+
+def _term_key(term: str) -> bytes:
+    return ' '.join(term.lower().split()).encode('utf-8')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# AUTOMATON
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class Automaton:
+    """Aho–Corasick automaton over bytes as a dense transition table.
+
+    terms: (term, label, kind). Matching is ASCII case-insensitive and any
+    single whitespace byte matches a space; terms are whole words."""
+
+    def __init__(self, terms):
+        self.keys, self.labels, kinds = [], [], []
+        seen = set()
+        for term, label, kind in terms:
+            key = _term_key(term)
+            if key and key not in seen:
+                seen.add(key)
+                self.keys.append(key)
+                self.labels.append(label)
+                kinds.append(kind)
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.lengths = np.array([len(k) for k in self.keys], dtype=np.int64)
+        self.need_left = np.array([_WORD_BYTE[k[0]] for k in self.keys], dtype=bool)
+        self.need_right = np.array([_WORD_BYTE[k[-1]] for k in self.keys], dtype=bool)
+        self.max_len = int(self.lengths.max()) if self.keys else 1
+
+        # byte classes: one per byte used by a term, 0 for everything else
+        alphabet = sorted({b for key in self.keys for b in key})
+        self.classes = np.zeros(256, dtype=np.uint8)
+        for cls, b in enumerate(alphabet, 1):
+            self.classes[b] = cls
+            if 0x61 <= b <= 0x7a:
+                self.classes[b - 0x20] = cls
+        if 0x20 in alphabet:
+            self.classes[list(b'\t\n\r\x0b\x0c')] = self.classes[0x20]
+        self.n_classes = len(alphabet) + 1
+
+        goto, out = [{}], [[]]
+        for t, key in enumerate(self.keys):
+            s = 0
+            for b in key:
+                cls = int(self.classes[b])
+                if cls not in goto[s]:
+                    goto[s][cls] = len(goto)
+                    goto.append({})
+                    out.append([])
+                s = goto[s][cls]
+            out[s].append(t)
+
+        # breadth-first: a state's failure target is shallower, so its
+        # row and outputs are already complete when the state is reached
+        delta = np.zeros((len(goto), self.n_classes), dtype=np.int64)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        for cls, s in goto[0].items():
+            delta[0, cls] = s
+        while queue:
+            r = queue.popleft()
+            out[r] = out[r] + out[fail[r]]
+            delta[r] = delta[fail[r]]
+            for cls, s in goto[r].items():
+                fail[s] = int(delta[fail[r], cls])
+                delta[r, cls] = s
+                queue.append(s)
+
+        self.n_states = len(goto)
+        self.delta = delta.astype(np.uint16 if self.n_states < 2 ** 16 else np.int32).ravel()
+        self.out_ptr = np.concatenate([[0], np.cumsum([len(o) for o in out])]).astype(np.int64)
+        self.out_ids = np.array([t for o in out for t in o], dtype=np.int64)
+        self.has_out = np.diff(self.out_ptr) > 0
+
+    def scan(self, buf) -> tuple[np.ndarray, np.ndarray]:
+        """(starts, term ids) of every whole-word match in buf, by start."""
+        data = np.frombuffer(buf, dtype=np.uint8)
+        n = len(data)
+        if not n or not self.keys:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        overlap = self.max_len - 1
+        width = max(overlap + 1, -(-n // LANES))
+        lanes = -(-n // width)
+        padded = np.zeros(overlap + lanes * width, dtype=np.uint8)
+        padded[overlap:overlap + n] = self.classes[data]
+        # step j of lane k reads padded[k*width + j]: lane k owns bytes
+        # [k*width, (k+1)*width) after `overlap` bytes of warm-up
+        steps = np.ascontiguousarray(np.lib.stride_tricks.as_strided(
+            padded, shape=(width + overlap, lanes), strides=(1, width)))
+
+        states = np.empty((width + overlap, lanes), dtype=self.delta.dtype)
+        state = np.zeros(lanes, dtype=self.delta.dtype)
+        idx = np.empty(lanes, dtype=np.intp)
+        for j in range(width + overlap):
+            np.multiply(state, self.n_classes, out=idx, dtype=np.intp)
+            np.add(idx, steps[j], out=idx)
+            state = np.take(self.delta, idx, out=states[j])
+
+        owned = states[overlap:]
+        step, lane = np.nonzero(self.has_out[owned])
+        ends = lane.astype(np.int64) * width + step
+        hit_states = owned[step, lane].astype(np.int64)
+
+        # expand each state's output list (the term plus its suffix terms)
+        counts = self.out_ptr[hit_states + 1] - self.out_ptr[hit_states]
+        first = np.repeat(self.out_ptr[hit_states], counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        ids = self.out_ids[first + within]
+        ends = np.repeat(ends, counts)
+        starts = ends - self.lengths[ids] + 1
+
+        left_ok = ~(self.need_left[ids] & (starts > 0) & _WORD_BYTE[data[np.maximum(starts - 1, 0)]])
+        right_ok = ~(self.need_right[ids] & (ends + 1 < n) & _WORD_BYTE[data[np.minimum(ends + 1, n - 1)]])
+        keep = left_ok & right_ok
+        starts, ids = starts[keep], ids[keep]
+        order = np.lexsort((-self.lengths[ids], starts))
+        return starts[order], ids[order]
+
+
+def build_automaton(classification=DEFAULT_CLASSIFICATION) -> Automaton:
+    """Keyword flags + known banks + classified actors, as one automaton."""
+    terms = [(t, keyword, KEYWORD) for keyword, words in KEYWORDS.items() for t in words]
+    terms += [(bank, bank, BANK) for bank in KNOWN_BANKS]
+    with open(classification, 'r', encoding='utf-8') as f:
+        classified = json.load(f)
+    terms += [(name, name, ACTOR) for name, kind in sorted(classified.items())
+              if kind in ACTOR_TYPES and not GARBAGE_RE.match(fold(name))]
+    return Automaton(terms)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# HITS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class Hit(NamedTuple):
+    doc: int                  # index into the batch
+    keyword: str              # KEYWORDS flag
+    term: str                 # the term that matched
+    offset: int               # byte offset in the document
+    context: memoryview       # window of the batch buffer, not a copy
+    anchor: int               # hit offset within context
+    entities: tuple[str, ...]
+
+
+def _char_start(buf, i: int) -> int:
+    while i < len(buf) and 0x80 <= buf[i] < 0xc0:
+        i += 1
+    return i
+
+
+def _char_end(buf, i: int, lo: int) -> int:
+    while i > lo and 0x80 <= buf[i - 1] < 0xc0:
+        i -= 1
+    if i > lo and buf[i - 1] >= 0xc0:          # lead byte cut from its continuation
+        i -= 1
+    return i
+
+
+def find_hits(buf: bytes, doc_starts: np.ndarray, automaton: Automaton, window: int):
+    """Yield a Hit per keyword flag in buf (DOC_SEP-joined documents).
+    Overlapping flags resolve leftmost-longest; banks and actors are
+    collected per window rather than flagged."""
+    starts, ids = automaton.scan(buf)
+    kinds = automaton.kinds[ids]
+    flag = kinds == KEYWORD
+    ent_starts, ent_ids = starts[~flag], ids[~flag]
+    view = memoryview(buf)
+    doc_ends = np.append(doc_starts[1:] - len(DOC_SEP), len(buf))
+
+    last_end = -1
+    for s, t in zip(starts[flag].tolist(), ids[flag].tolist()):
+        e = s + int(automaton.lengths[t])
+        if s < last_end:
+            continue
+        last_end = e
+        doc = int(np.searchsorted(doc_starts, s, side='right')) - 1
+        d0, d1 = int(doc_starts[doc]), int(doc_ends[doc])
+        lo = _char_start(buf, max(d0, s - window))
+        hi = _char_end(buf, min(d1, e + window), lo)
+        i0, i1 = np.searchsorted(ent_starts, [lo, hi])
+        names = dict.fromkeys(automaton.labels[k] for k in ent_ids[i0:i1].tolist())
+        yield Hit(doc, automaton.labels[t], buf[s:e].decode('utf-8', 'replace'), s - d0,
+                  view[lo:hi], s - lo, tuple(names))
+
+
+def nearest_amount(context, anchor: int) -> int | None:
+    """Cents of the dollar amount closest to anchor in the context view."""
+    best = None
+    for m in DOLLAR_RE.finditer(context):
+        dist = abs(m.start() - anchor)
+        if best is None or dist < best[0]:
+            best = (dist, m.group())
+    return to_cents(best[1].decode('ascii')) if best else None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# WORKERS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_WORKER = {}                       # per process: (db, classification) → (conn, automaton)
+
+
+def _worker_state(db, classification):
+    key = (str(db), str(classification))
+    if key not in _WORKER:
+        conn = sqlite3.connect(f"{Path(db).resolve().as_uri()}?mode=ro", uri=True)
+        _WORKER[key] = (conn, build_automaton(classification))
+    return _WORKER[key]
+
+
+def id_column(conn, table: str, column: str) -> str:
+    cols = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+    if column not in cols:
+        raise ValueError(f"{table} has no column {column}")
+    return 'file_id' if 'file_id' in cols else 'rowid'
+
+
+def scan_range(bounds: tuple[int, int], db, table: str, column: str, id_col: str,
+               window: int, classification) -> tuple[list[tuple], int, float]:
+    """Scan rows with lo < rowid <= hi. Returns (result rows, text bytes,
+    scan seconds); result rows are RESULT_SCHEMA minus the source column."""
+    conn, automaton = _worker_state(db, classification)
+    lo, hi = bounds
+    rows = conn.execute(f'SELECT "{id_col}", "{column}" FROM "{table}" WHERE rowid > ? AND rowid <= ? '
+                        f'AND "{column}" IS NOT NULL ORDER BY rowid', (lo, hi)).fetchall()
+    start = time.perf_counter()
+    texts = [t.encode('utf-8', 'replace') if isinstance(t, str) else bytes(t) for _, t in rows]
+    buf = DOC_SEP.join(texts)
+    lengths = np.array([len(t) + len(DOC_SEP) for t in texts], dtype=np.int64)
+    doc_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if texts else lengths
+
+    results = []
+    for hit in find_hits(buf, doc_starts, automaton, window):
+        results.append((rows[hit.doc][0], hit.offset, hit.keyword, hit.term,
+                        bytes(hit.context).decode('utf-8', 'replace'),
+                        nearest_amount(hit.context, hit.anchor), '; '.join(hit.entities)))
+    return results, sum(len(t) for t in texts), time.perf_counter() - start
+
+
+def rowid_ranges(conn, table: str, batch_size: int, limit: int | None) -> list[tuple[int, int]]:
+    lo, hi = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}"').fetchone()
+    if lo is None:
+        return []
+    if limit:
+        hi = min(hi, lo - 1 + limit)
+    return [(b, min(b + batch_size, hi)) for b in range(lo - 1, hi, batch_size)]
+
+
+RESULT_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS {RESULT_TABLE} (
+    id                INTEGER PRIMARY KEY,    -- rowid, so scorers can key on it
+    source            TEXT NOT NULL,          -- table.column scanned
+    source_file       INTEGER NOT NULL,       -- files.file_id
+    offset            INTEGER NOT NULL,       -- byte offset of the keyword
+    keyword           TEXT NOT NULL,          -- wire_transfer / fedwire / SWIFT / routing
+    term              TEXT NOT NULL,
+    context           TEXT NOT NULL,
+    extracted_amount  REAL,
+    entities          TEXT NOT NULL,          -- banks and actors in the context, '; '-joined
+    UNIQUE (source, source_file, offset)
+)
+'''
+
+
+def write_results(conn, source: str, results: list[tuple]):
+    with conn:
+        conn.execute(RESULT_SCHEMA)
+        conn.execute(f'DELETE FROM {RESULT_TABLE} WHERE source = ?', (source,))
+        conn.executemany(f'INSERT INTO {RESULT_TABLE} VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         [(source, fid, off, kw, term, ctx, None if c is None else c / 100, ents)
+                          for fid, off, kw, term, ctx, c, ents in results])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aho–Corasick financial keyword scan of extracted document text'
+    )
+    parser.add_argument('--db', type=Path, required=True, help='SQLite database')
+    parser.add_argument('--target', default=DEFAULT_TARGET, metavar='TABLE.COLUMN',
+                        help=f'Document text column (default {DEFAULT_TARGET})')
+    parser.add_argument('--classification', default=DEFAULT_CLASSIFICATION,
+                        help=f'Entity classification JSON (default ./{DEFAULT_CLASSIFICATION})')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help=f'Context bytes each side of a hit (default {DEFAULT_WINDOW})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rowids per worker batch (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--limit', type=int, help='Only the first N rowids')
+    parser.add_argument('--write', action='store_true', help=f'Store hits in the {RESULT_TABLE} table')
+    parser.add_argument('--json', metavar='PATH', help='Write every hit as JSON')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    try:
+        table, column = parse_target(args.target)
+    except ValueError as e:
+        parser.error(str(e))
+    conn = connect(args.db, dry_run=not args.write)
+    try:
+        id_col = id_column(conn, table, column)
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+    automaton = build_automaton(args.classification)
+    ranges = rowid_ranges(conn, table, args.batch_size, args.limit)
+
+    print(f"━━━ FINANCIAL KEYWORD SCAN ━━━")
+    print(f"  Source:    {args.db}:{args.target} — {len(ranges):,} batches of {args.batch_size:,} rowids")
+    print(f"  Automaton: {len(automaton.keys):,} terms "
+          f"({' · '.join(f'{n} {c}' for n, c in zip(('keywords', 'banks', 'actors'), np.bincount(automaton.kinds, minlength=3).tolist()))}) "
+          f"→ {automaton.n_states:,} states × {automaton.n_classes} byte classes")
+    print(f"{'━' * 60}")
+
+    start = time.perf_counter()
+    scan = partial(scan_range, db=args.db, table=table, column=column, id_col=id_col,
+                   window=args.window, classification=args.classification)
+    batches = map_files(scan, ranges, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    results = [r for rows, _, _ in batches for r in rows]
+    text_bytes = sum(b for _, b, _ in batches)
+    scan_seconds = sum(s for _, _, s in batches)
+    by_keyword = Counter(r[2] for r in results)
+    mb = text_bytes / 1e6
+    print(f"  🔎 {len(results):,} hits in {mb:,.1f} MB of text "
+          f"({' · '.join(f'{k} {by_keyword[k]:,}' for k in KEYWORDS if by_keyword[k]) or 'none'})")
+    print(f"  With amount: {sum(r[5] is not None for r in results):,} · "
+          f"with bank/actor: {sum(bool(r[6]) for r in results):,}")
+    print(f"  Throughput: {mb / elapsed if elapsed else 0:,.1f} MB/s wall ({elapsed:.2f}s) · "
+          f"{mb / scan_seconds if scan_seconds else 0:,.1f} MB/s per worker scan")
+
+    if args.write:
+        write_results(conn, args.target, results)
+        print(f"\n  ✅ Hits in {args.db}:{RESULT_TABLE}")
+    conn.close()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{'source_file': fid, 'offset': off, 'keyword': kw, 'term': term, 'context': ctx,
+                        'extracted_amount': None if c is None else c / 100, 'entities': ents}
+                       for fid, off, kw, term, ctx, c, ents in results], f, indent=1)
+        print(f"\n  Hits: {args.json}")
+    print(f"\n━━━ SCAN COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
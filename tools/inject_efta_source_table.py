@@ -6,56 +6,48 @@ Adds a clickable '📄 EFTA Source Documents' table to each narrative's
 Source Documents section — so readers can click straight to the DOJ PDFs
 and Dataset browse pages that underlie each narrative.
 
-Two link patterns (from Phase 5E Redaction Map v18 notebook):
+Two link patterns (from Phase 5E Redaction Map v18 notebook, built by
+efta_core.links):
   PDF:    justice.gov/epstein/files/DataSet%20{ds}/EFTA{serial}.pdf
   Browse: justice.gov/epstein/doj-disclosures/data-set-{ds}-files
 
 Injection point: right before '### 📊 Verify in Forensic Workbook'
 Idempotent: skips if '📄 EFTA Source Documents' already present.
 
+--derive builds each table from the narrative itself: every EFTA ID and
+Dataset reference in the text is found in one scan. Serials and datasets
+that the table does not cover yet are appended as new rows, grouped by
+dataset. An existing table (with or without the 📄 in its heading) keeps
+its rows, their order and its heading; without one, the curated rows in
+NARRATIVE_SOURCES come first. The table section and any '**All 12 DOJ
+Datasets:**' directory are not scanned, so generated links never feed
+back in. Tables no longer go stale when a narrative gains a citation.
+
 Usage:
     python3 inject_efta_source_table.py --dir ./narratives
     python3 inject_efta_source_table.py --dir ./narratives --dry-run
+    python3 inject_efta_source_table.py --dir ./narratives --jobs 4
+    python3 inject_efta_source_table.py --dir ./narratives --derive
 """
 
 import re
 import argparse
+from functools import lru_cache, partial
 from pathlib import Path
 
+from efta_core import efta_to_dataset
+from efta_core.links import browse_link, ext_link, pdf_link
+from efta_core.patterns import DIGITS_RE, LINKIFY_RE
+from file_batch import add_jobs_argument, map_files
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# URL BUILDERS — Phase 5E notebook logic
+# DATASET LOOKUP — link builders are shared, in efta_core.links
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-DATASET_RANGES = [
-    (1,1,3158),(2,3159,3857),(3,3858,5586),(4,5705,8320),
-    (5,8409,8528),(6,8529,8998),(7,9016,9664),(8,9676,39023),
-    (9,39025,1262781),(10,1262782,2205654),(11,2205655,2730264),
-    (12,2730265,2731783),
-]
-
-def efta_to_dataset(num):
-    for ds, s, e in DATASET_RANGES:
-        if s <= num <= e:
-            return ds
-    return None
-
-def pdf_link(efta_id):
-    """<a href> to DOJ PDF, opens new tab."""
-    num = int(efta_id.replace("EFTA",""))
-    ds = efta_to_dataset(num)
-    if ds is None: return efta_id
-    url = f"https://www.justice.gov/epstein/files/DataSet%20{ds}/EFTA{num:08d}.pdf"
-    return f'<a href="{url}" target="_blank">{efta_id}</a>'
-
-def browse_link(ds, label=None):
-    """<a href> to DOJ Dataset browse page, opens new tab."""
-    label = label or f"Dataset {ds}"
-    url = f"https://www.justice.gov/epstein/doj-disclosures/data-set-{ds}-files"
-    return f'<a href="{url}" target="_blank">{label}</a>'
-
-def ext_link(url, label):
-    """External reference link."""
-    return f'<a href="{url}" target="_blank">{label}</a>'
+@lru_cache(maxsize=None)
+def dataset_of(num: int) -> int | None:
+    """Memoized efta_to_dataset — narratives cite the same few serials over and over."""
+    return efta_to_dataset(num)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -218,10 +210,13 @@ NARRATIVE_SOURCES = {
 # TABLE BUILDER
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def build_source_table(narrative_num: str) -> str:
-    """Build the 📄 EFTA Source Documents section for a narrative."""
-    config = NARRATIVE_SOURCES.get(narrative_num)
-    if not config:
+def build_source_table(narrative_num: str, rows: list | None = None) -> str:
+    """Build the 📄 EFTA Source Documents section for a narrative.
+    rows defaults to the curated NARRATIVE_SOURCES rows."""
+    config = NARRATIVE_SOURCES.get(narrative_num, {})
+    if rows is None:
+        rows = config.get("rows")
+    if not rows:
         return ""
     
     lines = []
@@ -230,14 +225,14 @@ def build_source_table(narrative_num: str) -> str:
     lines.append("| Document | Source | Description |")
     lines.append("|----------|--------|-------------|")
     
-    for doc, source, desc in config["rows"]:
+    for doc, source, desc in rows:
         lines.append(f"| {doc} | {source} | {desc} |")
     
     if "note" in config:
         lines.append(f"\n> **Note:** {config['note']}")
     
     # Add corpus-wide dataset directory for narratives using full corpus
-    has_full_corpus = any("Full EFTA Corpus" in row[0] for row in config["rows"])
+    has_full_corpus = any("Full EFTA Corpus" in row[0] for row in rows)
     if has_full_corpus:
         lines.append(f"\n**All 12 DOJ Datasets:** {ALL_DS}")
     
@@ -246,31 +241,177 @@ def build_source_table(narrative_num: str) -> str:
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# INJECTION ENGINE
+# DERIVED TABLES (--derive)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 MARKER = "📄 EFTA Source Documents"
 INJECTION_POINT = "### 📊 Verify in Forensic Workbook"
 
+# Every EFTA / Dataset reference in one scan: the linkifier's own tokenizer
+# for plain references, plus browse-page URLs for ones already linked
+# (a linked EFTA ID still shows its EFTA number as link text) and "DS1–12"
+# ranges, which the linkifier would read as DS1.
+REF_RE = re.compile(r'data-set-(?P<browse>\d{1,2})-files|'
+                    r'(?P<range>\bDS(?P<range_lo>\d{1,2})[–-](?:DS)?(?P<range_hi>\d{1,2})\b)|'
+                    + LINKIFY_RE.pattern)
+ROW_EFTA_RE = re.compile(r'EFTA(\d{7,8})')
+ROW_BROWSE_RE = re.compile(r'data-set-(\d{1,2})-files')
+ROW_DS_RE = re.compile(r'DS(\d{1,2})(?:[–-](?:DS)?(\d{1,2}))?')
+# The corpus-wide browse directory build_source_table writes under the table
+DIRECTORY_RE = re.compile(r'^\*\*All 12 DOJ Datasets:\*\*.*\n?', re.MULTILINE)
+SECTION_START_RE = re.compile(r'^#+ (?:📄 )?EFTA Source Documents', re.MULTILINE)
+SECTION_END_RE = re.compile(r'^(?:#{1,3} |---\s*$)', re.MULTILINE)
+# header row, separator row, then the data rows (group 'rows')
+TABLE_RE = re.compile(r'^\|.*\|[ \t]*\n\|[-:| \t]+\|[ \t]*\n(?P<rows>(?:\|.*\|[ \t]*(?:\n|$))*)', re.MULTILINE)
+ALL_DATASETS = set(range(1, 13))
+
+
+def source_table_span(text: str) -> tuple[int, int] | None:
+    """(start, end) of an existing source table section, heading included."""
+    start = SECTION_START_RE.search(text)
+    if not start:
+        return None
+    end = SECTION_END_RE.search(text, start.end())
+    return start.start(), end.start() if end else len(text)
+
+
+def table_rows_span(text: str, span: tuple[int, int]) -> tuple[int, int] | None:
+    """(start, end) of the data rows of the first table in a section."""
+    m = TABLE_RE.search(text, *span)
+    return m.span('rows') if m else None
+
+
+def parse_rows(block: str) -> list[tuple[str, str, str]]:
+    """Markdown table lines → (document, source, description) rows."""
+    rows = []
+    for line in block.splitlines():
+        cells = [c.strip() for c in line.strip()[1:-1].split('|')]
+        if len(cells) >= 3:
+            rows.append((cells[0], cells[1], ' | '.join(cells[2:])))
+    return rows
+
+
+def scan_references(text: str) -> tuple[set[int], set[int]]:
+    """(EFTA serials, DOJ dataset numbers) referenced anywhere in text."""
+    serials, datasets = set(), set()
+    for m in REF_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == 'efta':
+            serials.add(int(m.group()[4:]))
+        elif kind == 'browse':
+            datasets.add(int(m.group('browse')))
+        elif kind == 'range':
+            datasets.update(range(int(m.group('range_lo')), int(m.group('range_hi')) + 1))
+        elif kind == 'compound':
+            datasets.update(int(n) for n in DIGITS_RE.findall(m.group('nums')))
+        elif kind == 'single':
+            datasets.add(int(m.group('single_num')))
+        else:
+            datasets.add(int(m.group('short_num')))
+    return serials, {ds for ds in datasets if 1 <= ds <= 12}
+
+
+def row_datasets(source: str) -> set[int]:
+    """Datasets named in a row's Source cell: "DS8" → {8}, "DS1–12" → {1…12}."""
+    datasets = set()
+    for m in ROW_DS_RE.finditer(source):
+        lo = int(m.group(1))
+        datasets.update(range(lo, int(m.group(2) or lo) + 1))
+    return datasets
+
+
+def _row_order(row) -> tuple[int, int]:
+    """Group rows by dataset (DS1…DS12, then corpus-wide, then External);
+    PDFs before the browse link within a dataset."""
+    doc, source, _ = row
+    datasets = row_datasets(source)
+    if len(datasets) == 1:
+        group = datasets.pop()
+    else:
+        group = 99 if source == "External" else 13
+    return group, 1 if ROW_BROWSE_RE.search(doc) else 0
+
+
+def derive_rows(narrative_num: str, text: str) -> list[tuple[str, str, str]]:
+    """Source table rows for a narrative: the existing table's rows in their
+    order (the curated rows if there is no table yet), then a PDF row for
+    every cited serial and a browse row for every referenced dataset they
+    don't already cover. Neither the existing table section nor an All-12
+    directory is scanned, so a table never feeds itself."""
+    span = source_table_span(text)
+    rows_span = span and table_rows_span(text, span)
+    if rows_span:
+        rows = parse_rows(text[rows_span[0]:rows_span[1]])
+    else:
+        rows = list(NARRATIVE_SOURCES.get(narrative_num, {}).get("rows", []))
+    covered_serials = {int(n) for row in rows for n in ROW_EFTA_RE.findall(row[0])}
+    covered_browse = {int(n) for row in rows for n in ROW_BROWSE_RE.findall(row[0])}
+
+    if span:
+        text = text[:span[0]] + text[span[1]:]
+    serials, datasets = scan_references(DIRECTORY_RE.sub('', text))
+
+    new = []
+    for serial in sorted(serials - covered_serials):
+        ds = dataset_of(serial)
+        if ds is None:
+            continue  # Inter-dataset gap — no PDF to point at
+        new.append((pdf_link(f"EFTA{serial:08d}"), f"DS{ds}", "Cited in this narrative"))
+        datasets.add(ds)
+    if datasets >= ALL_DATASETS:
+        # Corpus-wide: one row (and the All-12 directory, see inject_into_text)
+        # instead of 12 browse rows
+        if not any("Full EFTA Corpus" in row[0] for row in rows):
+            new.append(("Full EFTA Corpus", "DS1–12", "References span all 12 DOJ datasets"))
+    else:
+        for ds in sorted(datasets - covered_browse):
+            new.append((browse_link(ds), f"DS{ds}", f"Browse neighboring documents in Dataset {ds}"))
 
-def inject_source_table(file_path: Path, dry_run: bool = False) -> bool:
-    """Inject source table into a narrative. Returns True if modified."""
-    text = file_path.read_text(encoding='utf-8')
-    
+    new.sort(key=_row_order)  # only the appended rows are grouped; existing order stays
+    return rows + new
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# INJECTION ENGINE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def inject_into_text(text: str, file_name: str, derive: bool = False) -> tuple[str, bool]:
+    """Inject the source table into narrative text in memory.
+    file_name supplies the narrative number. Returns (text, modified).
+    With derive, rows come from derive_rows and an existing table is
+    updated in place instead of skipped: only its data rows are rewritten,
+    so its heading, columns and notes stay as they are, and the All-12
+    directory is added after the rows if a corpus-wide row needs one."""
+    span = source_table_span(text)
     # Already injected?
-    if MARKER in text:
-        return False
+    if span and not derive:
+        return text, False
     
     # Extract narrative number from filename
-    match = re.match(r'(\d{1,2})', file_path.name)
+    match = re.match(r'(\d{1,2})', file_name)
     if not match:
-        return False
+        return text, False
     num = match.group(1).zfill(2)
     
+    rows = derive_rows(num, text) if derive else None
+    rows_span = span and table_rows_span(text, span)
+    if rows_span:
+        start, end = rows_span
+        block = "".join(f"| {doc} | {source} | {desc} |\n" for doc, source, desc in rows)
+        if any("Full EFTA Corpus" in row[0] for row in rows) and not DIRECTORY_RE.search(text):
+            block += f"\n**All 12 DOJ Datasets:** {ALL_DS}\n"
+        updated = text[:start] + block + text[end:]
+        return updated, updated != text
+
     # Build the table
-    table = build_source_table(num)
+    table = build_source_table(num, rows)
     if not table:
-        return False
+        return text, False
+
+    if span:
+        start, end = span
+        updated = text[:start] + table + "\n" + text[end:]
+        return updated, updated != text
     
     # Find injection point: right before the workbook table
     if INJECTION_POINT in text:
@@ -284,10 +425,17 @@ def inject_source_table(file_path: Path, dry_run: bool = False) -> bool:
             # Last resort: append at end
             text = text.rstrip() + "\n\n" + table + "\n"
     
-    if not dry_run:
+    return text, True
+
+
+def inject_source_table(file_path: Path, dry_run: bool = False, derive: bool = False) -> bool:
+    """Inject source table into a narrative. Returns True if modified."""
+    text, modified = inject_into_text(file_path.read_text(encoding='utf-8'), file_path.name, derive)
+    
+    if modified and not dry_run:
         file_path.write_text(text, encoding='utf-8')
     
-    return True
+    return modified
 
 
 def main():
@@ -298,6 +446,9 @@ def main():
     group.add_argument('--dir', help='Directory of narrative .md files')
     group.add_argument('--file', help='Single .md file')
     parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--derive', action='store_true',
+                        help='Derive rows from each narrative\'s EFTA/Dataset references and regenerate existing tables')
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
     files = []
@@ -312,14 +463,19 @@ def main():
     print(f"{'━' * 55}\n")
 
     count = 0
-    for f in files:
-        modified = inject_source_table(f, args.dry_run)
+    results = map_files(partial(inject_source_table, dry_run=args.dry_run, derive=args.derive),
+                        files, args.jobs)
+
+    for f, modified in zip(files, results):
         if modified:
-            verb = "Would inject" if args.dry_run else "Injected"
+            if args.derive:
+                verb = "Would regenerate" if args.dry_run else "Regenerated"
+            else:
+                verb = "Would inject" if args.dry_run else "Injected"
             print(f"  📄 {f.name}: {verb} EFTA source table")
             count += 1
         else:
-            print(f"  ✅ {f.name}: Already has source table or no config")
+            print(f"  ✅ {f.name}: {'Source table up to date' if args.derive else 'Already has source table or no config'}")
 
     print(f"\n{'━' * 55}")
     print(f"  {count} narratives {'would be' if args.dry_run else ''} updated")
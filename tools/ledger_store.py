@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+ledger_store.py — Columnar, memory-mapped master wire ledger
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+master_wire_ledger_phase25.json is a list of dicts with five key shapes,
+two date formats ("2013-10-11" / "5/21/2014") and `datasets` stored as a
+string ("[8, 9, 10]"). This module normalizes it once into a typed
+columnar file that tools open with mmap — no JSON parse, no copies.
+
+COLUMNS (one fixed-width array per field, native byte order):
+  amount_cents   int64    amount × 100, exact
+  date           int32    days since 1970-01-01, NO_DATE if undated
+  entity_from    uint32   code into header["entities"]
+  entity_to      uint32   code into header["entities"]
+  datasets       uint16   bitmask, bit N set = DOJ Dataset N
+  source         uint8    code into header["enums"]["source"]
+  tier           uint8    code into header["enums"]["tier"]       (0 = absent)
+  exhibit        uint8    code into header["enums"]["exhibit"]    (0 = absent)
+  recovery       uint8    code into header["enums"]["recovery"]   (0 = absent)
+  confidence     uint8    code into header["enums"]["confidence"] (0 = absent)
+  flags          uint8    FLAG_* bits
+  snippet_offsets uint32  n+1 offsets into snippet_text (context_snippet)
+  snippet_text   bytes    UTF-8
+
+FILE LAYOUT:
+  b'EFTACOL1' · uint32 header length · JSON header · columns, each
+  8-byte aligned at the offset recorded in the header.
+
+Loading reads only the header; columns are memoryview slices of the map,
+so load time and RSS stay flat as the ledger grows from 382 wires to the
+23,832-row fund_flows table. ledger.array(name) gives a NumPy view of the
+same memory when NumPy is installed.
+
+Usage:
+    python3 ledger_store.py data/master_wire_ledger_phase25.json
+    python3 ledger_store.py data/master_wire_ledger_phase25.json --out /tmp/ledger.cols
+
+    from ledger_store import open_ledger
+    with open_ledger('data/master_wire_ledger_phase25.json') as ledger:
+        total = sum(ledger['amount_cents']) / 100
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+MAGIC = b'EFTACOL1'
+FORMAT_VERSION = 1
+ALIGN = 8
+EPOCH = date(1970, 1, 1)
+NO_DATE = -2 ** 31
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y')
+
+FLAG_AMOUNT_DEDUP = 1 << 0      # was_in_amount_dedup
+FLAG_DATE_RECOVERY = 1 << 1     # is_date_recovery
+FLAG_PHASE25_RECOVERY = 1 << 2  # is_phase25_recovery
+FLAG_BANK_KNOWN = 1 << 3        # bank_involved present
+FLAG_BANK_INVOLVED = 1 << 4     # bank_involved True
+FLAG_HAS_SNIPPET = 1 << 5       # context_snippet present
+
+# column → (memoryview format, itemsize)
+COLUMN_TYPES = {
+    'amount_cents': ('q', 8),
+    'date': ('i', 4),
+    'entity_from': ('I', 4),
+    'entity_to': ('I', 4),
+    'datasets': ('H', 2),
+    'source': ('B', 1),
+    'tier': ('B', 1),
+    'exhibit': ('B', 1),
+    'recovery': ('B', 1),
+    'confidence': ('B', 1),
+    'flags': ('B', 1),
+    'snippet_offsets': ('I', 4),
+    'snippet_text': ('B', 1),
+}
+
+# enum column → JSON key. Code 0 is reserved for "key absent".
+ENUM_KEYS = {
+    'source': 'source',
+    'tier': 'tier',
+    'exhibit': 'exhibit',
+    'recovery': 'date_recovery_method',
+    'confidence': 'date_recovery_confidence',
+}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# NORMALIZERS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def parse_date(value) -> int:
+    """'2013-10-11' or '5/21/2014' → days since epoch; None → NO_DATE."""
+    if not value:
+        return NO_DATE
+    for fmt in DATE_FORMATS:
+        try:
+            return (datetime.strptime(value, fmt).date() - EPOCH).days
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r}")
+
+
+def format_date(days: int) -> str | None:
+    """Inverse of parse_date, as ISO 8601."""
+    if days == NO_DATE:
+        return None
+    return date.fromordinal(EPOCH.toordinal() + days).isoformat()
+
+
+def parse_datasets(value) -> int:
+    """'[8, 9, 10]' (or a list) → bitmask with bits 8, 9, 10 set."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = json.loads(value)
+    mask = 0
+    for ds in value:
+        if not 0 <= ds < 16:
+            raise ValueError(f"Dataset out of range: {ds}")
+        mask |= 1 << ds
+    return mask
+
+
+def datasets_from_mask(mask: int) -> list[int]:
+    return [ds for ds in range(16) if mask >> ds & 1]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# WRITER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _columns_from_rows(rows: list[dict]) -> tuple[dict, dict]:
+    """Encode ledger dicts into (header dictionaries, {column: bytes})."""
+    from array import array
+
+    entities = sorted({w['entity_from'] for w in rows} | {w['entity_to'] for w in rows})
+    entity_code = {name: i for i, name in enumerate(entities)}
+    enums = {col: [None] + sorted({w[key] for w in rows if w.get(key) is not None})
+             for col, key in ENUM_KEYS.items()}
+    enum_code = {col: {v: i for i, v in enumerate(values)} for col, values in enums.items()}
+
+    cols = {name: array(fmt) for name, (fmt, _) in COLUMN_TYPES.items() if name != 'snippet_text'}
+    snippet_text = bytearray()
+    cols['snippet_offsets'].append(0)
+
+    for i, w in enumerate(rows):
+        try:
+            cols['amount_cents'].append(round(w['amount'] * 100))
+            cols['date'].append(parse_date(w.get('date')))
+            cols['datasets'].append(parse_datasets(w.get('datasets')))
+        except ValueError as e:
+            raise ValueError(f"Row {i}: {e}") from None
+        cols['entity_from'].append(entity_code[w['entity_from']])
+        cols['entity_to'].append(entity_code[w['entity_to']])
+        for col, key in ENUM_KEYS.items():
+            cols[col].append(enum_code[col][w.get(key)])
+
+        flags = 0
+        if w.get('was_in_amount_dedup'):
+            flags |= FLAG_AMOUNT_DEDUP
+        if w.get('is_date_recovery'):
+            flags |= FLAG_DATE_RECOVERY
+        if w.get('is_phase25_recovery'):
+            flags |= FLAG_PHASE25_RECOVERY
+        if 'bank_involved' in w:
+            flags |= FLAG_BANK_KNOWN
+            if w['bank_involved']:
+                flags |= FLAG_BANK_INVOLVED
+        if w.get('context_snippet') is not None:
+            flags |= FLAG_HAS_SNIPPET
+            snippet_text += w['context_snippet'].encode('utf-8')
+        cols['flags'].append(flags)
+        cols['snippet_offsets'].append(len(snippet_text))
+
+    blobs = {name: a.tobytes() for name, a in cols.items()}
+    blobs['snippet_text'] = bytes(snippet_text)
+    return {'entities': entities, 'enums': enums}, blobs
+
+
+def write_store(rows: list[dict], out_path, source: str | None = None):
+    """Write ledger rows to out_path in the columnar format (atomically)."""
+    dicts, blobs = _columns_from_rows(rows)
+    header = {
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'rows': len(rows),
+        'source': source,
+        **dicts,
+        'columns': {},
+    }
+
+    # Offsets depend on header length, which depends on offsets: lay out
+    # columns relative to a data start, then fix it once the header settles.
+    data_start = 0
+    while True:
+        offset, layout = data_start, {}
+        for name, blob in blobs.items():
+            layout[name] = [offset, len(blob)]
+            offset += -(-len(blob) // ALIGN) * ALIGN
+        header['columns'] = layout
+        encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        needed = -(-(len(MAGIC) + 4 + len(encoded)) // ALIGN) * ALIGN
+        if needed == data_start:
+            break
+        data_start = needed
+
+    out_path = Path(out_path)
+    fd, tmp = tempfile.mkstemp(dir=out_path.parent, prefix=f".{out_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(encoded)))
+            f.write(encoded)
+            for name, blob in blobs.items():
+                f.seek(layout[name][0])
+                f.write(blob)
+            f.truncate(offset)
+        os.replace(tmp, out_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def convert(json_path, out_path=None) -> Path:
+    """JSON ledger → columnar file (default: same name, .cols suffix)."""
+    json_path = Path(json_path)
+    out_path = Path(out_path) if out_path else json_path.with_suffix('.cols')
+    with open(json_path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    write_store(rows, out_path, source=json_path.name)
+    return out_path
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# LOADER
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class WireLedger:
+    """Read-only, memory-mapped view of a columnar ledger file.
+    ledger['amount_cents'] is a zero-copy memoryview; ledger.row(i)
+    rebuilds one normalized dict."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._map)
+        if buf[:len(MAGIC)] != MAGIC:
+            buf.release()
+            self._map.close()
+            raise ValueError(f"Not a columnar ledger: {self.path}")
+        (header_len,) = struct.unpack_from('<I', buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(buf[start:start + header_len]))
+        if self.header['version'] != FORMAT_VERSION or self.header['byteorder'] != sys.byteorder:
+            buf.release()
+            self._map.close()
+            raise ValueError(f"Unsupported ledger format or byte order: {self.path}")
+
+        self.entities = self.header['entities']
+        self.enums = self.header['enums']
+        self._views = {'': buf}
+        for name, (offset, length) in self.header['columns'].items():
+            self._views[name] = buf[offset:offset + length].cast(COLUMN_TYPES[name][0])
+
+    def __len__(self) -> int:
+        return self.header['rows']
+
+    def __getitem__(self, column: str) -> memoryview:
+        return self._views[column]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the column views and unmap the file. A NumPy array from
+        array() that is still alive keeps its view, and with it the map,
+        valid: the unmap is then left to garbage collection, once the last
+        such array is gone."""
+        views, self._views = self._views, {}
+        try:
+            for view in views.values():
+                view.release()
+            self._map.close()
+        except BufferError:
+            pass
+
+    def array(self, column: str):
+        """NumPy view of a column (no copy). Requires NumPy. The array
+        stays readable after close(); see there."""
+        import numpy as np
+        return np.frombuffer(self._views[column], dtype=self._views[column].format)
+
+    def snippet(self, i: int) -> str | None:
+        if not self._views['flags'][i] & FLAG_HAS_SNIPPET:
+            return None
+        offsets = self._views['snippet_offsets']
+        return bytes(self._views['snippet_text'][offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+    def row(self, i: int) -> dict:
+        """Row i as a normalized dict: ISO date, datasets as a list, keys
+        that were absent in the JSON left out."""
+        v = self._views
+        flags = v['flags'][i]
+        wire = {
+            'source': self.enums['source'][v['source'][i]],
+            'amount': v['amount_cents'][i] / 100,
+            'entity_from': self.entities[v['entity_from'][i]],
+            'entity_to': self.entities[v['entity_to'][i]],
+            'date': format_date(v['date'][i]),
+            'was_in_amount_dedup': bool(flags & FLAG_AMOUNT_DEDUP),
+            'is_date_recovery': bool(flags & FLAG_DATE_RECOVERY),
+        }
+        for col, key in ENUM_KEYS.items():
+            code = v[col][i]
+            if code and col != 'source':
+                wire[key] = self.enums[col][code]
+        if flags & FLAG_PHASE25_RECOVERY:
+            wire['is_phase25_recovery'] = True
+        if flags & FLAG_BANK_KNOWN:
+            wire['bank_involved'] = bool(flags & FLAG_BANK_INVOLVED)
+        if v['datasets'][i]:
+            wire['datasets'] = datasets_from_mask(v['datasets'][i])
+        if flags & FLAG_HAS_SNIPPET:
+            wire['context_snippet'] = self.snippet(i)
+        return wire
+
+    def rows(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+
+def open_ledger(path) -> WireLedger:
+    """Open a columnar ledger. Given the .json ledger instead, (re)build the
+    sibling .cols file first if it is missing or older than the JSON, and
+    again if it was written with another FORMAT_VERSION or byte order."""
+    path = Path(path)
+    if path.suffix != '.json':
+        return WireLedger(path)
+    cols = path.with_suffix('.cols')
+    if not cols.exists() or cols.stat().st_mtime_ns < path.stat().st_mtime_ns:
+        convert(path, cols)
+    try:
+        return WireLedger(cols)
+    except ValueError:
+        convert(path, cols)
+        return WireLedger(cols)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert the master wire ledger JSON into a memory-mappable columnar file'
+    )
+    parser.add_argument('ledger', help='Ledger JSON (e.g. data/master_wire_ledger_phase25.json)')
+    parser.add_argument('--out', help='Output path (default: ledger path with .cols suffix)')
+    args = parser.parse_args()
+
+    out = convert(args.ledger, args.out)
+    with WireLedger(out) as ledger:
+        dated = sum(1 for d in ledger['date'] if d != NO_DATE)
+        print(f"━━━ COLUMNAR LEDGER ━━━")
+        print(f"  Source:   {args.ledger}")
+        print(f"  Output:   {out} ({out.stat().st_size:,} bytes)")
+        print(f"  Wires:    {len(ledger)} ({dated} dated)")
+        print(f"  Entities: {len(ledger.entities)}")
+        print(f"  Total:    ${sum(ledger['amount_cents']) / 100:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
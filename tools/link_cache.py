@@ -0,0 +1,147 @@
+"""
+link_cache.py — Content-hash incremental cache for the link tools
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+linkify_efta.py and convert_links_new_tab.py are idempotent: once a file
+has been processed, running the tool again changes nothing. The manifest
+records, per tool, the BLAKE2 hash of each file's content as last left
+"clean" by that tool. On the next run a file whose hash still matches is
+skipped before any regex work.
+
+Each tool's section is stamped with a version derived from the tool's own
+source files, so editing the linkifier invalidates its cache automatically.
+
+Manifest layout (JSON, default ./.efta_link_cache.json):
+    {"tools": {"linkify_efta": {"version": "...",
+                                "files": {"/abs/path.md": "<blake2b>"}}}}
+
+Usage (from a tool's main):
+    cache = LinkCache.open(args, 'linkify_efta', source_version(__file__))
+    known = cache.clean_hash(path)        # pass to the worker
+    cache.mark_clean(path, digest)        # digest returned by the worker
+    cache.save()
+"""
+
+import json
+import os
+from hashlib import blake2b
+from pathlib import Path
+
+DEFAULT_CACHE_FILE = '.efta_link_cache.json'
+
+
+def content_hash(data: bytes) -> str:
+    """BLAKE2b digest of raw file bytes."""
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def file_hash(path, block_size: int = 1 << 20) -> str:
+    """content_hash of a file, read in blocks so memory stays flat."""
+    h = blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_version(*paths) -> str:
+    """Version stamp for a tool: hash of the source files that implement it."""
+    h = blake2b(digest_size=8)
+    for p in paths:
+        h.update(Path(p).read_bytes())
+    return h.hexdigest()
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes the way open(..., 'r', encoding='utf-8') would,
+    including universal-newline translation."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def add_cache_arguments(parser):
+    """Add the shared --no-cache / --cache-file options to an argparse parser."""
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-process every file, ignoring and not updating the cache')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, metavar='PATH',
+                        help=f'Cache manifest location (default ./{DEFAULT_CACHE_FILE})')
+
+
+class LinkCache:
+    """One tool's view of the shared manifest."""
+
+    def __init__(self, path: Path | None, tool: str, version: str):
+        self.path = path
+        self.tool = tool
+        self.version = version
+        self.files = {}
+        self.hits = 0
+        self._saved = None          # section as read, when it is current
+        if path is not None and path.exists():
+            section = self._read(path).get('tools', {}).get(tool, {})
+            if section.get('version') == version:
+                self.files = section.get('files', {})
+                self._saved = dict(self.files)
+
+    @classmethod
+    def open(cls, args, tool: str, version: str) -> 'LinkCache':
+        """Build from parsed --no-cache / --cache-file arguments."""
+        path = None if args.no_cache else Path(args.cache_file)
+        return cls(path, tool, version)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}  # Unreadable or corrupt manifest — start fresh
+
+    def clean_hash(self, file_path: Path) -> str | None:
+        """Hash recorded the last time this file was left clean, if any."""
+        if not self.enabled:
+            return None
+        return self.files.get(self._key(file_path))
+
+    def mark_clean(self, file_path: Path, digest: str | None, hit: bool = False):
+        """Record the worker's result. digest None means the file still has
+        pending changes (e.g. after a dry run) and must not be skipped."""
+        if hit:
+            self.hits += 1
+        if not self.enabled:
+            return
+        key = self._key(file_path)
+        if digest is None:
+            self.files.pop(key, None)
+        else:
+            self.files[key] = digest
+
+    def save(self):
+        """Merge this tool's section into the manifest and write it atomically.
+        A run that changed nothing (the common hook case) writes nothing."""
+        if not self.enabled or self.files == self._saved:
+            return
+        import tempfile
+        manifest = self._read(self.path) if self.path.exists() else {}
+        manifest.setdefault('tools', {})[self.tool] = {
+            'version': self.version,
+            'files': dict(sorted(self.files.items())),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+link_pipeline.py — Fused EFTA link refresh (one read, at most one write)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+A full link refresh used to be three tools run back to back, each reading
+and rewriting every file:
+
+    inject_efta_source_table.py → linkify_efta.py → convert_links_new_tab.py
+
+This runner loads each file once and threads the text through the same
+three steps in memory, in the same order:
+
+  1. inject_into_text        📄 EFTA Source Documents table (narratives only)
+  2. linkify_all             EFTA IDs → PDFs, Dataset refs → browse pages
+  3. convert_external_links  [text](https://...) → <a target="_blank">
+
+The file is written once, atomically, and only if the final text differs.
+If any step raises, that file is left untouched on disk.
+
+Output is identical to running the three tools in sequence.
+
+With --watch the runner stays up and re-links .md files as they are
+saved, keeping patterns and the cache warm (see link_watch.py).
+
+Usage:
+    python3 link_pipeline.py --dir ./narratives
+    python3 link_pipeline.py --dir ./narratives --dry-run
+    python3 link_pipeline.py --dir . --recursive --jobs 8
+    python3 link_pipeline.py --file ./narratives/01_jeepers_pipeline.md
+    python3 link_pipeline.py --dir . --recursive --profile
+    python3 link_pipeline.py --watch                 # narratives/ + docs/, re-link on save
+"""
+
+import os
+import argparse
+from functools import partial
+from pathlib import Path
+
+import efta_core
+import linkify_efta
+import convert_links_new_tab
+import inject_efta_source_table
+from linkify_efta import linkify_all
+from convert_links_new_tab import convert_external_links
+from inject_efta_source_table import inject_into_text
+from file_batch import add_jobs_argument
+from link_cache import LinkCache, add_cache_arguments, content_hash, decode_text, source_version
+from link_profile import Profiler, add_profile_argument, map_profiled, timed
+from link_watch import add_watch_argument, md_files, watch, watch_roots
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# IN-MEMORY PIPELINE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def run_pipeline(text: str, file_name: str, profile=None) -> tuple[str, dict]:
+    """Apply inject → linkify → convert to text. Returns (text, counts)
+    where counts has keys injected, efta, ds, converted. profile is a
+    link_profile.FileProfile under --profile."""
+    with timed(profile, 'inject'):
+        text, injected = inject_into_text(text, file_name)
+    with timed(profile, 'linkify') as stats:
+        text, efta_count, ds_count = linkify_all(text, stats)
+    with timed(profile, 'convert') as stats:
+        text, converted = convert_external_links(text, stats)
+    return text, {
+        'injected': injected,
+        'efta': efta_count,
+        'ds': ds_count,
+        'converted': converted,
+    }
+
+
+def write_atomic(file_path: Path, text: str):
+    """Write text to file_path via a temp file + rename, so a crash never
+    leaves a truncated file behind."""
+    import shutil               # write path only: keeps hook-driven no-op runs light
+    import tempfile
+    fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        shutil.copymode(file_path, tmp)
+        os.replace(tmp, file_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def process_file_cached(item: tuple[Path, str | None], dry_run: bool = False,
+                        profile=None) -> tuple[dict, str | None, bool]:
+    """Run the pipeline over one file. item is (file_path, clean_hash).
+    Returns (counts, new_clean_hash, cache_hit) — see linkify_efta.process_file_cached."""
+    file_path, clean_hash = item
+    file_path = Path(file_path)
+    with timed(profile, 'read'):
+        data = file_path.read_bytes()
+        digest = content_hash(data)
+    if profile:
+        profile.bytes_read = len(data)
+    if digest == clean_hash:
+        if profile:
+            profile.cache_hit = True
+        return {'injected': False, 'efta': 0, 'ds': 0, 'converted': 0}, digest, True
+
+    original = decode_text(data)
+    modified, counts = run_pipeline(original, file_path.name, profile)
+
+    if modified != original:
+        if dry_run:
+            return counts, None, False
+        with timed(profile, 'write'):
+            write_atomic(file_path, modified)
+            encoded = modified.encode('utf-8')
+            digest = content_hash(encoded)
+        if profile:
+            profile.bytes_written = len(encoded)
+
+    return counts, digest, False
+
+
+def process_file(file_path: Path, dry_run: bool = False) -> dict:
+    """Run the pipeline over one file. Returns the counts dict."""
+    counts, _, _ = process_file_cached((file_path, None), dry_run)
+    return counts
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def run_batch(files: list[Path], cache, worker, profiler, dry_run: bool,
+              jobs: int = 1, watching: bool = False) -> tuple[dict, int]:
+    """Process files, print one line per file and record results in the
+    cache. Returns (totals, files changed). Under --watch only files that
+    needed work are printed."""
+    items = [(f, cache.clean_hash(f)) for f in files]
+    results = map_profiled(worker, items, jobs, profiler)
+
+    totals = {'injected': 0, 'efta': 0, 'ds': 0, 'converted': 0}
+    changed = 0
+    for f, (counts, clean_hash, hit) in zip(files, results):
+        cache.mark_clean(f, clean_hash, hit)
+        parts = []
+        if counts['injected']:
+            parts.append("source table")
+        if counts['efta']:
+            parts.append(f"{counts['efta']} EFTA→PDF")
+        if counts['ds']:
+            parts.append(f"{counts['ds']} Dataset→browse")
+        if counts['converted']:
+            parts.append(f"{counts['converted']} → target=\"_blank\"")
+        for key in totals:
+            totals[key] += int(counts[key])
+
+        if parts:
+            changed += 1
+            action = "Would update" if dry_run else "Updated"
+            print(f"  🔗 {f.name}: {action} — {', '.join(parts)}")
+        elif not watching:
+            print(f"  ✅ {f.name}: Already up to date")
+    return totals, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inject source tables, linkify EFTA/Dataset refs and convert links in one pass'
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--dir', help='Directory of .md files to process')
+    group.add_argument('--file', help='Single .md file to process')
+    add_watch_argument(group, parser)
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show changes without modifying files')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                        help='Process subdirectories too')
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    if args.file:
+        files = [Path(args.file)]
+    elif args.watch is not None:
+        roots = watch_roots(args.watch)
+        files = md_files(roots, args.recursive)
+    else:
+        p = Path(args.dir)
+        files = sorted(p.rglob('*.md') if args.recursive else p.glob('*.md'))
+
+    mode = 'DRY RUN' if args.dry_run else 'LIVE'
+    print(f"━━━ EFTA LINK PIPELINE ({mode}) ━━━")
+    print(f"  Steps: inject source table → linkify EFTA/Dataset → target=\"_blank\"")
+    print(f"  Files: {len(files)}")
+    print(f"{'━' * 60}\n")
+
+    version = source_version(__file__, *efta_core.sources(), linkify_efta.__file__,
+                             convert_links_new_tab.__file__, inject_efta_source_table.__file__)
+    cache = LinkCache.open(args, 'link_pipeline', version)
+    profiler = Profiler.open(args, 'link_pipeline')
+    worker = partial(process_file_cached, dry_run=args.dry_run)
+    totals, changed = run_batch(files, cache, worker, profiler, args.dry_run, args.jobs)
+
+    print(f"\n{'━' * 60}")
+    verb = 'would be' if args.dry_run else ''
+    print(f"  Source tables:        {totals['injected']} {verb} injected")
+    print(f"  EFTA→PDF links:       {totals['efta']} {verb} created")
+    print(f"  Dataset→browse links: {totals['ds']} {verb} created")
+    print(f"  target=\"_blank\":      {totals['converted']} {verb} converted")
+    print(f"  Files:                {changed} {verb} rewritten")
+    if cache.hits:
+        print(f"  Unchanged (cached):   {cache.hits} files skipped")
+    cache.save()
+
+    if args.watch is not None:
+        def handle_batch(batch):
+            _, batch_changed = run_batch(batch, cache, worker, profiler, args.dry_run, watching=True)
+            cache.save()
+            return batch_changed
+        watch(roots, handle_batch, args)
+
+    profiler.report()
+
+    if args.dry_run and changed:
+        print(f"\n  Run without --dry-run to apply changes.")
+    print(f"\n━━━ PIPELINE COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+link_profile.py — Opt-in per-file, per-pass profiling for the link tools
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+With --profile, every file processed by linkify_efta.py,
+convert_links_new_tab.py or link_pipeline.py gets a FileProfile:
+
+  • wall time per pass (read, inject, linkify, convert, write)
+  • regex matches seen and links made by each pass
+  • matches skipped, by the protected span that covered them
+    (fence, code, anchor, md_link, url; see linkify_efta.PROTECTED_RE)
+    or 'other' (inter-dataset gap, dataset number out of range)
+  • bytes read and written, and whether the cache skipped the file
+
+Workers fill the profile and return it with their result, so --jobs works
+unchanged. The main process writes one JSON object per file to the trace
+(JSON lines, default ./.link_profile.jsonl) and prints an aggregated
+table: which pass the time went to, and which files were slowest.
+
+Without --profile nothing is recorded; the passes take stats=None and
+skip all counting.
+
+Usage (from a tool's main):
+    profiler = Profiler.open(args, 'linkify_efta')
+    results = map_profiled(worker, items, args.jobs, profiler)
+    profiler.report()
+
+and in the worker (profile is None unless --profile):
+    with timed(profile, 'linkify') as stats:
+        text, efta, ds = linkify_all(text, stats)
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+from file_batch import map_files
+
+DEFAULT_TRACE_FILE = '.link_profile.jsonl'
+PASS_ORDER = ('read', 'inject', 'linkify', 'convert', 'write')
+COUNT_KEYS = ('matches', 'links')       # everything else in a pass Counter is a rejection
+SLOWEST_FILES = 10
+
+
+def add_profile_argument(parser):
+    """Add the shared --profile [PATH] option to an argparse parser."""
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_TRACE_FILE, metavar='PATH',
+                        help=f'Record per-file, per-pass timings and counters as JSON lines '
+                             f'(default ./{DEFAULT_TRACE_FILE}) and print a summary table')
+
+
+class FileProfile:
+    """Timings and counters for one file. Picklable, so workers can return it."""
+
+    def __init__(self, file_path):
+        self.file = str(file_path)
+        self.seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.cache_hit = False
+        self.passes = {}            # pass name → (seconds, Counter)
+
+    def add(self, name: str, seconds: float, counts: Counter):
+        prev_seconds, merged = self.passes.get(name, (0.0, Counter()))
+        merged.update(counts)       # not `+`: that drops zero counts, which are recorded as 0
+        self.passes[name] = (prev_seconds + seconds, merged)
+
+    def record(self) -> dict:
+        """JSON-ready trace line."""
+        passes = {}
+        for name, (seconds, counts) in self.passes.items():
+            entry = {'seconds': round(seconds, 6)}
+            entry.update({k: counts[k] for k in COUNT_KEYS if k in counts})
+            rejected = {k: v for k, v in sorted(counts.items()) if k not in COUNT_KEYS and v}
+            if rejected:
+                entry['rejected'] = rejected
+            passes[name] = entry
+        return {
+            'file': self.file,
+            'seconds': round(self.seconds, 6),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'cache_hit': self.cache_hit,
+            'passes': passes,
+        }
+
+
+@contextmanager
+def timed(profile: FileProfile | None, name: str):
+    """Time a pass. Yields the Counter the pass should fill, or None when
+    not profiling (so the pass can skip its counting entirely)."""
+    if profile is None:
+        yield None
+        return
+    counts = Counter()
+    start = perf_counter()
+    try:
+        yield counts
+    finally:
+        profile.add(name, perf_counter() - start, counts)
+
+
+class _Profiled:
+    """Wraps a process_file_cached-style worker: calls it with a fresh
+    FileProfile and returns (result, profile). Module-level so it pickles."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, item):
+        profile = FileProfile(item[0])
+        start = perf_counter()
+        result = self.fn(item, profile=profile)
+        profile.seconds = perf_counter() - start
+        return result, profile
+
+
+def map_profiled(fn, items, jobs: int, profiler: 'Profiler') -> list:
+    """map_files, recording a FileProfile per item when profiling is on.
+    fn must accept a profile= keyword. Returns the plain results."""
+    if not profiler.enabled:
+        return map_files(fn, items, jobs)
+    pairs = map_files(_Profiled(fn), items, jobs)
+    for _, profile in pairs:
+        profiler.add(profile)
+    return [result for result, _ in pairs]
+
+
+class Profiler:
+    """Main-process side: writes the JSON lines trace and aggregates it."""
+
+    def __init__(self, path: Path | None, tool: str):
+        self.path = path
+        self.tool = tool
+        self.files = []
+        self._out = None
+        if path is not None:
+            import json                         # only when --profile is on
+            from datetime import datetime, timezone
+            self._dumps = json.dumps
+            self._out = open(path, 'w', encoding='utf-8')
+            self._write({'tool': tool,
+                         'started': datetime.now(timezone.utc).isoformat(timespec='seconds')})
+
+    @classmethod
+    def open(cls, args, tool: str) -> 'Profiler':
+        return cls(Path(args.profile) if args.profile else None, tool)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _write(self, obj: dict):
+        self._out.write(self._dumps(obj, ensure_ascii=False) + '\n')
+
+    def add(self, profile: FileProfile):
+        self.files.append(profile)
+        self._write(profile.record())
+
+    def report(self):
+        """Print the aggregated table and close the trace."""
+        if not self.enabled:
+            return
+        self._out.close()
+
+        totals = {}                                 # pass → [files, seconds, Counter]
+        for fp in self.files:
+            for name, (seconds, counts) in fp.passes.items():
+                entry = totals.setdefault(name, [0, 0.0, Counter()])
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2].update(counts)
+        wall = sum(fp.seconds for fp in self.files) or 1e-9
+        names = sorted(totals, key=lambda n: (PASS_ORDER.index(n) if n in PASS_ORDER else len(PASS_ORDER), n))
+
+        print(f"\n━━━ PROFILE ({self.tool}) ━━━")
+        print(f"  {'Pass':<9} {'Files':>6} {'Seconds':>9} {'Share':>6} {'Matches':>9} {'Links':>8}  Rejected")
+        for name in names:
+            files, seconds, counts = totals[name]
+            matches = f"{counts['matches']:,}" if 'matches' in counts else '—'
+            links = f"{counts['links']:,}" if 'links' in counts else '—'
+            rejected = ' · '.join(f"{k} {v:,}" for k, v in counts.most_common() if k not in COUNT_KEYS and v)
+            print(f"  {name:<9} {files:>6} {seconds:>9.3f} {seconds / wall:>6.1%} "
+                  f"{matches:>9} {links:>8}  {rejected or '—'}")
+
+        slowest = sorted(self.files, key=lambda fp: fp.seconds, reverse=True)[:SLOWEST_FILES]
+        if slowest:
+            print(f"\n  Slowest files:")
+            for fp in slowest:
+                top = max(fp.passes.items(), key=lambda kv: kv[1][0], default=None)
+                where = f"  ({top[0]} {top[1][0] * 1000:.1f} ms)" if top else ''
+                print(f"    {fp.seconds * 1000:9.1f} ms  {fp.file}{where}")
+
+        read = sum(fp.bytes_read for fp in self.files)
+        written = sum(fp.bytes_written for fp in self.files)
+        hits = sum(fp.cache_hit for fp in self.files)
+        print(f"\n  Bytes: {read / 1e6:,.2f} MB read · {written / 1e6:,.2f} MB written · "
+              f"cache hits {hits}/{len(self.files)}")
+        print(f"  Trace: {self.path}")
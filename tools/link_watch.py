@@ -0,0 +1,291 @@
+"""
+link_watch.py — --watch mode for the link tools (one warm process)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Instead of re-running linkify_efta.py / convert_links_new_tab.py /
+link_pipeline.py over whole trees from cron, `--watch` keeps one process
+alive. The compiled patterns, the memoized link builders and the
+content-hash cache stay in memory, and only .md files that were actually
+written are re-processed.
+
+  • Linux: inotify (through ctypes, no third-party packages) on every
+    watched directory, and on every subdirectory with --recursive.
+  • Anywhere else, or with --poll: a stat() sweep of the watched
+    directories every --poll seconds.
+
+Events are debounced. A batch starts after the first event and closes once
+the tree has been quiet for --debounce seconds (default 0.1), or after
+MAX_BATCH_WAIT seconds at the latest, so a steady stream of saves is still
+flushed. Batches run in-process, even under --jobs, because paying worker
+startup on every save is exactly what the watcher is there to avoid.
+
+A tool's own rewrite of a watched .md file is an event too: an in-place
+write (linkify_efta.py, convert_links_new_tab.py) as IN_CLOSE_WRITE, the
+atomic write of link_pipeline.py as a rename. So each rewritten file is
+seen once more. That second look is a content-hash cache hit (or, with
+--no-cache, an idempotent no-op) and is not reported.
+
+Default directories are narratives/ and docs/, relative to the working
+directory.
+
+Usage (from a tool's main):
+    roots = watch_roots(args.watch)
+    files = md_files(roots, args.recursive)      # catch-up pass
+    ...
+    watch(roots, handle_batch, args)             # blocks until Ctrl-C / SIGTERM
+
+Command line:
+    python3 link_pipeline.py --watch
+    python3 link_pipeline.py --watch narratives docs --recursive
+    python3 linkify_efta.py --watch ./narratives --poll 0.5
+"""
+
+import os
+import select
+import signal
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_WATCH_DIRS = ('narratives', 'docs')
+DEFAULT_DEBOUNCE = 0.1          # seconds of quiet that close a batch
+DEFAULT_POLL = 0.25             # seconds between stat() sweeps
+MAX_BATCH_WAIT = 1.0            # a batch is flushed after this long regardless
+WATCH_SUFFIX = '.md'
+
+
+def add_watch_argument(group, parser):
+    """Add --watch [DIR ...] to the tool's --dir/--file group, plus the
+    shared --debounce / --poll options."""
+    group.add_argument('--watch', nargs='*', metavar='DIR',
+                       help=f'Stay running and re-process .md files as they change '
+                            f'(default dirs: {" ".join(DEFAULT_WATCH_DIRS)})')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                        help=f'--watch: quiet time that closes a batch (default {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--poll', type=float, nargs='?', const=DEFAULT_POLL, metavar='SECONDS',
+                        help=f'--watch: poll with stat() instead of inotify '
+                             f'(default interval {DEFAULT_POLL}s)')
+
+
+def watch_roots(dirs: list[str]) -> list[Path]:
+    """Directories to watch: the ones given, else DEFAULT_WATCH_DIRS.
+    Missing directories are skipped; none at all is an error."""
+    wanted = [Path(d) for d in (dirs or DEFAULT_WATCH_DIRS)]
+    roots = [d for d in wanted if d.is_dir()]
+    for d in wanted:
+        if not d.is_dir():
+            print(f"  ⚠️  Not watching {d}: no such directory")
+    if not roots:
+        sys.exit(f"Nothing to watch: none of {', '.join(map(str, wanted))} exist")
+    return roots
+
+
+def md_files(roots: list[Path], recursive: bool) -> list[Path]:
+    """Sorted .md files under the watched directories."""
+    found = set()
+    for root in roots:
+        found.update(root.rglob('*.md') if recursive else root.glob('*.md'))
+    return sorted(found)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BACKENDS — wait(timeout) returns the set of .md paths written since
+# the last call (empty on timeout); None means "rescan everything"
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class InotifyWatcher:
+    """inotify through libc. Reports IN_CLOSE_WRITE (in-place saves) and
+    IN_MOVED_TO (atomic rename saves)."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT_SIZE = 16                     # struct inotify_event without the name
+
+    name = 'inotify'
+
+    def __init__(self, roots: list[Path], recursive: bool):
+        import ctypes                   # only in --watch runs
+        import ctypes.util
+        import struct
+        self._ctypes = ctypes
+        self._header = struct.Struct('iIII')
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.recursive = recursive
+        self.dirs = {}                  # watch descriptor → directory
+        for root in roots:
+            self._add_tree(root)
+
+    def _add(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            raise OSError(err, f'inotify_add_watch failed: {os.strerror(err)}', str(directory))
+        self.dirs[wd] = directory
+
+    def _add_tree(self, root: Path):
+        self._add(root)
+        if self.recursive:
+            for sub in sorted(p for p in root.rglob('*') if p.is_dir()):
+                self._add(sub)
+
+    def wait(self, timeout: float) -> set[Path] | None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                buf = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _, size = self._header.unpack_from(buf, pos)
+                raw = buf[pos + self.EVENT_SIZE:pos + self.EVENT_SIZE + size]
+                pos += self.EVENT_SIZE + size
+                if mask & self.IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                directory = self.dirs.get(wd)
+                if mask & self.IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+                path = directory / os.fsdecode(raw.rstrip(b'\0'))
+                if mask & self.IN_ISDIR:
+                    if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        try:
+                            self._add_tree(path)
+                        except OSError:
+                            continue        # removed again before we got to it
+                        rescan = True       # files may have landed before the watch
+                elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO) and path.suffix == WATCH_SUFFIX:
+                    changed.add(path)
+        return None if rescan else changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compare (mtime_ns, size) of every .md file
+    between stat() sweeps."""
+
+    name = 'polling'
+
+    def __init__(self, roots: list[Path], recursive: bool, interval: float):
+        self.roots = roots
+        self.recursive = recursive
+        self.interval = interval
+        self.seen = self._sweep()
+
+    def _sweep(self) -> dict:
+        seen = {}
+        stack = list(self.roots)
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(WATCH_SUFFIX):
+                        st = entry.stat()
+                        seen[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue        # vanished mid-sweep
+        return seen
+
+    def wait(self, timeout: float) -> set[Path]:
+        time.sleep(min(timeout, self.interval))
+        seen = self._sweep()
+        changed = {Path(p) for p, sig in seen.items() if self.seen.get(p) != sig}
+        self.seen = seen
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(roots: list[Path], recursive: bool, poll: float | None):
+    """inotify when available, polling otherwise (or when asked for)."""
+    if poll is None and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots, recursive)
+        except OSError as e:
+            print(f"  ⚠️  inotify unavailable ({e}); falling back to polling")
+    return PollingWatcher(roots, recursive, poll or DEFAULT_POLL)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# EVENT LOOP
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def next_batch(watcher, roots: list[Path], recursive: bool, debounce: float) -> list[Path]:
+    """Block until something changes, then gather events until the tree
+    has been quiet for `debounce` seconds (at most MAX_BATCH_WAIT).
+    Returns the changed files that still exist, sorted."""
+    changed = set()
+    rescan = False
+    first = None
+    while True:
+        if first is None:
+            timeout = 3600.0
+        else:
+            timeout = min(debounce, first + MAX_BATCH_WAIT - time.monotonic())
+            if timeout <= 0:
+                break
+        events = watcher.wait(timeout)
+        if events is None:
+            rescan = True
+        elif events:
+            changed |= events
+        elif first is not None:
+            break                       # quiet for `debounce`: close the batch
+        else:
+            continue
+        if first is None:
+            first = time.monotonic()
+    if rescan:
+        return md_files(roots, recursive)
+    return sorted(p for p in changed if p.is_file())
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def watch(roots: list[Path], handle_batch, args):
+    """Run handle_batch(files) for every debounced batch of changed .md
+    files under roots, until interrupted. handle_batch returns how many
+    files it rewrote; batches that rewrote nothing (our own writes coming
+    back, saves with nothing to link) are not timed on the console.
+    SIGTERM stops the loop the same way Ctrl-C does."""
+    signal.signal(signal.SIGTERM, _stop)
+    watcher = open_watcher(roots, args.recursive, args.poll)
+    print(f"\n👀 Watching {', '.join(map(str, roots))} ({watcher.name}"
+          f"{', recursive' if args.recursive else ''}) — Ctrl-C to stop")
+    try:
+        while True:
+            files = next_batch(watcher, roots, args.recursive, args.debounce)
+            if not files:
+                continue
+            start = time.perf_counter()
+            if not handle_batch(files):
+                continue
+            print(f"  ⏱  {time.strftime('%H:%M:%S')}  batch of {len(files)} in "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms", flush=True)
+    except KeyboardInterrupt:
+        print(f"\n  Stopped watching.")
+    finally:
+        watcher.close()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+linkify_db.py — Linkify text columns inside the SQLite forensic database
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Runs linkify_all over a text column in place, with no .md export step.
+Defaults to the two columns that carry EFTA / Dataset citations:
+
+    files.extracted_text    (1.48M rows)
+    fund_flows.context
+
+Source rows are never modified. Linkified text goes to one of two places:
+
+  --into table  (default)  shadow table <table>_<column>_linkified
+                           (src_rowid INTEGER PRIMARY KEY, <column>, efta_links, ds_links)
+  --into column            derived column <table>.<column>_linkified
+
+Only rows that gained at least one link are written. Everywhere else the
+original text is already the linkified text, so readers use:
+
+    SELECT f.rowid, COALESCE(l.extracted_text, f.extracted_text)
+    FROM files f LEFT JOIN files_extracted_text_linkified l ON l.src_rowid = f.rowid
+
+Rows are read in rowid order, one --batch-size page per query
+(WHERE rowid > ? LIMIT ?), so no read statement stays open across a commit.
+Each batch is written with executemany in its own transaction, together
+with the last rowid done (table linkify_progress). An interrupted run
+picks up from the last committed batch; --restart starts over.
+
+The database is switched to WAL mode so readers are not blocked while a
+long run is writing.
+
+Usage:
+    python3 linkify_db.py --db ./epstein.db
+    python3 linkify_db.py --db ./epstein.db --target fund_flows.context --dry-run
+    python3 linkify_db.py --db ./epstein.db --into column --batch-size 5000
+    python3 linkify_db.py --db ./epstein.db --restart
+"""
+
+import re
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+
+from linkify_efta import linkify_all
+
+DEFAULT_TARGETS = ['files.extracted_text', 'fund_flows.context']
+DEFAULT_BATCH_SIZE = 1000
+PROGRESS_TABLE = 'linkify_progress'
+
+IDENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# TARGETS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def parse_target(spec: str) -> tuple[str, str]:
+    """'table.column' → (table, column). Identifiers are interpolated into
+    SQL, so only plain names are accepted."""
+    table, _, column = spec.partition('.')
+    if not (IDENT_RE.fullmatch(table) and IDENT_RE.fullmatch(column)):
+        raise ValueError(f"Target must be table.column, got {spec!r}")
+    return table, column
+
+
+def destination(table: str, column: str, into: str) -> str:
+    """Progress key for where the linkified text of table.column is written."""
+    if into == 'column':
+        return f"{table}.{column}_linkified"
+    return f"{table}_{column}_linkified"
+
+
+def check_target(conn: sqlite3.Connection, table: str, column: str):
+    """Raise ValueError unless table.column exists."""
+    cols = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+    if not cols:
+        raise ValueError(f"No such table: {table}")
+    if column not in cols:
+        raise ValueError(f"No such column: {table}.{column}")
+
+
+def prepare(conn: sqlite3.Connection, table: str, column: str, into: str):
+    """Create the progress table and the destination table/column if missing."""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+            dest        TEXT PRIMARY KEY,
+            source      TEXT NOT NULL,
+            last_rowid  INTEGER NOT NULL,
+            rows_linked INTEGER NOT NULL DEFAULT 0,
+            efta_links  INTEGER NOT NULL DEFAULT 0,
+            ds_links    INTEGER NOT NULL DEFAULT 0,
+            updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+        )''')
+    if into == 'column':
+        cols = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        if f"{column}_linkified" not in cols:
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}_linkified" TEXT')
+    else:
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS "{destination(table, column, into)}" (
+                src_rowid   INTEGER PRIMARY KEY,
+                "{column}"  TEXT NOT NULL,
+                efta_links  INTEGER NOT NULL,
+                ds_links    INTEGER NOT NULL
+            )''')
+    conn.commit()
+
+
+def reset(conn: sqlite3.Connection, table: str, column: str, into: str):
+    """Forget progress and clear previously written output (--restart)."""
+    dest = destination(table, column, into)
+    if into == 'column':
+        conn.execute(f'UPDATE "{table}" SET "{column}_linkified" = NULL '
+                     f'WHERE "{column}_linkified" IS NOT NULL')
+    else:
+        conn.execute(f'DELETE FROM "{dest}"')
+    conn.execute(f'DELETE FROM {PROGRESS_TABLE} WHERE dest = ?', (dest,))
+    conn.commit()
+
+
+def load_progress(conn: sqlite3.Connection, dest: str) -> tuple[int, int, int, int]:
+    """(last_rowid, rows_linked, efta_links, ds_links) committed so far."""
+    try:
+        row = conn.execute(f'SELECT last_rowid, rows_linked, efta_links, ds_links '
+                           f'FROM {PROGRESS_TABLE} WHERE dest = ?', (dest,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None  # No progress table yet (read-only dry run on a fresh DB)
+    return tuple(row) if row else (0, 0, 0, 0)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BATCH LOOP
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def linkify_batch(rows: list[tuple[int, str]]) -> tuple[list[tuple], int, int]:
+    """Linkify one page of (rowid, text). Returns (changed, efta, ds) where
+    changed holds (rowid, new_text, efta_count, ds_count) for rows that
+    gained links."""
+    changed = []
+    total_efta = total_ds = 0
+    for rowid, text in rows:
+        if not isinstance(text, str):
+            continue  # NULL or BLOB — nothing to link
+        new_text, efta_count, ds_count = linkify_all(text)
+        if new_text != text:
+            changed.append((rowid, new_text, efta_count, ds_count))
+            total_efta += efta_count
+            total_ds += ds_count
+    return changed, total_efta, total_ds
+
+
+def linkify_target(conn: sqlite3.Connection, table: str, column: str, into: str = 'table',
+                   batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False,
+                   resume: bool = True, on_batch=None) -> tuple[int, int, int, int]:
+    """Linkify table.column from the last committed rowid onward (or from
+    the first row if resume is False).
+    Returns (rows_scanned, rows_linked, efta_links, ds_links) for this run.
+    on_batch(last_rowid, max_rowid) is called after each batch."""
+    dest = destination(table, column, into)
+    source = f"{table}.{column}"
+    last_rowid = load_progress(conn, dest)[0] if resume else 0
+    max_rowid = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+
+    select = (f'SELECT rowid, "{column}" FROM "{table}" '
+              f'WHERE rowid > ? ORDER BY rowid LIMIT ?')
+    if into == 'column':
+        write = f'UPDATE "{table}" SET "{column}_linkified" = ? WHERE rowid = ?'
+    else:
+        write = (f'INSERT OR REPLACE INTO "{dest}" (src_rowid, "{column}", efta_links, ds_links) '
+                 f'VALUES (?, ?, ?, ?)')
+    save = f'''
+        INSERT INTO {PROGRESS_TABLE} (dest, source, last_rowid, rows_linked, efta_links, ds_links)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(dest) DO UPDATE SET
+            last_rowid  = excluded.last_rowid,
+            rows_linked = rows_linked + excluded.rows_linked,
+            efta_links  = efta_links + excluded.efta_links,
+            ds_links    = ds_links + excluded.ds_links,
+            updated_at  = datetime('now')'''
+
+    scanned = linked = total_efta = total_ds = 0
+    while True:
+        rows = conn.execute(select, (last_rowid, batch_size)).fetchall()
+        if not rows:
+            break
+        changed, efta_count, ds_count = linkify_batch(rows)
+        last_rowid = rows[-1][0]
+
+        if not dry_run:
+            with conn:  # one transaction per batch: output + progress together
+                if into == 'column':
+                    conn.executemany(write, [(text, rowid) for rowid, text, _, _ in changed])
+                else:
+                    conn.executemany(write, changed)
+                conn.execute(save, (dest, source, last_rowid, len(changed), efta_count, ds_count))
+
+        scanned += len(rows)
+        linked += len(changed)
+        total_efta += efta_count
+        total_ds += ds_count
+        if on_batch:
+            on_batch(last_rowid, max_rowid)
+
+    return scanned, linked, total_efta, total_ds
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def connect(db_path: Path, dry_run: bool) -> sqlite3.Connection:
+    """Open the database. Dry runs open read-only and leave the journal mode alone."""
+    if dry_run:
+        return sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Linkify EFTA/Dataset references inside the SQLite forensic database'
+    )
+    parser.add_argument('--db', required=True, help='Path to the SQLite database')
+    parser.add_argument('--target', action='append', metavar='TABLE.COLUMN',
+                        help=f'Text column to linkify, repeatable (default: {", ".join(DEFAULT_TARGETS)})')
+    parser.add_argument('--into', choices=['table', 'column'], default='table',
+                        help='Write to a shadow table (default) or a derived <column>_linkified column')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, metavar='ROWS',
+                        help=f'Rows per read/commit (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard saved progress and previous output, start from the first row')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count links without writing to the database')
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"❌ Database not found: {db_path}")
+        sys.exit(1)
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    try:
+        targets = [parse_target(t) for t in (args.target or DEFAULT_TARGETS)]
+    except ValueError as e:
+        parser.error(str(e))
+
+    mode = 'DRY RUN' if args.dry_run else 'LIVE'
+    print(f"━━━ EFTA DATABASE LINKIFIER ({mode}) ━━━")
+    print(f"  Database:   {db_path}")
+    print(f"  Output:     {'shadow table' if args.into == 'table' else 'derived column'}")
+    print(f"  Batch size: {args.batch_size} rows")
+    print(f"{'━' * 60}\n")
+
+    conn = connect(db_path, args.dry_run)
+    grand_efta = grand_ds = 0
+    try:
+        for table, column in targets:
+            source = f"{table}.{column}"
+            try:
+                check_target(conn, table, column)
+            except ValueError as e:
+                print(f"  ⚠️  {source}: {e} — skipped")
+                continue
+
+            dest = destination(table, column, args.into)
+            if not args.dry_run:
+                prepare(conn, table, column, args.into)
+                if args.restart:
+                    reset(conn, table, column, args.into)
+            last_rowid = 0 if args.restart else load_progress(conn, dest)[0]
+            if last_rowid:
+                print(f"  ↻ {source}: resuming after rowid {last_rowid}")
+
+            def report(rowid, max_rowid, source=source):
+                print(f"\r  … {source}: rowid {rowid:,} / {max_rowid:,}", end='', flush=True)
+
+            scanned, linked, efta_count, ds_count = linkify_target(
+                conn, table, column, args.into, args.batch_size, args.dry_run,
+                resume=not args.restart, on_batch=report if sys.stdout.isatty() else None)
+            if sys.stdout.isatty() and scanned:
+                print()
+
+            action = "Would linkify" if args.dry_run else "Linkified"
+            print(f"  🔗 {source} → {dest}: {action} {linked:,} of {scanned:,} rows "
+                  f"({efta_count} EFTA→PDF, {ds_count} Dataset→browse)")
+            grand_efta += efta_count
+            grand_ds += ds_count
+    except KeyboardInterrupt:
+        print(f"\n  ⏸  Interrupted — progress is saved up to the last committed batch")
+        sys.exit(130)
+    finally:
+        conn.close()
+
+    print(f"\n{'━' * 60}")
+    verb = 'would be' if args.dry_run else ''
+    print(f"  EFTA→PDF links:       {grand_efta} {verb} created")
+    print(f"  Dataset→browse links: {grand_ds} {verb} created")
+    print(f"  Total:                {grand_efta + grand_ds}")
+    print(f"\n━━━ DATABASE LINKIFIER COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()
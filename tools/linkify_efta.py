@@ -5,7 +5,7 @@ linkify_efta.py — DOJ EFTA Document Hyperlinker
 Converts plain-text EFTA document IDs and Dataset references in .md files
 into clickable markdown hyperlinks pointing to DOJ PDFs and browse pages.
 
-URL LOGIC (from Phase 5E Redaction Map v18 notebook):
+URL LOGIC (from Phase 5E Redaction Map v18 notebook, in efta_core.links):
   doj_url_files(serial, ds)      → Direct PDF on justice.gov
   doj_url_dataset_page(ds)       → Dataset browse page on DOJ
 
@@ -33,265 +33,538 @@ Usage:
     python3 linkify_efta.py --dir ./narratives --dry-run
     python3 linkify_efta.py --file ./narratives/01_jeepers_pipeline.md
     python3 linkify_efta.py --dir . --recursive
+    python3 linkify_efta.py --dir . --recursive --jobs 8
+    python3 linkify_efta.py --dir . --recursive --no-cache
+    python3 linkify_efta.py --file ./exports/extracted_text.md --stream
+    python3 linkify_efta.py --dir . --recursive --profile
+    python3 linkify_efta.py --watch                       # narratives/ + docs/, on save
 """
 
+import os
 import re
 import sys
 import argparse
+from bisect import bisect_right
+from collections import Counter
+from functools import partial
 from pathlib import Path
 
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# DATASET RANGES — from Phase 5E production scan
-# Same ranges used in the Redaction Map v18 notebook
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-DATASET_RANGES = [
-    # (dataset_number, efta_start, efta_end)
-    (1,  1,        3158),
-    (2,  3159,     3857),
-    (3,  3858,     5586),
-    (4,  5705,     8320),
-    (5,  8409,     8528),
-    (6,  8529,     8998),
-    (7,  9016,     9664),
-    (8,  9676,     39023),
-    (9,  39025,    1262781),
-    (10, 1262782,  2205654),
-    (11, 2205655,  2730264),
-    (12, 2730265,  2731783),
-]
-
-
-def efta_to_dataset(efta_num: int) -> int | None:
-    """Map EFTA serial number to DOJ Dataset number."""
-    for ds, start, end in DATASET_RANGES:
-        if start <= efta_num <= end:
-            return ds
-    return None  # Falls in inter-dataset gap
-
+# DATASET RANGES, patterns and link builders — shared with the other tools
+import efta_core
+from efta_core import DATASET_RANGES
+from efta_core.links import dataset_to_md_link, doj_url_dataset_page, doj_url_files, efta_to_md_link
+from efta_core.patterns import (DATASET_SINGLE_RE, DATASETS_COMPOUND_RE, DIGITS_RE, DS_SHORT_RE,
+                                EFTA_RE, LINKIFY_RE)
+from file_batch import add_jobs_argument
+from link_cache import LinkCache, add_cache_arguments, content_hash, decode_text, file_hash, source_version
+from link_profile import Profiler, add_profile_argument, map_profiled, timed
+from link_watch import add_watch_argument, md_files, watch, watch_roots
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# URL BUILDERS — exact logic from Phase 5E notebook
+# CONTEXT CHECKERS — skip already-linked content
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def doj_url_files(serial, ds):
-    """Direct PDF link on DOJ (confirmed working).
-    From Phase 5E Redaction Map v18 notebook."""
-    if serial is None or ds is None:
-        return None
-    return f"https://www.justice.gov/epstein/files/DataSet%20{ds}/EFTA{int(serial):08d}.pdf"
+# One lexical scan of the document marks every span a match must not be
+# linkified inside. Alternatives are tried leftmost-first, so whichever
+# construct opens first owns the span (a backtick inside an <a> tag is
+# just text, an <a> inside inline code is just code).
+PROTECTED_RE = re.compile(
+    # Cheap first-character gate so the alternation isn't tried at every offset
+    r'(?=[`<!\[h]|^[ \t]*```)(?:'
+    # Fenced code block: ``` line through the closing ``` line (or end of file)
+    r'(?P<fence>^[ \t]*```(?:.*?^[ \t]*```[^\n]*$|.*\Z))'
+    # Inline code: `x` or ``x`` — may wrap lines, but not a blank line
+    r'|(?P<code>``(?:[^`\n]|`(?!`)|\n(?![ \t]*\n))+?``|`(?:[^`\n]|\n(?![ \t]*\n))+`)'
+    # HTML anchor, tag and text: <a href="...">...</a>
+    r'|(?P<anchor><a(?:\s[^>]*)?>.*?(?:</a>|\Z))'
+    # Markdown link or image: [text](url)
+    r'|(?P<md_link>!?\[[^\]\n]*\]\([^)\n]*\))'
+    # Bare URL
+    r'|(?P<url>https?://[^\s<>"\'()\[\]]+))',
+    re.MULTILINE | re.DOTALL
+)
 
 
-def doj_url_dataset_page(ds):
-    """Dataset browse page on DOJ — readers can see neighboring files.
-    From Phase 5E Redaction Map v18 notebook."""
-    if ds is None:
+class ProtectedSpans:
+    """Sorted, non-overlapping index of protected spans in a document.
+    Built once per text; each lookup is a binary search."""
+
+    def __init__(self, text: str, pos: int = 0):
+        self.starts = []
+        self.ends = []
+        self.kinds = []
+        for m in PROTECTED_RE.finditer(text, pos):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+            self.kinds.append(m.lastgroup)
+
+    def covering(self, start: int, end: int) -> str | None:
+        """Kind of the protected span overlapping [start:end], or None."""
+        # Last span that opens before the match ends; spans don't overlap,
+        # so if that one closes before the match starts, no span can reach it.
+        i = bisect_right(self.starts, end - 1) - 1
+        if i >= 0 and self.ends[i] > start:
+            return self.kinds[i]
         return None
-    return f"https://www.justice.gov/epstein/doj-disclosures/data-set-{ds}-files"
 
+    def covers(self, start: int, end: int) -> bool:
+        return self.covering(start, end) is not None
 
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# MARKDOWN LINK BUILDERS
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    def straddles(self, offset: int) -> bool:
+        """True if some span starts before offset and ends after it."""
+        i = bisect_right(self.starts, offset - 1) - 1
+        return i >= 0 and self.ends[i] > offset
 
-def efta_to_md_link(efta_id: str) -> str | None:
-    """Convert 'EFTA00027019' → '<a href="https://...pdf" target="_blank">EFTA00027019</a>'"""
-    num_str = efta_id.replace("EFTA", "")
-    num = int(num_str)
-    ds = efta_to_dataset(num)
-    url = doj_url_files(num, ds)
-    if url is None:
-        return None
-    return f'<a href="{url}" target="_blank">{efta_id}</a>'
 
-
-def dataset_to_md_link(display_text: str, ds_num: int) -> str:
-    """Convert 'Dataset 9' → '<a href="https://...browse-page" target="_blank">Dataset 9</a>'"""
-    url = doj_url_dataset_page(ds_num)
-    return f'<a href="{url}" target="_blank">{display_text}</a>'
+def is_already_linked(text: str, start: int, end: int) -> bool:
+    """Check if the match at [start:end] is already inside a markdown link,
+    HTML a-tag, URL or code. Scans the whole text — for many matches in the
+    same document, build one ProtectedSpans and call .covers() instead."""
+    return ProtectedSpans(text).covers(start, end)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# CONTEXT CHECKERS — skip already-linked content
+# CORE LINKIFY ENGINE
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def is_already_linked(text: str, start: int, end: int) -> bool:
-    """Check if the match at [start:end] is already inside a markdown link or HTML a-tag."""
-    # Look back for context
-    before = text[max(0, start - 200):start]
-    after = text[end:min(len(text), end + 200)]
-
-    # Pattern 0: Inside an HTML <a> tag
-    # Check if we're between <a ...> and </a>
-    last_a_open = before.rfind('<a ')
-    last_a_close = before.rfind('</a>')
-    if last_a_open > last_a_close:
-        # We're inside an <a> tag
-        return True
-    # Check if href="...EFTA..." (we're inside an href value)
-    if 'href="' in before[-80:] and '"' not in before[before.rfind('href="') + 6:]:
-        return True
-
-    # Pattern 1: [EFTA...](url) — we're the link text
-    if before.endswith('[') and after.startswith(']('):
-        return True
-
-    # Pattern 2: [...](url containing EFTA...) — we're inside a URL
-    paren_before = before.rfind('](')
-    paren_close = after.find(')')
-    if paren_before != -1 and paren_close != -1:
-        between = before[paren_before:]
-        if ')' not in between:
-            return True
+def _link_dataset_number(m: re.Match) -> str:
+    n = int(m.group())
+    if 1 <= n <= 12:
+        return dataset_to_md_link(str(n), n)
+    return m.group()
 
-    # Pattern 3: Already a full markdown link [EFTA...](...)
-    bracket_open = before.rfind('[')
-    bracket_close_after = after.find(')')
-    if bracket_open != -1 and bracket_close_after != -1:
-        between_bracket = before[bracket_open + 1:]
-        if '](' not in between_bracket and after.startswith(']('):
-            return True
 
-    # Pattern 4: Inside a URL (http context)
-    url_check = before[-60:] if len(before) >= 60 else before
-    if 'http' in url_check and ')' not in url_check.split('http')[-1]:
-        return True
+def _link_compound(text: str, match: re.Match, spans: ProtectedSpans) -> tuple[str, int] | None:
+    """Link every number in a compound 'Datasets X, Y, and Z' reference.
+    Returns (replacement, count), or None if the compound doesn't qualify."""
+    ds_nums = [int(n) for n in DIGITS_RE.findall(match.group('nums'))]
 
-    # Pattern 5: Inside backticks (code)
-    backtick_count = before.count('`')
-    if backtick_count % 2 == 1:
-        return True
+    # Skip if any number is outside DOJ range (like "19 datasets")
+    if not all(1 <= n <= 12 for n in ds_nums):
+        return None
+    # Single number is handled as a plain "Dataset N" reference
+    if len(ds_nums) <= 1:
+        return None
+    if spans.covers(match.start(), match.end()):
+        return None
 
-    return False
+    prefix = text[match.start():match.start('nums')]
+    linked_nums = DIGITS_RE.sub(_link_dataset_number, match.group('nums'))
+    return prefix + linked_nums, len(ds_nums)
 
 
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# CORE LINKIFY ENGINE
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-# EFTA pattern: EFTA followed by 7-8 digits
-EFTA_RE = re.compile(r'EFTA\d{7,8}')
-
-# Dataset patterns: "Dataset 9", "Datasets 8, 9, and 11", "DS8", "Data Set 10"
-# We match individual dataset refs, not the compound "Datasets X, Y, and Z"
-DATASET_SINGLE_RE = re.compile(
-    r'(?:Dataset|Data\s+Set)\s+(\d{1,2})',
-    re.IGNORECASE
-)
-DS_SHORT_RE = re.compile(r'\bDS(\d{1,2})\b')
+def _link_single(spans: ProtectedSpans, display: str, ds_num: int, start: int, end: int) -> str | None:
+    """Link a plain 'Dataset N' / 'Data Set N' / 'DSN' reference, or None to leave it."""
+    if ds_num < 1 or ds_num > 12:
+        return None  # Not a valid DOJ dataset
+    if spans.covers(start, end):
+        return None
+    return dataset_to_md_link(display, ds_num)
+
+
+def _reject(stats: Counter, spans: ProtectedSpans, start: int, end: int):
+    """Profiling: count a skipped match under the protected-span kind that
+    covers it, or 'other' (inter-dataset gap, dataset number out of range)."""
+    stats[spans.covering(start, end) or 'other'] += 1
+
+
+def _linkify(text: str, efta: bool = True, datasets: bool = True,
+             spans: ProtectedSpans | None = None,
+             pos: int = 0, stop: int | None = None,
+             stats: Counter | None = None) -> tuple[str, int, int]:
+    """Single tokenizer pass over text. Output is assembled once from a list
+    of segments instead of re-slicing the whole string for every match.
+
+    pos/stop restrict the output to text[pos:stop] (streaming mode); matches
+    are still read from the full text so lookarounds see real neighbours.
+    stats, if given, collects match / link / rejection counts (--profile).
+    Returns (text, efta_count, ds_count)."""
+    if stop is None:
+        stop = len(text)
+    if spans is None:
+        spans = ProtectedSpans(text, pos)
+    segments = []
+    efta_count = 0
+    ds_count = 0
+    last = pos
+
+    for match in LINKIFY_RE.finditer(text, pos):
+        start, end = match.start(), match.end()
+        if start >= stop:
+            break
+        if stats is not None:
+            stats['matches'] += 1
 
+        if match.group('efta') is not None:
+            if not efta:
+                continue
+            if spans.covers(start, end):
+                if stats is not None:
+                    _reject(stats, spans, start, end)
+                continue
+            replacement = efta_to_md_link(match.group())
+            if replacement is None:
+                if stats is not None:
+                    _reject(stats, spans, start, end)
+                continue  # Falls in inter-dataset gap
+            efta_count += 1
+
+        elif not datasets:
+            continue
 
-def linkify_efta_ids(text: str) -> tuple[str, int]:
-    """Replace plain EFTA IDs with markdown PDF links. Returns (text, count)."""
-    count = 0
-    matches = list(EFTA_RE.finditer(text))
+        elif match.group('compound') is not None:
+            linked = _link_compound(text, match, spans)
+            if linked is not None:
+                replacement, n = linked
+                ds_count += n
+            else:
+                # Not a qualifying compound — retry as a plain "Dataset N"
+                # at the same offset
+                single = DATASET_SINGLE_RE.match(text, start)
+                if single is None:
+                    if stats is not None:
+                        _reject(stats, spans, start, end)
+                    continue
+                end = single.end()
+                replacement = _link_single(spans, single.group(), int(single.group(1)), start, end)
+                if replacement is None:
+                    if stats is not None:
+                        _reject(stats, spans, start, end)
+                    continue
+                ds_count += 1
 
-    for match in reversed(matches):
-        efta_id = match.group()
-        start, end = match.start(), match.end()
+        else:
+            num_group = 'single_num' if match.group('single') is not None else 'short_num'
+            replacement = _link_single(spans, match.group(), int(match.group(num_group)), start, end)
+            if replacement is None:
+                if stats is not None:
+                    _reject(stats, spans, start, end)
+                continue
+            ds_count += 1
 
-        if is_already_linked(text, start, end):
-            continue
+        segments.append(text[last:start])
+        segments.append(replacement)
+        last = end
 
-        md_link = efta_to_md_link(efta_id)
-        if md_link is None:
-            continue  # Falls in inter-dataset gap
+    if stats is not None:
+        stats['links'] += efta_count + ds_count
+    if not segments:
+        return text[pos:stop], 0, 0
+    segments.append(text[last:stop])
+    return ''.join(segments), efta_count, ds_count
 
-        text = text[:start] + md_link + text[end:]
-        count += 1
 
-    return text, count
+def linkify_efta_ids(text: str) -> tuple[str, int]:
+    """Replace plain EFTA IDs with markdown PDF links. Returns (text, count)."""
+    text, efta_count, _ = _linkify(text, datasets=False)
+    return text, efta_count
 
 
 def linkify_dataset_refs(text: str) -> tuple[str, int]:
     """Replace plain 'Dataset N', 'DS N', and compound 'Datasets X, Y, and Z'
     with browse-page links. Returns (text, count)."""
-    count = 0
-
-    # ── Pass 1: Compound "Datasets 8, 9, and 11" or "Datasets 8, 9, 11" ──
-    # Match the full compound reference, then linkify each number inside it
-    DATASETS_COMPOUND_RE = re.compile(
-        r'(Datasets?\s+)(\d{1,2}(?:\s*,\s*(?:and\s+)?\d{1,2})*(?:\s*,?\s*and\s+\d{1,2})?)',
-        re.IGNORECASE
-    )
-
-    compound_matches = list(DATASETS_COMPOUND_RE.finditer(text))
-    for match in reversed(compound_matches):
-        start, end = match.start(), match.end()
-        if is_already_linked(text, start, end):
-            continue
+    text, _, ds_count = _linkify(text, efta=False)
+    return text, ds_count
 
-        prefix = match.group(1)  # "Datasets " or "Dataset "
-        nums_part = match.group(2)  # "8, 9, and 11"
 
-        # Extract all dataset numbers
-        ds_nums = [int(n) for n in re.findall(r'\d+', nums_part)]
+def linkify_all(text: str, stats: Counter | None = None) -> tuple[str, int, int]:
+    """Run both EFTA and Dataset linkification in one tokenizer pass.
+    Returns (text, efta_count, ds_count)."""
+    return _linkify(text, stats=stats)
 
-        # Skip if any number is outside DOJ range (like "19 datasets")
-        if not all(1 <= n <= 12 for n in ds_nums):
-            continue
 
-        # If single number, fall through to Pass 2
-        if len(ds_nums) <= 1:
-            continue
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# STREAMING MODE — files larger than memory
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#
+# Input is read in fixed-size chunks. Each round, the pending text is cut at
+# a paragraph break (blank line) that no match and no protected span crosses;
+# everything before the cut is linkified exactly as linkify_all would, the
+# rest carries over into the next round. Inline code can't cross a blank
+# line, so no backtick pairing is ever split.
+#
+# Exactness holds while memory stays bounded: once more than 8 chunks are
+# pending in one paragraph, the cut falls at any line break, and an open
+# fence or <a> is committed even if an unpaired backtick or '[' before it
+# could still claim it. Chunks are never smaller than MAX_MATCH_LEN, so that
+# point is at least a few KB of paragraph away (8 MB at the default).
+#
+# Fenced code and <a> tags can run on for megabytes. When one is still open
+# at the end of the pending text, its content is emitted verbatim and only
+# the state ("inside a fence" / "inside an <a>") is carried forward until the
+# closing line or </a> turns up.
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters per read
+
+# Closing fence line, complete only once its newline (or EOF) is seen
+FENCE_CLOSE_RE = re.compile(r'^[ \t]*```[^\n]*(?:\n|\Z)', re.MULTILINE)
+ANCHOR_CLOSE = '</a>'
+
+# Carry-over overlap: a cut is never closer than this to the end of what has
+# been read, so any match crossing it (or deciding whether to extend past it)
+# is fully visible — e.g. "Datasets 8, 9," with " and 11" in the next chunk.
+MAX_MATCH_LEN = 256
+
+
+def _stream_cut(buf: str, pos: int, spans: ProtectedSpans, max_carry: int) -> int:
+    """Pick the rightmost safe cut in buf[pos:], or pos if none yet.
+
+    A cut after a blank line is always safe for inline code. Once the pending
+    text outgrows max_carry with no usable blank line, any line break with no
+    unpaired backtick before it in its paragraph will do; past 2 × max_carry,
+    any line break at all, so memory stays bounded even on pathological input."""
+    pending = len(buf) - pos
+    tiers = [('\n\n', False)]
+    if pending >= max_carry:
+        tiers.append(('\n', False) if pending >= 2 * max_carry else ('\n', True))
+    for sep, check_ticks in tiers:
+        c = buf.rfind(sep, pos)
+        while c != -1:
+            cut = c + len(sep)
+            if (cut <= len(buf) - MAX_MATCH_LEN and not spans.straddles(cut)
+                    and not _match_straddles(buf, cut)
+                    and not (check_ticks and _lone_backtick(buf, pos, cut, spans))):
+                return cut
+            c = buf.rfind(sep, pos, c)
+    return pos
+
+
+def _lone_backtick(buf: str, pos: int, cut: int, spans: ProtectedSpans) -> bool:
+    """True if the paragraph ending at cut has a backtick outside any span —
+    it could still pair with one after the cut."""
+    return _unclaimed(buf, '`', max(pos, buf.rfind('\n\n', pos, cut)), cut, spans)
+
+
+def _unclaimed(buf: str, char: str, lo: int, hi: int, spans: ProtectedSpans) -> bool:
+    """True if char occurs in buf[lo:hi] outside every protected span."""
+    i = buf.find(char, lo, hi)
+    while i != -1:
+        if not spans.covers(i, i + 1):
+            return True
+        i = buf.find(char, i + 1, hi)
+    return False
 
-        # Build replacement: linkify each number in place
-        def replace_num(m):
-            n = int(m.group())
-            if 1 <= n <= 12:
-                url = doj_url_dataset_page(n)
-                return f'<a href="{url}" target="_blank">{n}</a>'
-            return m.group()
 
-        linked_nums = re.sub(r'\d+', replace_num, nums_part)
-        replacement = prefix + linked_nums
-        text = text[:start] + replacement + text[end:]
-        count += len(ds_nums)
+def _open_span_settled(buf: str, pos: int, spans: ProtectedSpans) -> bool:
+    """The last span runs to the end of buf. It's safe to commit to it as an
+    open fence/<a> only if nothing earlier could still claim its opening —
+    an unpaired backtick in the paragraph, or an unclosed '[' on the line."""
+    start = spans.starts[-1]
+    line_start = max(pos, buf.rfind('\n', pos, start) + 1)
+    return (not _lone_backtick(buf, pos, start, spans)
+            and not _unclaimed(buf, '[', line_start, start, spans))
 
-    # ── Pass 2: Single "Dataset N" / "Data Set N" patterns ──
-    for pattern in [DATASET_SINGLE_RE, DS_SHORT_RE]:
-        matches = list(pattern.finditer(text))
-        for match in reversed(matches):
-            display = match.group()
-            ds_num = int(match.group(1))
 
-            if ds_num < 1 or ds_num > 12:
-                continue  # Not a valid DOJ dataset
+def _match_straddles(buf: str, cut: int) -> bool:
+    for m in LINKIFY_RE.finditer(buf, max(0, cut - MAX_MATCH_LEN)):
+        if m.start() >= cut:
+            return False
+        if m.end() > cut:
+            return True
+    return False
 
-            start, end = match.start(), match.end()
 
-            if is_already_linked(text, start, end):
+def linkify_stream(src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   stats: Counter | None = None) -> tuple[int, int]:
+    """Linkify text read from file object src into file object dst, holding
+    roughly one chunk plus carry-over in memory. Output is identical to
+    linkify_all on the whole text unless a single paragraph runs on past
+    8 chunks (see above). chunk_size is raised to MAX_MATCH_LEN if smaller.
+    Returns (efta_count, ds_count)."""
+    chunk_size = max(chunk_size, MAX_MATCH_LEN)
+    efta_total = 0
+    ds_total = 0
+    state = None  # None | 'fence' | 'anchor'
+    buf = ''
+    pos = 0  # buf[:pos] is already written; kept one char deep for ^ and \b
+    eof = False
+
+    while not eof:
+        chunk = src.read(chunk_size)
+        eof = not chunk
+        buf = buf[max(pos - 1, 0):] + chunk
+        pos = min(pos, 1)
+
+        while True:
+            # ── Inside a protected construct: copy through to its close ──
+            if state == 'anchor':
+                i = buf.find(ANCHOR_CLOSE, pos)
+                if i == -1:
+                    # Hold back a possible partial '</a>' at the end
+                    keep = len(buf) if eof else max(pos, len(buf) - len(ANCHOR_CLOSE) + 1)
+                    dst.write(buf[pos:keep])
+                    pos = keep
+                    break
+                dst.write(buf[pos:i + len(ANCHOR_CLOSE)])
+                pos = i + len(ANCHOR_CLOSE)
+                state = None
+
+            if state == 'fence':
+                m = FENCE_CLOSE_RE.search(buf, pos)
+                if m is None or not (eof or m.group().endswith('\n')):
+                    keep = len(buf) if eof else buf.rfind('\n', pos) + 1
+                    if keep > pos:
+                        dst.write(buf[pos:keep])
+                        pos = keep
+                    break
+                dst.write(buf[pos:m.end()])
+                pos = m.end()
+                state = None
+
+            # ── Plain text: linkify up to a safe cut ──
+            spans = ProtectedSpans(buf, pos)
+            open_kind = None
+            if eof:
+                stop = len(buf)
+            elif (spans.starts and spans.ends[-1] == len(buf)
+                    and spans.kinds[-1] in ('fence', 'anchor')
+                    and (_open_span_settled(buf, pos, spans)
+                         or len(buf) - pos >= 8 * chunk_size)):
+                # Protected construct still open at the end of what we've read
+                stop = spans.starts[-1]
+                open_kind = spans.kinds[-1]
+            else:
+                stop = _stream_cut(buf, pos, spans, 4 * chunk_size)
+
+            if stop > pos:
+                out, efta_count, ds_count = _linkify(buf, spans=spans, pos=pos, stop=stop, stats=stats)
+                dst.write(out)
+                efta_total += efta_count
+                ds_total += ds_count
+                pos = stop
+
+            if open_kind == 'anchor' and not buf.endswith(ANCHOR_CLOSE):
+                state = 'anchor'
                 continue
+            if open_kind == 'fence':
+                opener_end = buf.find('\n', pos)
+                if opener_end != -1:
+                    dst.write(buf[pos:opener_end + 1])
+                    pos = opener_end + 1
+                    state = 'fence'
+                    continue
+            break
 
-            md_link = dataset_to_md_link(display, ds_num)
-            text = text[:start] + md_link + text[end:]
-            count += 1
-
-    return text, count
-
-
-def linkify_all(text: str) -> tuple[str, int, int]:
-    """Run both EFTA and Dataset linkification. Returns (text, efta_count, ds_count)."""
-    text, efta_count = linkify_efta_ids(text)
-    text, ds_count = linkify_dataset_refs(text)
-    return text, efta_count, ds_count
+    return efta_total, ds_total
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # FILE PROCESSING
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+def process_file_cached(item: tuple[Path, str | None], dry_run: bool = False,
+                        profile=None) -> tuple[int, int, str | None, bool]:
+    """Process a single .md file unless its content hash matches the one
+    recorded when it was last left clean. item is (file_path, clean_hash).
+    Returns (efta_links, ds_links, new_clean_hash, cache_hit); new_clean_hash
+    is None when the file still has unlinked references (dry run).
+    profile is a link_profile.FileProfile under --profile."""
+    file_path, clean_hash = item
+    with timed(profile, 'read'):
+        data = Path(file_path).read_bytes()
+        digest = content_hash(data)
+    if profile:
+        profile.bytes_read = len(data)
+    if digest == clean_hash:
+        if profile:
+            profile.cache_hit = True
+        return 0, 0, digest, True
+
+    with timed(profile, 'linkify') as stats:
+        modified, efta_count, ds_count = linkify_all(decode_text(data), stats)
+
+    if efta_count > 0 or ds_count > 0:
+        if dry_run:
+            return efta_count, ds_count, None, False
+        with timed(profile, 'write'):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(modified)
+            encoded = modified.encode('utf-8')
+            digest = content_hash(encoded)
+        if profile:
+            profile.bytes_written = len(encoded)
+
+    return efta_count, ds_count, digest, False
+
+
 def process_file(file_path: Path, dry_run: bool = False) -> tuple[int, int]:
     """Process a single .md file. Returns (efta_links, ds_links)."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        original = f.read()
+    efta_count, ds_count, _, _ = process_file_cached((file_path, None), dry_run)
+    return efta_count, ds_count
 
-    modified, efta_count, ds_count = linkify_all(original)
 
-    if (efta_count > 0 or ds_count > 0) and not dry_run:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(modified)
+def process_file_streaming(item: tuple[Path, str | None], dry_run: bool = False,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           profile=None) -> tuple[int, int, str | None, bool]:
+    """Streaming counterpart of process_file_cached for files too large to
+    read whole. Output goes to a temp file beside the original and is renamed
+    over it only if something was linked; peak memory is about one chunk.
+    Reading and linkifying interleave, so --profile times them as one pass."""
+    file_path, clean_hash = item
+    file_path = Path(file_path)
+    with timed(profile, 'read'):
+        digest = file_hash(file_path)
+    if profile:
+        profile.bytes_read = file_path.stat().st_size
+    if digest == clean_hash:
+        if profile:
+            profile.cache_hit = True
+        return 0, 0, digest, True
+
+    if dry_run:
+        with open(file_path, 'r', encoding='utf-8') as src, open(os.devnull, 'w', encoding='utf-8') as dst, \
+                timed(profile, 'linkify') as stats:
+            efta_count, ds_count = linkify_stream(src, dst, chunk_size, stats)
+        return efta_count, ds_count, (None if efta_count or ds_count else digest), False
+
+    import shutil               # write path only: keeps hook-driven no-op runs light
+    import tempfile
+    fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.tmp')
+    try:
+        with open(file_path, 'r', encoding='utf-8') as src, os.fdopen(fd, 'w', encoding='utf-8') as dst, \
+                timed(profile, 'linkify') as stats:
+            efta_count, ds_count = linkify_stream(src, dst, chunk_size, stats)
+        if efta_count or ds_count:
+            with timed(profile, 'write'):
+                shutil.copymode(file_path, tmp)
+                os.replace(tmp, file_path)
+                digest = file_hash(file_path)
+            if profile:
+                profile.bytes_written = file_path.stat().st_size
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+    return efta_count, ds_count, digest, False
+
+
+def run_batch(files: list[Path], cache, worker, profiler, dry_run: bool,
+              jobs: int = 1, watching: bool = False) -> tuple[int, int, int]:
+    """Linkify files, print one line per file and record results in the
+    cache. Returns (EFTA links, Dataset links, files changed). Under
+    --watch only files that needed work are printed."""
+    items = [(f, cache.clean_hash(f)) for f in files]
+    results = map_profiled(worker, items, jobs, profiler)
 
-    return efta_count, ds_count
+    total_efta = 0
+    total_ds = 0
+    changed = 0
+    for f, (efta_count, ds_count, clean_hash, hit) in zip(files, results):
+        cache.mark_clean(f, clean_hash, hit)
+        if efta_count > 0 or ds_count > 0:
+            action = "Would linkify" if dry_run else "Linkified"
+            parts = []
+            if efta_count > 0:
+                parts.append(f"{efta_count} EFTA→PDF")
+            if ds_count > 0:
+                parts.append(f"{ds_count} Dataset→browse")
+            print(f"  🔗 {f.name}: {action} {', '.join(parts)}")
+            total_efta += efta_count
+            total_ds += ds_count
+            changed += 1
+        elif not watching:
+            print(f"  ✅ {f.name}: All references already linked")
+    return total_efta, total_ds, changed
 
 
 def main():
@@ -301,15 +574,29 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--dir', help='Directory of .md files to process')
     group.add_argument('--file', help='Single .md file to process')
+    add_watch_argument(group, parser)
     parser.add_argument('--dry-run', action='store_true',
                         help='Show changes without modifying files')
     parser.add_argument('--recursive', '-r', action='store_true',
                         help='Process subdirectories too')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream files in chunks instead of reading them whole (multi-GB exports)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, metavar='CHARS',
+                        help=f'Characters per read in --stream mode (default {DEFAULT_CHUNK_SIZE}, '
+                             f'minimum {MAX_MATCH_LEN})')
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
+    if args.chunk_size < MAX_MATCH_LEN:
+        parser.error(f'--chunk-size must be at least {MAX_MATCH_LEN}')
 
     files = []
     if args.file:
         files = [Path(args.file)]
+    elif args.watch is not None:
+        roots = watch_roots(args.watch)
+        files = md_files(roots, args.recursive)
     else:
         dir_path = Path(args.dir)
         if args.recursive:
@@ -325,29 +612,31 @@ def main():
     print(f"  Files:     {len(files)}")
     print(f"{'━' * 60}\n")
 
-    total_efta = 0
-    total_ds = 0
-
-    for f in files:
-        efta_count, ds_count = process_file(f, args.dry_run)
-        if efta_count > 0 or ds_count > 0:
-            action = "Would linkify" if args.dry_run else "Linkified"
-            parts = []
-            if efta_count > 0:
-                parts.append(f"{efta_count} EFTA→PDF")
-            if ds_count > 0:
-                parts.append(f"{ds_count} Dataset→browse")
-            print(f"  🔗 {f.name}: {action} {', '.join(parts)}")
-            total_efta += efta_count
-            total_ds += ds_count
-        else:
-            print(f"  ✅ {f.name}: All references already linked")
+    cache = LinkCache.open(args, 'linkify_efta', source_version(__file__, *efta_core.sources()))
+    if args.stream:
+        worker = partial(process_file_streaming, dry_run=args.dry_run, chunk_size=args.chunk_size)
+    else:
+        worker = partial(process_file_cached, dry_run=args.dry_run)
+    profiler = Profiler.open(args, 'linkify_efta')
+    total_efta, total_ds, _ = run_batch(files, cache, worker, profiler, args.dry_run, args.jobs)
 
     print(f"\n{'━' * 60}")
     verb = 'would be' if args.dry_run else ''
     print(f"  EFTA→PDF links:       {total_efta} {verb} created")
     print(f"  Dataset→browse links: {total_ds} {verb} created")
     print(f"  Total:                {total_efta + total_ds}")
+    if cache.hits:
+        print(f"  Unchanged (cached):   {cache.hits} files skipped")
+    cache.save()
+
+    if args.watch is not None:
+        def handle_batch(batch):
+            *_, batch_changed = run_batch(batch, cache, worker, profiler, args.dry_run, watching=True)
+            cache.save()
+            return batch_changed
+        watch(roots, handle_batch, args)
+
+    profiler.report()
 
     if args.dry_run and (total_efta + total_ds) > 0:
         print(f"\n  Run without --dry-run to apply changes.")
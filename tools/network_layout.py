@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+network_layout.py — Offline force layout for visualizations/shell_network.html
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+The page runs a d3 force simulation (link, many-body, center, collide,
+x/y forces) on every load — hundreds of ticks before it settles, which is
+slow on phones and grows quadratically with the node count. This tool runs
+the same simulation ahead of time and writes fixed x/y coordinates into
+the page's `nodes` array. The page then draws the final layout at once
+and only wakes the simulation when a node is dragged.
+
+TWO MODES:
+  default      keep the page's curated nodes/links, add coordinates
+  --ledger     rebuild nodes/links from the wire ledger + classification
+               (one node per entity, Epstein accounts merged into their
+               shell, one wire link per direction with the summed amount)
+
+SIMULATION: a NumPy port of d3-force with the page's parameters (see
+LINK_DISTANCE … COLLIDE_PADDING), same alpha schedule and velocity decay,
+same phyllotaxis starting positions. Forces are evaluated for all nodes
+at once. Many-body repulsion is exact pairwise up to EXACT_CHARGE_LIMIT
+nodes; above that, nodes are binned into a grid — pairs in neighbouring
+cells are summed exactly, and distant cells interact cell-to-cell through
+their strength-weighted centroids (the Barnes–Hut approximation on a flat
+grid). Collision only tests pairs in adjacent cells. 1,000 nodes lay out
+in about 2 s, 3,000 in about 10 s.
+
+Requires NumPy.
+
+Usage:
+    python3 network_layout.py
+    python3 network_layout.py --ledger data/master_wire_ledger_phase25.json
+    python3 network_layout.py --page /tmp/shell_network.html --seed 3
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import argparse
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("network_layout.py requires NumPy (pip install numpy)")
+
+from balance_sheet import EPSTEIN, shell_of
+from entity_normalizer import DEFAULT_CLASSIFICATION, EntityNormalizer, fold
+
+DEFAULT_PAGE = 'visualizations/shell_network.html'
+
+# d3 defaults and the page's overrides
+ALPHA_MIN = 0.001
+ALPHA_DECAY = 0.015
+VELOCITY_DECAY = 0.4
+COLLIDE_PADDING = 12
+EXACT_CHARGE_LIMIT = 500
+GROUP_OF_TYPE = {EPSTEIN: 'shell_wire', 'BANK/CUSTODIAN': 'bank'}   # otherwise external
+
+NODES_RE = re.compile(r'(const nodes = \[\n)(.*?)(\n\];)', re.DOTALL)
+LINKS_RE = re.compile(r'(const links = \[\n)(.*?)(\n\];)', re.DOTALL)
+OBJECT_LINE_RE = re.compile(r'^(\s*)\{ (.*?) \}(,?)\s*$')
+JS_KEY_RE = re.compile(r'(^|, )([A-Za-z_]\w*):')
+XY_RE = re.compile(r', x:-?[\d.]+, y:-?[\d.]+')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# PAGE PARAMETERS (mirror the page's JavaScript)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def node_radius(d: dict) -> float:
+    if d.get('group') == 'bank':
+        refs = d.get('moneyRefs') or 0
+        return 32 if refs > 1000000 else 24 if refs > 100000 else 18 if refs > 10000 else 14
+    if d.get('group') == 'external':
+        return 14
+    if d.get('group') == 'comms':
+        return 28
+    files = d.get('files') or 0
+    return 30 if files > 800 else 24 if files > 400 else 20 if files > 200 else 16 if files > 100 else 13
+
+
+def charge_strength(d: dict) -> float:
+    return {'bank': -400, 'comms': -350}.get(d.get('group'), -250)
+
+
+def x_strength(d: dict) -> float:
+    return {'bank': 0.06, 'external': 0.08}.get(d.get('group'), 0.02)
+
+
+def link_distance(l: dict) -> float:
+    return {'wire': 120, 'bank': 180}.get(l.get('type'), 100 - l.get('weight', 0) * 0.3)
+
+
+def link_strength(l: dict) -> float:
+    return 0.15 if l.get('type') == 'bank' else min(0.5, l.get('weight', 0) / 200)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# SIMULATION
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _near_pairs(x, y, cell: float) -> tuple[np.ndarray, np.ndarray]:
+    """Index pairs (i, j), i ≠ j each once, of points in the same or
+    adjacent grid cells of size cell."""
+    cx = np.floor((x - x.min()) / cell).astype(np.int64)
+    cy = np.floor((y - y.min()) / cell).astype(np.int64)
+    stride = int(cy.max()) + 3
+    key = (cx + 1) * stride + (cy + 1)
+    order = np.argsort(key, kind='stable')
+    skey = key[order]
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    firsts, seconds = [], []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        target = key + dx * stride + dy
+        lo = np.searchsorted(skey, target, side='left')
+        hi = np.searchsorted(skey, target, side='right')
+        if dx == dy == 0:
+            lo = rank + 1                       # same cell: only later points
+        count = np.maximum(hi - lo, 0)
+        i = np.repeat(np.arange(len(x)), count)
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        firsts.append(i)
+        seconds.append(order[lo[i] + offset])
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def _charge(x, y, strength, alpha) -> tuple[np.ndarray, np.ndarray]:
+    """Many-body velocity change: Σ_j strength_j · alpha · (p_j − p_i) / |p_j − p_i|²."""
+    n = len(x)
+    if n <= EXACT_CHARGE_LIMIT:
+        dx = x[None, :] - x[:, None]
+        dy = y[None, :] - y[:, None]
+        d2 = dx * dx + dy * dy
+        np.fill_diagonal(d2, np.inf)
+        d2 = np.where(d2 < 1, np.sqrt(d2), d2)          # d3 distanceMin² = 1
+        w = strength[None, :] * alpha / d2
+        return (dx * w).sum(axis=1), (dy * w).sum(axis=1)
+
+    # ~(9n²)^⅓ cells balances near pairs (≈ 9n²/cells) against far cell pairs (cells²)
+    side = max(int(round((9 * n * n) ** (1 / 6))), 2)
+    width = max(x.max() - x.min(), y.max() - y.min(), 1.0) / side * (1 + 1e-9)
+    gx = np.minimum(((x - x.min()) / width).astype(np.int64), side - 1)
+    gy = np.minimum(((y - y.min()) / width).astype(np.int64), side - 1)
+    occupied, cell = np.unique(gx * side + gy, return_inverse=True)
+    members = np.bincount(cell).astype(np.float64)
+    weight = np.abs(strength)
+    total = np.bincount(cell, weights=strength)
+    mass = np.bincount(cell, weights=weight)
+    mx = np.bincount(cell, weights=weight * x) / mass        # source: strength-weighted centroid
+    my = np.bincount(cell, weights=weight * y) / mass
+    ax = np.bincount(cell, weights=x) / members              # target: plain centroid
+    ay = np.bincount(cell, weights=y) / members
+    ox, oy = occupied // side, occupied % side
+
+    # Far field: cell-to-cell for every pair of cells not adjacent
+    far = (np.abs(ox[None, :] - ox[:, None]) > 1) | (np.abs(oy[None, :] - oy[:, None]) > 1)
+    dx = mx[None, :] - ax[:, None]
+    dy = my[None, :] - ay[:, None]
+    w = np.where(far, total[None, :] * alpha / np.maximum(dx * dx + dy * dy, 1), 0)
+    vx, vy = (dx * w).sum(axis=1)[cell], (dy * w).sum(axis=1)[cell]
+
+    # Near field: exact pairs inside the neighbourhood
+    i, j = _near_pairs(gx.astype(np.float64), gy.astype(np.float64), 1.0)
+    dx, dy = x[j] - x[i], y[j] - y[i]
+    d2 = dx * dx + dy * dy
+    d2 = np.where(d2 < 1, np.sqrt(np.maximum(d2, 1e-12)), d2)
+    wi, wj = strength[j] * alpha / d2, strength[i] * alpha / d2
+    vx += np.bincount(i, weights=dx * wi, minlength=n) - np.bincount(j, weights=dx * wj, minlength=n)
+    vy += np.bincount(i, weights=dy * wi, minlength=n) - np.bincount(j, weights=dy * wj, minlength=n)
+    return vx, vy
+
+
+def simulate(nodes: list[dict], links: list[dict], seed: int = 0,
+             ticks: int | None = None) -> np.ndarray:
+    """Run the page's force simulation to rest. Returns (n, 2) positions."""
+    n = len(nodes)
+    if not n:
+        return np.zeros((0, 2))
+    index = {d['id']: i for i, d in enumerate(nodes)}
+    src = np.array([index[l['source']] for l in links], dtype=np.int64)
+    dst = np.array([index[l['target']] for l in links], dtype=np.int64)
+    distance = np.array([link_distance(l) for l in links], dtype=np.float64)
+    lstrength = np.array([link_strength(l) for l in links], dtype=np.float64)
+    degree = np.bincount(np.concatenate([src, dst]), minlength=n).astype(np.float64)
+    bias = degree[src] / np.maximum(degree[src] + degree[dst], 1)
+
+    charge = np.array([charge_strength(d) for d in nodes], dtype=np.float64)
+    fx = np.array([x_strength(d) for d in nodes], dtype=np.float64)
+    radius = np.array([node_radius(d) + COLLIDE_PADDING for d in nodes], dtype=np.float64)
+
+    # d3's phyllotaxis start, jiggled so exact ties never divide by zero
+    rng = np.random.default_rng(seed)
+    k = np.arange(n)
+    r0, a0 = 10 * np.sqrt(0.5 + k), k * math.pi * (3 - math.sqrt(5))
+    x = r0 * np.cos(a0) + rng.uniform(-1e-3, 1e-3, n)
+    y = r0 * np.sin(a0) + rng.uniform(-1e-3, 1e-3, n)
+    vx, vy = np.zeros(n), np.zeros(n)
+
+    if ticks is None:
+        ticks = math.ceil(math.log(ALPHA_MIN) / math.log(1 - ALPHA_DECAY))
+    alpha = 1.0
+    for _ in range(ticks):
+        alpha += (0 - alpha) * ALPHA_DECAY
+
+        # link
+        if len(src):
+            lx = x[dst] + vx[dst] - x[src] - vx[src]
+            ly = y[dst] + vy[dst] - y[src] - vy[src]
+            length = np.maximum(np.hypot(lx, ly), 1e-6)
+            scale = (length - distance) / length * alpha * lstrength
+            lx, ly = lx * scale, ly * scale
+            vx -= np.bincount(dst, weights=lx * bias, minlength=n)
+            vy -= np.bincount(dst, weights=ly * bias, minlength=n)
+            vx += np.bincount(src, weights=lx * (1 - bias), minlength=n)
+            vy += np.bincount(src, weights=ly * (1 - bias), minlength=n)
+
+        # many-body
+        cx, cy = _charge(x, y, charge, alpha)
+        vx += cx
+        vy += cy
+
+        # center
+        x -= x.mean()
+        y -= y.mean()
+
+        # collide (predicted positions, one iteration, strength 1)
+        px, py = x + vx, y + vy
+        i, j = _near_pairs(px, py, 2 * radius.max())
+        dx, dy = px[i] - px[j], py[i] - py[j]
+        reach = radius[i] + radius[j]
+        d2 = dx * dx + dy * dy
+        hit = d2 < reach * reach
+        if hit.any():
+            i, j, dx, dy, reach = i[hit], j[hit], dx[hit], dy[hit], reach[hit]
+            d = np.maximum(np.sqrt(d2[hit]), 1e-6)
+            push = (reach - d) / d
+            share = radius[j] ** 2 / (radius[i] ** 2 + radius[j] ** 2)
+            vx += np.bincount(i, weights=dx * push * share, minlength=n)
+            vy += np.bincount(i, weights=dy * push * share, minlength=n)
+            vx -= np.bincount(j, weights=dx * push * (1 - share), minlength=n)
+            vy -= np.bincount(j, weights=dy * push * (1 - share), minlength=n)
+
+        # x / y
+        vx += -x * fx * alpha
+        vy += -y * 0.02 * alpha
+
+        vx *= 1 - VELOCITY_DECAY
+        vy *= 1 - VELOCITY_DECAY
+        x += vx
+        y += vy
+    return np.stack([x, y], axis=1)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# DATA
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def parse_js_objects(block: str) -> list[dict]:
+    """Object-literal lines ({ id:"st", weight:163, … }) → dicts."""
+    objects = []
+    for line in block.split('\n'):
+        m = OBJECT_LINE_RE.match(line)
+        if m:
+            body = XY_RE.sub('', m.group(2))
+            objects.append(json.loads('{' + JS_KEY_RE.sub(r'\1"\2":', body) + '}'))
+    return objects
+
+
+def _js_object(d: dict) -> str:
+    return '{ ' + ', '.join(f'{k}:{json.dumps(v, ensure_ascii=False)}' for k, v in d.items()) + ' }'
+
+
+def _slug(name: str, taken: set) -> str:
+    base = fold(name).replace(' ', '_')[:24] or 'node'
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f"{base}_{n}", n + 1
+    taken.add(slug)
+    return slug
+
+
+def graph_from_ledger(ledger_path, classification_path) -> tuple[list[dict], list[dict]]:
+    """One node per resolved entity (Epstein accounts merged into their
+    shell), one 'wire' link per direction carrying the summed amount."""
+    normalizer = EntityNormalizer.from_file(classification_path)
+    with open(ledger_path, 'r', encoding='utf-8') as f:
+        wires = json.load(f)
+
+    nodes, node_of, taken = [], {}, set()
+
+    def node(raw):
+        res = normalizer.resolve(raw)
+        label = (res.type == EPSTEIN and shell_of(res.name)) or res.name
+        if label not in node_of:
+            node_of[label] = len(nodes)
+            nodes.append({'id': _slug(label, taken), 'label': label, 'full': res.name,
+                          'group': GROUP_OF_TYPE.get(res.type, 'external'), 'wAmt': 0})
+        return node_of[label]
+
+    cents, count = Counter(), Counter()
+    for w in wires:
+        a, b = node(w['entity_from']), node(w['entity_to'])
+        if a == b:
+            continue
+        amount = round(w['amount'] * 100)
+        cents[a, b] += amount
+        count[a, b] += 1
+        nodes[a]['wAmt'] += amount
+        nodes[b]['wAmt'] += amount
+
+    for d in nodes:
+        d['wAmt'] = round(d['wAmt'] / 1e8, 1)
+        d['wire'] = f"${d['wAmt']:,.1f}M"
+    links = []
+    for (a, b), total in sorted(cents.items(), key=lambda kv: -kv[1]):
+        millions = total / 1e8
+        links.append({'source': nodes[a]['id'], 'target': nodes[b]['id'], 'type': 'wire',
+                      'weight': max(1, round(millions)),
+                      'label': f"${millions:,.1f}M — {count[a, b]} wire{'s' if count[a, b] != 1 else ''}"})
+    return nodes, links
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# PAGE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def read_page_data(html: str) -> tuple[list[dict], list[dict]]:
+    nodes_m, links_m = NODES_RE.search(html), LINKS_RE.search(html)
+    if not (nodes_m and links_m):
+        raise ValueError("page has no `const nodes = [` / `const links = [` arrays")
+    return parse_js_objects(nodes_m.group(2)), parse_js_objects(links_m.group(2))
+
+
+def write_positions(html: str, positions: dict[str, tuple[float, float]]) -> str:
+    """Set x/y on each node line in place, keeping comments and field order."""
+    m = NODES_RE.search(html)
+    lines = []
+    for line in m.group(2).split('\n'):
+        om = OBJECT_LINE_RE.match(line)
+        if om:
+            body = XY_RE.sub('', om.group(2))
+            node_id = json.loads('{' + JS_KEY_RE.sub(r'\1"\2":', body) + '}')['id']
+            x, y = positions[node_id]
+            line = f"{om.group(1)}{{ {body}, x:{x:.1f}, y:{y:.1f} }}{om.group(3)}"
+        lines.append(line)
+    return html[:m.start(2)] + '\n'.join(lines) + html[m.end(2):]
+
+
+def write_data(html: str, nodes: list[dict], links: list[dict]) -> str:
+    """Replace both arrays with generated data."""
+    def block(objects):
+        return '\n'.join(f"  {_js_object(o)}," for o in objects).rstrip(',')
+    html = NODES_RE.sub(lambda m: m.group(1) + block(nodes) + m.group(3), html, count=1)
+    return LINKS_RE.sub(lambda m: m.group(1) + block(links) + m.group(3), html, count=1)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precompute the shell network force layout and write it into the page'
+    )
+    parser.add_argument('--page', default=DEFAULT_PAGE, help=f'Page to update (default ./{DEFAULT_PAGE})')
+    parser.add_argument('--ledger', help='Rebuild nodes/links from this ledger JSON')
+    parser.add_argument('--classification', default=DEFAULT_CLASSIFICATION,
+                        help=f'Classification JSON for --ledger (default ./{DEFAULT_CLASSIFICATION})')
+    parser.add_argument('--seed', type=int, default=0, help='Jitter seed for the starting positions')
+    parser.add_argument('--dry-run', action='store_true', help='Lay out but do not write the page')
+    args = parser.parse_args()
+
+    with open(args.page, 'r', encoding='utf-8') as f:
+        html = f.read()
+    try:
+        nodes, links = (graph_from_ledger(args.ledger, args.classification) if args.ledger
+                        else read_page_data(html))
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    positions = simulate(nodes, links, args.seed)
+    elapsed = time.perf_counter() - start
+
+    if args.ledger:
+        for d, (x, y) in zip(nodes, positions.tolist()):
+            d['x'], d['y'] = round(x, 1), round(y, 1)
+        updated = write_data(html, nodes, links)
+    else:
+        updated = write_positions(html, {d['id']: p for d, p in zip(nodes, positions.tolist())})
+
+    span = positions.max(axis=0) - positions.min(axis=0) if len(positions) else (0, 0)
+    print(f"━━━ NETWORK LAYOUT ━━━")
+    print(f"  Data:   {'ledger ' + args.ledger if args.ledger else 'page arrays'} — "
+          f"{len(nodes):,} nodes, {len(links):,} links")
+    print(f"  Layout: {elapsed:.2f}s, extent {span[0]:.0f} × {span[1]:.0f}")
+    if args.dry_run:
+        print(f"  Dry run — {args.page} not written")
+    elif updated != html:
+        with open(args.page, 'w', encoding='utf-8') as f:
+            f.write(updated)
+        print(f"  ✅ Wrote coordinates into {args.page}")
+    else:
+        print(f"  Unchanged: {args.page}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+wire_dedup.py — Hash-keyed dedup census (METHODOLOGY.md, Phases 20–25)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Reproduces the ledger's dedup stages in code. Each row is reduced to a
+composite key and the first row to claim a key wins; every later row with
+the same key is a collision. One pass, one dict per key strategy.
+
+KEY STRATEGIES (pluggable — see register_key):
+  amount       (amount)                                 Stage 1, v2–20
+  entity_pair  (amount, entity_from, entity_to)         Phase 20D
+  date_aware   (amount, entity_from, entity_to, date)   Stage 2, Phase 23
+  normalized   date_aware with case/punctuation-folded entity names
+
+Amounts are compared in integer cents and dates as days since epoch, so
+"2014-05-21" and "5/21/2014" are the same date. Every strategy keys on the
+amount, so a row with no usable amount is never a duplicate: it is kept
+and joins no collision group. Unreadable cells (NaN, inf, a non-date
+number) normalize to None instead of aborting the run.
+
+CAP (Phase 24): with --cap, rows above the cap are excluded before dedup —
+except verified rows (source verified_wires, or carrying an exhibit),
+which Phase 24 exempted. --no-cap-exemption reproduces the Phase 23 cap.
+
+Inputs:
+    data/master_wire_ledger_phase25.json   (default)
+    any SQLite table with amount / entity_from / entity_to / date columns
+    (fund_flows, fund_flows_audited, financial_hits: extracted_amount)
+
+Usage:
+    python3 wire_dedup.py
+    python3 wire_dedup.py --key amount --key date_aware --report collisions.json
+    python3 wire_dedup.py --db ./epstein.db --table fund_flows --cap 10000000
+"""
+
+import re
+import json
+import math
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import NamedTuple
+
+from ledger_store import parse_date
+
+DEFAULT_LEDGER = 'data/master_wire_ledger_phase25.json'
+
+# Column name candidates per field, first match wins (DB tables differ)
+FIELD_ALIASES = {
+    'amount': ('amount', 'extracted_amount'),
+    'entity_from': ('entity_from',),
+    'entity_to': ('entity_to',),
+    'date': ('date', 'date_ref'),
+    'source': ('source',),
+    'exhibit': ('exhibit',),
+}
+
+AMOUNT_JUNK_RE = re.compile(r'[$,\s]')
+ENTITY_FOLD_RE = re.compile(r'[^0-9a-z]+')
+
+
+class Wire(NamedTuple):
+    """One input row, normalized once for every key strategy."""
+    id: int             # ledger index or SQLite rowid
+    cents: int | None
+    entity_from: str
+    entity_to: str
+    date: int | str | None
+    verified: bool
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# NORMALIZERS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def to_cents(value) -> int | None:
+    """1234.5 / '1234.50' / '$1,234.50' → 123450. None for anything that is
+    not a finite amount ('', 'n/a', NaN, inf, '1e400')."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (str, bytes)):
+        try:
+            value = float(AMOUNT_JUNK_RE.sub('', value if isinstance(value, str) else value.decode('ascii')))
+        except (ValueError, UnicodeDecodeError):
+            return None
+    elif not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value):
+        return None
+    return round(value * 100)
+
+
+def to_day(value) -> int | str | None:
+    """Date → days since epoch. Formats parse_date doesn't know are kept
+    as their stripped text so they still compare equal to themselves;
+    values that aren't text at all (numbers, undecodable bytes) → None."""
+    if isinstance(value, bytes):
+        try:
+            value = value.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return parse_date(value)
+    except ValueError:
+        return value.strip()
+
+
+def fold_entity(name: str) -> str:
+    """'Southern Trust Co., Inc.' → 'southern trust co inc'."""
+    return ENTITY_FOLD_RE.sub(' ', name.casefold()).strip()
+
+
+def to_wire(row_id: int, row: dict) -> Wire:
+    source = row.get('source') or ''
+    return Wire(
+        id=row_id,
+        cents=to_cents(row.get('amount')),
+        entity_from=row.get('entity_from') or '',
+        entity_to=row.get('entity_to') or '',
+        date=to_day(row.get('date')),
+        verified=source == 'verified_wires' or bool(row.get('exhibit')),
+    )
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# KEY STRATEGIES
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+KEY_STRATEGIES = {}
+
+
+def register_key(name: str):
+    """Decorator: add a Wire → hashable key function under name."""
+    def register(fn):
+        KEY_STRATEGIES[name] = fn
+        return fn
+    return register
+
+
+@register_key('amount')
+def amount_key(w: Wire):
+    return w.cents
+
+
+@register_key('entity_pair')
+def entity_pair_key(w: Wire):
+    return w.cents, w.entity_from, w.entity_to
+
+
+@register_key('date_aware')
+def date_aware_key(w: Wire):
+    return w.cents, w.entity_from, w.entity_to, w.date
+
+
+@register_key('normalized')
+def normalized_key(w: Wire):
+    return w.cents, fold_entity(w.entity_from), fold_entity(w.entity_to), w.date
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ENGINE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def apply_cap(wires: list[Wire], cap: float | None,
+              exempt_verified: bool = True) -> tuple[list[Wire], list[Wire]]:
+    """Split wires into (eligible, capped). Unpriced rows are never capped."""
+    if cap is None:
+        return wires, []
+    limit = to_cents(cap)
+    eligible, capped = [], []
+    for w in wires:
+        over = w.cents is not None and w.cents > limit
+        if over and not (exempt_verified and w.verified):
+            capped.append(w)
+        else:
+            eligible.append(w)
+    return eligible, capped
+
+
+def dedup(wires: list[Wire], key_fn) -> tuple[list[Wire], dict]:
+    """Single pass. Returns (kept, collisions) where collisions maps each
+    key claimed more than once to [kept wire, dropped wire, ...].
+    Unpriced rows are always kept: without an amount there is nothing to
+    match them on."""
+    first = {}
+    collisions = {}
+    kept = []
+    for w in wires:
+        if w.cents is None:
+            kept.append(w)
+            continue
+        key = key_fn(w)
+        winner = first.setdefault(key, w)
+        if winner is w:
+            kept.append(w)
+        else:
+            collisions.setdefault(key, [winner]).append(w)
+    return kept, collisions
+
+
+def census(wires: list[Wire], strategy: str) -> dict:
+    """Run one key strategy; summary plus collision groups for the report."""
+    kept, collisions = dedup(wires, KEY_STRATEGIES[strategy])
+    dropped = [w for group in collisions.values() for w in group[1:]]
+    return {
+        'strategy': strategy,
+        'rows': len(wires),
+        'kept': len(kept),
+        'dropped': len(dropped),
+        'kept_cents': sum(w.cents or 0 for w in kept),
+        'dropped_cents': sum(w.cents or 0 for w in dropped),
+        'groups': [
+            {'key': list(key) if isinstance(key, tuple) else [key],
+             'kept': group[0].id,
+             'dropped': [w.id for w in group[1:]]}
+            for key, group in collisions.items()
+        ],
+    }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# INPUTS
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_ledger(path) -> list[Wire]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [to_wire(i, row) for i, row in enumerate(json.load(f))]
+
+
+def load_table(db_path, table: str) -> list[Wire]:
+    """Read a SQLite table, mapping its columns through FIELD_ALIASES."""
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', table):
+        raise ValueError(f"Bad table name: {table!r}")
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        cols = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        if not cols:
+            raise ValueError(f"No such table: {table}")
+        fields = {field: next((c for c in names if c in cols), None)
+                  for field, names in FIELD_ALIASES.items()}
+        if fields['amount'] is None:
+            raise ValueError(f"{table} has no amount column")
+        present = [(field, col) for field, col in fields.items() if col]
+        select = ', '.join(f'"{col}"' for _, col in present)
+        wires = []
+        for row in conn.execute(f'SELECT rowid, {select} FROM "{table}" ORDER BY rowid'):
+            wires.append(to_wire(row[0], {field: v for (field, _), v in zip(present, row[1:])}))
+        return wires
+    finally:
+        conn.close()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Hash-keyed dedup census over the wire ledger or a database table'
+    )
+    parser.add_argument('--ledger', default=DEFAULT_LEDGER,
+                        help=f'Ledger JSON (default ./{DEFAULT_LEDGER})')
+    parser.add_argument('--db', help='SQLite database (use with --table instead of --ledger)')
+    parser.add_argument('--table', help='Table to dedup, e.g. fund_flows or financial_hits')
+    parser.add_argument('--key', action='append', choices=list(KEY_STRATEGIES),
+                        help='Key strategy, repeatable (default: all, in stage order)')
+    parser.add_argument('--cap', type=float, metavar='DOLLARS',
+                        help='Exclude rows above this amount (verified rows exempt, as in Phase 24)')
+    parser.add_argument('--no-cap-exemption', action='store_true',
+                        help='Apply --cap to verified rows too (Phase 23 behaviour)')
+    parser.add_argument('--report', metavar='PATH',
+                        help='Write collision groups for every strategy as JSON')
+    args = parser.parse_args()
+
+    if bool(args.db) != bool(args.table):
+        parser.error('--db and --table go together')
+    try:
+        wires = load_table(args.db, args.table) if args.db else load_ledger(args.ledger)
+    except ValueError as e:
+        parser.error(str(e))
+    source = f"{args.db}:{args.table}" if args.db else args.ledger
+
+    eligible, capped = apply_cap(wires, args.cap, not args.no_cap_exemption)
+    strategies = args.key or list(KEY_STRATEGIES)
+
+    print(f"━━━ DEDUP CENSUS ━━━")
+    print(f"  Input:  {source} ({len(wires):,} rows)")
+    if args.cap is not None:
+        exempt = 'none' if args.no_cap_exemption else 'verified rows'
+        print(f"  Cap:    ${args.cap:,.0f} — {len(capped)} rows excluded "
+              f"(${sum(w.cents or 0 for w in capped) / 100:,.2f}), exempt: {exempt}")
+    print(f"{'━' * 60}\n")
+
+    results = []
+    for strategy in strategies:
+        result = census(eligible, strategy)
+        results.append(result)
+        print(f"  {strategy:<12} kept {result['kept']:>7,}  ${result['kept_cents'] / 100:>18,.2f}   "
+              f"dropped {result['dropped']:>6,}  ${result['dropped_cents'] / 100:>16,.2f}   "
+              f"({len(result['groups'])} collision groups)")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'input': source, 'cap': args.cap, 'capped': [w.id for w in capped],
+                       'strategies': results}, f, indent=1)
+        print(f"\n  Collision report: {args.report}")
+    print(f"\n━━━ CENSUS COMPLETE ━━━")
+
+
+if __name__ == '__main__':
+    main()